@@ -1,29 +1,96 @@
-from typing import Any, List, Optional
-from fastapi import APIRouter, Body, Depends, HTTPException, Query, Path, status
+from typing import Any, List, Literal, Optional, Union
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Path, Request, Response, status
 from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from pydantic import PositiveInt, ValidationError
 from sqlalchemy.orm import Session
-from app import crud, schemas
+from app import crud, models, schemas
 from app.api import deps
+from app.api.routing import UnitOfWorkRoute
+from app.core.config import settings
+from app.api.executor import run_db
+from app.db.executor import Priority
 
-router = APIRouter()
+router = APIRouter(route_class=UnitOfWorkRoute)
+
+
+def driver_response(driver: models.Driver, *, expand: Optional[str] = None) -> schemas.DriverDatabase:
+    """Information about the driver with the related records requested by the `expand` parameter
+    (they are loaded together with the drivers, so no queries are made here)."""
+    if expand != "vehicles":
+        return schemas.DriverDatabase(**jsonable_encoder(driver))
+    vehicles = [
+        schemas.VehicleDatabase(**jsonable_encoder(vars(vehicle), exclude={"driver"}))
+        for vehicle in sorted(driver.vehicle, key=lambda vehicle: vehicle.id)
+    ]
+    return schemas.DriverWithVehicles(**jsonable_encoder(vars(driver), exclude={"vehicle"}), vehicles=vehicles)
 
 
 @router.get(
     path="/driver/",
-    response_model=List[schemas.DriverDatabase],
+    response_model=List[Union[schemas.DriverWithVehicles, schemas.DriverDatabase]],
+    response_model_exclude_unset=True,
     summary="Get the list of drivers from the database",
-    description="The list of drivers can be filtered by registration date")
+    description="The list of drivers can be filtered by registration date or requested by IDs")
 async def get_drivers(
     created_at__gte: Optional[str] = Query(default=None, regex="^\d{1,2}-\d{1,2}-\d{4}$", title="Start date"),
     created_at__lte: Optional[str] = Query(default=None, regex="^\d{1,2}-\d{1,2}-\d{4}$", title="End date"),
+    count: Literal["exact", "estimated"] = Query(default="exact", title="Mode of counting the filtered drivers"),
+    expand: Optional[Literal["vehicles"]] = Query(default=None, title="Related records included in each driver"),
     *,
-    db: Session = Depends(deps.get_db)
+    ids: Optional[List[int]] = Depends(deps.get_ids),
+    fields: Optional[List[str]] = Depends(deps.get_fields(schemas.DriverDatabase)),
+    sort: List[str] = Depends(deps.get_sort(crud.driver.sort_keys)),
+    pagination: schemas.Pagination = Depends(deps.get_pagination),
+    request: Request,
+    response: Response,
+    db: Session = Depends(deps.get_read_db)
 ) -> Any:
     """Get a list of drivers, filtered by date of registration if nesesery.
     :param created_at__gte: registration starting from this date (inclusive)
     :param created_at__lte: registration before this date
+    :param count: the total number of drivers is returned in the "X-Total-Count" header,
+    for the filtered list it can be estimated by the database instead of counting (in PostgreSQL)
+    :param expand: "vehicles" to include the list of the vehicles in each driver
+    (they are read by one more query for the whole page)
+    :param ids: comma-separated IDs of the drivers requested at once (without the filters and the pagination),
+    the drivers are returned in the same order and the IDs which are not found in the "X-Not-Found" header
+    :param fields: comma-separated names of the returned fields (only they are read from the database)
+    :param sort: comma-separated sort keys (the name of the column with the "-" prefix in descending order),
+    e.g. "-created_at" for the latest registered drivers; the drivers are sorted by ID by default
+    :param pagination: number of drivers on the page and the cursor of the previous page;
+    the link to the next page is returned in the "Link" header
     """
+    if fields is not None and expand is not None:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="The fields can not be combined with the related records"
+        )
+    if ids is not None:
+        if created_at__gte or created_at__lte or sort or pagination.limit is not None:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="The list of IDs can not be combined with the filters, the sorting and the pagination"
+            )
+        drivers, not_found = await run_db(
+            crud.driver.get_many,
+            db,
+            ids=ids,
+            fields=fields,
+            load_vehicles=expand == "vehicles",
+            priority=Priority.POINT_READ
+        )
+        if not drivers:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Drivers with the requested IDs are not found in the database"
+            )
+        response.headers["X-Total-Count"] = str(len(drivers))
+        if not_found:
+            response.headers["X-Not-Found"] = ",".join(str(id) for id in not_found)
+        if fields is not None:
+            return deps.sparse_response(drivers, fields=fields, schema=schemas.DriverDatabase, response=response)
+        return [driver_response(driver, expand=expand) for driver in drivers]
     try:
         created_at = schemas.CreatedAt(gte=created_at__gte, lte=created_at__lte)
     except (ValueError, ValidationError) as ve:
@@ -31,19 +98,66 @@ async def get_drivers(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
             detail="The date must be in DD-MM-YYYY format: %s" % str(ve)
         )
+    # The key of the cursor is always returned as well as the ID
+    keys = crud.driver.cursor_keys(sort)
+    if fields is not None:
+        fields = list(dict.fromkeys([*fields, *keys]))
     try:
-        drivers = crud.driver.get_filtered(db, gte=created_at.gte, lte=created_at.lte)
-    except Exception as e:
+        drivers = await run_db(
+            crud.driver.get_filtered,
+            db,
+            gte=created_at.gte,
+            lte=created_at.lte,
+            limit=pagination.fetch_limit,
+            after=pagination.after,
+            fields=fields,
+            sort=sort,
+            load_vehicles=expand == "vehicles",
+            priority=Priority.SCAN,
+            handled=(ValueError,)
+        )
+    except ValueError as ve:
         raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="Unable to connect to the database: %s" % str(e)
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Invalid pagination parameters: %s" % str(ve)
         )
     if not drivers:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="There are no drivers in the database that meet the specified criteria."
         )
-    return [schemas.DriverDatabase(**jsonable_encoder(driver)) for driver in drivers]
+    total = await run_db(
+        crud.driver.count_filtered,
+        db,
+        gte=created_at.gte,
+        lte=created_at.lte,
+        estimated=count == "estimated",
+        priority=Priority.POINT_READ
+    )
+    response.headers["X-Total-Count"] = str(total)
+    drivers = deps.paginate(drivers, pagination=pagination, request=request, response=response, keys=keys)
+    if fields is not None:
+        return deps.sparse_response(drivers, fields=fields, schema=schemas.DriverDatabase, response=response)
+    return [driver_response(driver, expand=expand) for driver in drivers]
+
+
+@router.get(
+    path="/export/",
+    response_class=StreamingResponse,
+    summary="Export all drivers",
+    description="Stream all drivers from the database as newline delimited JSON (NDJSON)")
+async def export_drivers(
+    *,
+    db: Session = Depends(deps.get_read_db)
+) -> StreamingResponse:
+    """Export all drivers from the database, one JSON object per line.
+    The rows are read in batches by a single query, so the memory usage does not depend on the number of drivers.
+    """
+    batches = crud.driver.iter_batches(db, batch_size=settings.EXPORT_BATCH_SIZE)
+    return StreamingResponse(
+        deps.ndjson_stream(batches, schemas.DriverDatabase),
+        media_type="application/x-ndjson"
+    )
 
 
 @router.get(
@@ -54,23 +168,24 @@ async def get_drivers(
 async def get_driver_by_id(
     driver_id: PositiveInt = Path(..., title="Driver ID in the database"),
     *,
-    db: Session = Depends(deps.get_db)
+    fields: Optional[List[str]] = Depends(deps.get_fields(schemas.DriverDatabase)),
+    response: Response,
+    db: Session = Depends(deps.get_read_db)
 ) -> Any:
     """Get detailed information about the driver.
     :param driver_id: driver ID in the database
+    :param fields: comma-separated names of the returned fields (only they are read from the database)
     """
-    try:
-        driver = crud.driver.get(db, id=driver_id)
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="Unable to connect to the database: %s" % str(e)
-        )
+    driver = await run_db(
+        crud.driver.get, db, id=driver_id, fields=fields, priority=Priority.POINT_READ
+    )
     if not driver:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Driver with ID={driver_id} is not found in the database"
         )
+    if fields is not None:
+        return deps.sparse_response(driver, fields=fields, schema=schemas.DriverDatabase, response=response)
     return schemas.DriverDatabase(**jsonable_encoder(driver))
 
 
@@ -87,16 +202,36 @@ async def add_driver(
     """Add new driver to the database.
     :param driver_in: detailed information about the driver
     """
-    try:
-        driver = crud.driver.create(db, obj_in=driver_in)
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="Unable to connect to the database: %s" % str(e)
-        )
+    driver = await run_db(crud.driver.create, db, obj_in=driver_in, priority=Priority.WRITE)
     return schemas.DriverDatabase(**jsonable_encoder(driver))
 
 
+@router.post(
+    path="/driver/bulk/",
+    response_model=schemas.BulkCreated,
+    summary="Add many drivers",
+    description="Create many drivers in the database in a single transaction")
+async def add_drivers_bulk(
+    drivers_in: List[Any] = Body(..., title="Detailed information about each driver"),
+    *,
+    db: Session = Depends(deps.get_db)
+) -> Any:
+    """Add many new drivers to the database at once.
+    Invalid items are skipped and reported with their position in the list, the rest are added.
+    :param drivers_in: list of detailed information about the drivers
+    :return: IDs of the added drivers (in the order of the valid items) and errors of the invalid items
+    """
+    valid: List[schemas.DriverCreate] = []
+    errors: List[schemas.BulkItemError] = []
+    for index, item in enumerate(drivers_in):
+        try:
+            valid.append(schemas.DriverCreate.parse_obj(item))
+        except ValidationError as ve:
+            errors.append(schemas.BulkItemError(index=index, errors=ve.errors()))
+    created = await run_db(crud.driver.create_multi, db, objs_in=valid, priority=Priority.WRITE)
+    return schemas.BulkCreated(created=created, errors=errors)
+
+
 @router.patch(
     path="/driver/{driver_id}/",
     response_model=schemas.DriverDatabase,
@@ -106,32 +241,65 @@ async def update_driver(
     driver_id: PositiveInt = Path(..., title="Driver ID in the database"),
     driver_in: schemas.DriverUpdate = Body(..., title="New information about the driver"),
     *,
+    response: Response,
     db: Session = Depends(deps.get_db)
 ) -> Any:
     """Update the driver details.
     :param driver_id: driver ID in the database
-    :param driver_in: new details about the driver
+    :param driver_in: new details about the driver;
+    if the details are the same as in the database, nothing is written and the "X-Changed" header is "false"
     """
-    try:
-        driver = crud.driver.get(db, id=driver_id)
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="Unable to connect to the database: %s" % str(e)
-        )
-    if not driver:
+    updated_driver, changed = await run_db(
+        crud.driver.update_by_id, db, id=driver_id, obj_in=driver_in, priority=Priority.WRITE
+    )
+    if updated_driver is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Driver with ID={driver_id} is not found in the database"
         )
+    response.headers["X-Changed"] = "true" if changed else "false"
+    return schemas.DriverDatabase(**updated_driver._mapping)
+
+
+@router.delete(
+    path="/driver/bulk/",
+    response_model=schemas.BulkDeleted,
+    summary="Delete many drivers",
+    description="Remove the drivers with the specified IDs and/or registered in the date range")
+async def delete_drivers_bulk(
+    ids: Optional[List[PositiveInt]] = Body(default=None, title="Driver IDs in the database"),
+    created_at__gte: Optional[str] = Query(default=None, regex="^\d{1,2}-\d{1,2}-\d{4}$", title="Start date"),
+    created_at__lte: Optional[str] = Query(default=None, regex="^\d{1,2}-\d{1,2}-\d{4}$", title="End date"),
+    *,
+    db: Session = Depends(deps.get_db)
+) -> Any:
+    """Delete many drivers from the database at once, the drivers are removed from their vehicles.
+    :param ids: driver IDs in the database
+    :param created_at__gte: registration starting from this date (inclusive)
+    :param created_at__lte: registration before this date
+    :return: IDs of the removed drivers
+    """
     try:
-        updated_driver = crud.driver.update(db, db_obj=driver, obj_in=driver_in)
-    except Exception as e:
+        created_at = schemas.CreatedAt(gte=created_at__gte, lte=created_at__lte)
+    except (ValueError, ValidationError) as ve:
         raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="Unable to connect to the database: %s" % str(e)
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="The date must be in DD-MM-YYYY format: %s" % str(ve)
         )
-    return schemas.DriverDatabase(**jsonable_encoder(updated_driver))
+    if ids is None and created_at.gte is None and created_at.lte is None:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="The driver IDs or the registration dates must be specified"
+        )
+    deleted = await run_db(
+        crud.driver.remove_filtered,
+        db,
+        ids=ids,
+        gte=created_at.gte,
+        lte=created_at.lte,
+        priority=Priority.WRITE
+    )
+    return schemas.BulkDeleted(deleted=deleted)
 
 
 @router.delete(
@@ -148,13 +316,7 @@ async def delete_driver(
     :param driver_id: driver ID in the database
     :return: details of the removed driver
     """
-    try:
-        driver = crud.driver.remove(db, id=driver_id)
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="Unable to connect to the database: %s" % str(e)
-        )
+    driver = await run_db(crud.driver.remove, db, id=driver_id, priority=Priority.WRITE)
     if not driver:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -2,7 +2,9 @@ from fastapi import APIRouter, HTTPException, status
 from fastapi.responses import HTMLResponse
 from pathlib import Path
 from markdown import markdown
+from app import schemas
 from app.core.config import settings
+from app.db.executor import db_executor
 
 router = APIRouter()
 
@@ -34,3 +36,12 @@ async def index_page() -> HTMLResponse:
         "</html>"
     )
     return HTMLResponse(content=content, status_code=200)
+
+
+@router.get(
+    path="/stats/db_executor/",
+    response_model=schemas.ExecutorStats,
+    summary="Database executor statistics",
+    description="Get the queue depth and the waiting time of the database calls")
+async def db_executor_stats() -> schemas.ExecutorStats:
+    return db_executor.stats()
@@ -1,71 +1,208 @@
-from typing import Any, List, Literal, Optional
-from fastapi import APIRouter, Body, Depends, HTTPException, Query, Path, status
+from typing import Any, Dict, List, Literal, Optional, Union
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Path, Request, Response, status
 from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from pydantic import PositiveInt
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from app import crud, schemas
+from app import crud, models, schemas
 from app.api import deps
+from app.api.routing import UnitOfWorkRoute
+from app.crud.vehicle import SetDriverResult
+from app.core.config import settings
+from app.api.executor import run_db
+from app.db.executor import Priority
+from app.vehicle_import import ImportFormat, ImportFormatError, VehicleImporter
 
-router = APIRouter()
+router = APIRouter(route_class=UnitOfWorkRoute)
+
+CONTENT_TYPE_FORMATS: Dict[str, ImportFormat] = {
+    "text/csv": "csv",
+    "application/x-ndjson": "jsonl",
+    "application/jsonl": "jsonl",
+}
+
+
+def integrity_error(error: IntegrityError) -> HTTPException:
+    """Response to the changes of the vehicles violating the constraints of the database."""
+    if crud.vehicle.violates_unique(error, "ix_vehicles_plate_number"):
+        return HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Vehicle with the same plate number is already registered in the database"
+        )
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="The changes violate the constraints of the database: %s" % str(error.orig)
+    )
+
+
+def vehicle_response(vehicle: models.Vehicle, *, expand: Optional[str] = None) -> schemas.VehicleDatabase:
+    """Information about the vehicle with the details of the related records requested by the `expand` parameter
+    (they are loaded together with the vehicle, so no queries are made here)."""
+    if expand != "driver":
+        return schemas.VehicleDatabase(**jsonable_encoder(vehicle))
+    driver = schemas.DriverDatabase(**jsonable_encoder(vehicle.driver)) if vehicle.driver else None
+    return schemas.VehicleWithDriver(**jsonable_encoder(vars(vehicle), exclude={"driver"}), driver=driver)
 
 
 @router.get(
     path="/vehicle/",
-    response_model=List[schemas.VehicleDatabase],
+    response_model=List[Union[schemas.VehicleWithDriver, schemas.VehicleDatabase]],
+    response_model_exclude_unset=True,
     summary="Get vehicles list",
-    description="The list of vehicles can be filtered based on the presence or absence of the driver")
+    description="The list of vehicles can be filtered based on the presence or absence of the driver "
+                "or requested by IDs")
 async def get_vehicles(
     with_drivers: Optional[Literal["yes", "no"]] = Query(None, title="Sign of the presence of the driver"),
+    expand: Optional[Literal["driver"]] = Query(None, title="Related record included in each vehicle"),
     *,
-    db: Session = Depends(deps.get_db)
+    ids: Optional[List[int]] = Depends(deps.get_ids),
+    fields: Optional[List[str]] = Depends(deps.get_fields(schemas.VehicleDatabase)),
+    sort: List[str] = Depends(deps.get_sort(crud.vehicle.sort_keys)),
+    pagination: schemas.Pagination = Depends(deps.get_pagination),
+    request: Request,
+    response: Response,
+    db: Session = Depends(deps.get_read_db)
 ) -> Any:
     """Get a filtered list of the vehicles.
     :param with_drivers: a sign of the presence or absence of a driver in the vehicle
+    :param expand: "driver" to include the details of the driver in each vehicle
+    :param ids: comma-separated IDs of the vehicles requested at once (without the filter and the pagination),
+    the vehicles are returned in the same order and the IDs which are not found in the "X-Not-Found" header
+    :param fields: comma-separated names of the returned fields (only they are read from the database)
+    :param sort: comma-separated sort keys (the name of the column with the "-" prefix in descending order),
+    e.g. "-created_at,plate_number"; the vehicles are sorted by ID by default
+    :param pagination: number of vehicles on the page and the cursor of the previous page;
+    the link to the next page is returned in the "Link" header,
+    the total number of vehicles is returned in the "X-Total-Count" header
     """
+    if fields is not None and expand is not None:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="The fields can not be combined with the related records"
+        )
+    if ids is not None:
+        if with_drivers is not None or sort or pagination.limit is not None:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="The list of IDs can not be combined with the filter, the sorting and the pagination"
+            )
+        vehicles, not_found = await run_db(
+            crud.vehicle.get_many,
+            db,
+            ids=ids,
+            fields=fields,
+            load_driver=expand == "driver",
+            priority=Priority.POINT_READ
+        )
+        if not vehicles:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Vehicles with the requested IDs are not found in the database"
+            )
+        response.headers["X-Total-Count"] = str(len(vehicles))
+        if not_found:
+            response.headers["X-Not-Found"] = ",".join(str(id) for id in not_found)
+        if fields is not None:
+            return deps.sparse_response(vehicles, fields=fields, schema=schemas.VehicleDatabase, response=response)
+        return [vehicle_response(vehicle, expand=expand) for vehicle in vehicles]
+    with_driver = True if with_drivers == "yes" else False if with_drivers == "no" else None
+    # The key of the cursor is always returned as well as the ID
+    keys = crud.vehicle.cursor_keys(sort)
+    if fields is not None:
+        fields = list(dict.fromkeys([*fields, *keys]))
     try:
-        vehicles = crud.vehicle.get_filtered(
+        vehicles = await run_db(
+            crud.vehicle.get_filtered,
             db,
-            with_driver=True if with_drivers == "yes" else False if with_drivers == "no" else None
+            with_driver=with_driver,
+            limit=pagination.fetch_limit,
+            after=pagination.after,
+            fields=fields,
+            sort=sort,
+            load_driver=expand == "driver",
+            priority=Priority.SCAN,
+            handled=(ValueError,)
         )
-    except Exception as e:
+    except ValueError as ve:
         raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="Unable to connect to the database: %s" % str(e)
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Invalid pagination parameters: %s" % str(ve)
         )
     if not vehicles:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="There are no vehicles in the database that meet the specified criteria"
         )
-    return [schemas.VehicleDatabase(**jsonable_encoder(vehicle)) for vehicle in vehicles]
+    total = await run_db(
+        crud.vehicle.count_filtered, db, with_driver=with_driver, priority=Priority.POINT_READ
+    )
+    response.headers["X-Total-Count"] = str(total)
+    vehicles = deps.paginate(vehicles, pagination=pagination, request=request, response=response, keys=keys)
+    if fields is not None:
+        return deps.sparse_response(vehicles, fields=fields, schema=schemas.VehicleDatabase, response=response)
+    return [vehicle_response(vehicle, expand=expand) for vehicle in vehicles]
+
+
+@router.get(
+    path="/export/",
+    response_class=StreamingResponse,
+    summary="Export all vehicles",
+    description="Stream all vehicles from the database as newline delimited JSON (NDJSON)")
+async def export_vehicles(
+    *,
+    db: Session = Depends(deps.get_read_db)
+) -> StreamingResponse:
+    """Export all vehicles from the database, one JSON object per line.
+    The rows are read in batches by a single query, so the memory usage does not depend on the number of vehicles.
+    """
+    batches = crud.vehicle.iter_batches(db, batch_size=settings.EXPORT_BATCH_SIZE)
+    return StreamingResponse(
+        deps.ndjson_stream(batches, schemas.VehicleDatabase),
+        media_type="application/x-ndjson"
+    )
 
 
 @router.get(
     path="/vehicle/{vehicle_id}/",
-    response_model=schemas.VehicleDatabase,
+    response_model=Union[schemas.VehicleWithDriver, schemas.VehicleDatabase],
+    response_model_exclude_unset=True,
     summary="Vehicle information",
     description="Get detailed information about a particular vehicle by its ID")
 async def get_vehicle_by_id(
     vehicle_id: PositiveInt = Path(..., title="Vehicle ID in the database"),
+    expand: Optional[Literal["driver"]] = Query(None, title="Related record included in the vehicle"),
     *,
-    db: Session = Depends(deps.get_db)
+    fields: Optional[List[str]] = Depends(deps.get_fields(schemas.VehicleDatabase)),
+    response: Response,
+    db: Session = Depends(deps.get_read_db)
 ) -> Any:
     """Get detailed information about the vehicle.
     :param vehicle_id: vehicle ID in the database
+    :param expand: "driver" to include the details of the driver
+    :param fields: comma-separated names of the returned fields (only they are read from the database)
     """
-    try:
-        vehicle = crud.vehicle.get(db, id=vehicle_id)
-    except Exception as e:
+    if fields is not None and expand is not None:
         raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="Unable to connect to the database: %s" % str(e)
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="The fields can not be combined with the related records"
         )
+    vehicle = await run_db(
+        crud.vehicle.get,
+        db,
+        id=vehicle_id,
+        fields=fields,
+        load_driver=expand == "driver",
+        priority=Priority.POINT_READ
+    )
     if not vehicle:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Vehicle with ID={vehicle_id} is not found in the database"
         )
-    return schemas.VehicleDatabase(**jsonable_encoder(vehicle))
+    if fields is not None:
+        return deps.sparse_response(vehicle, fields=fields, schema=schemas.VehicleDatabase, response=response)
+    return vehicle_response(vehicle, expand=expand)
 
 
 @router.post(
@@ -82,15 +219,85 @@ async def add_vehicle(
     :param vehicle_in: information about the vehicle to be added to the database
     """
     try:
-        vehicle = crud.vehicle.create(db, obj_in=vehicle_in)
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="Unable to connect to the database: %s" % str(e)
+        vehicle = await run_db(
+            crud.vehicle.create, db, obj_in=vehicle_in, priority=Priority.WRITE, handled=(IntegrityError,)
         )
+    except IntegrityError as e:
+        raise integrity_error(e)
     return schemas.VehicleDatabase(**jsonable_encoder(vehicle))
 
 
+@router.post(
+    path="/import/",
+    response_model=schemas.ImportSummary,
+    summary="Import vehicles",
+    description="Import vehicles from CSV or JSON lines in the request body (optionally gzip-encoded)")
+async def import_vehicles(
+    format: Optional[ImportFormat] = Query(None, title="Format of the data (by default by the Content-Type)"),
+    *,
+    request: Request,
+    db: Session = Depends(deps.get_db)
+) -> Any:
+    """Import vehicles from the request body which is parsed while it is being received.
+    Rows are validated and inserted in batches, invalid rows and plate numbers
+    which are already registered are skipped.
+    :param format: "csv" (with the header row) or "jsonl", by default it is taken from
+    the Content-Type header ("text/csv" or "application/x-ndjson");
+    the body compressed with gzip must be sent with the "Content-Encoding: gzip" header
+    :return: number of inserted, rejected and duplicate rows and the first validation errors
+    """
+    content_type = request.headers.get("Content-Type", "").split(";")[0].strip()
+    format = format or CONTENT_TYPE_FORMATS.get(content_type)
+    if format is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="The format of the data must be specified by the Content-Type header or the 'format' parameter"
+        )
+    gzipped = request.headers.get("Content-Encoding", "").lower() == "gzip"
+    importer = VehicleImporter(db, format=format, gzipped=gzipped, batch_size=settings.IMPORT_BATCH_SIZE)
+    try:
+        async for data in request.stream():
+            await run_db(importer.feed, data, priority=Priority.WRITE, handled=(ImportFormatError,))
+        return await run_db(importer.close, priority=Priority.WRITE, handled=(ImportFormatError,))
+    except ImportFormatError as ife:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Unable to parse the data: %s (%d rows were inserted before the error)" % (
+                str(ife), importer.summary.inserted
+            )
+        )
+
+
+@router.patch(
+    path="/vehicle/bulk/",
+    response_model=schemas.BulkUpdated,
+    summary="Update many vehicles",
+    description="Update details of many vehicles in a single transaction")
+async def update_vehicles_bulk(
+    vehicles_in: List[schemas.VehicleBulkUpdate] = Body(..., title="ID and new information of each vehicle"),
+    *,
+    db: Session = Depends(deps.get_db)
+) -> Any:
+    """Update many vehicles in the database at once.
+    :param vehicles_in: list of the vehicle IDs with the new information (empty values are ignored)
+    :return: IDs of the updated vehicles and IDs of the vehicles which are not found in the database
+    """
+    updates = [
+        (vehicle_in.id, {
+            field: value for field, value in vehicle_in.dict(exclude_unset=True, exclude={"id"}).items()
+            if value is not None
+        })
+        for vehicle_in in vehicles_in
+    ]
+    try:
+        updated, not_found = await run_db(
+            crud.vehicle.update_multi, db, updates=updates, priority=Priority.WRITE, handled=(IntegrityError,)
+        )
+    except IntegrityError as e:
+        raise integrity_error(e)
+    return schemas.BulkUpdated(updated=updated, not_found=not_found)
+
+
 @router.patch(
     path="/vehicle/{vehicle_id}/",
     response_model=schemas.VehicleDatabase,
@@ -100,32 +307,64 @@ async def update_vehicle(
     vehicle_id: PositiveInt = Path(..., title="Vehicle ID in the database"),
     vehicle_in: schemas.VehicleUpdate = Body(..., title="New vehicle information"),
     *,
+    response: Response,
     db: Session = Depends(deps.get_db)
 ) -> Any:
     """Update vehicle details in the database.
     :param vehicle_id: vehicle ID in the database
-    :param vehicle_in: new vehicle information to be updated in the database
+    :param vehicle_in: new vehicle information to be updated in the database;
+    if the information is the same as in the database, nothing is written and the "X-Changed" header is "false"
     """
     try:
-        vehicle = crud.vehicle.get(db, id=vehicle_id)
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="Unable to connect to the database: %s" % str(e)
+        updated_vehicle, changed = await run_db(
+            crud.vehicle.update_by_id,
+            db,
+            id=vehicle_id,
+            obj_in=vehicle_in,
+            exclude_empty=True,
+            priority=Priority.WRITE,
+            handled=(IntegrityError,)
         )
-    if not vehicle:
+    except IntegrityError as e:
+        raise integrity_error(e)
+    if updated_vehicle is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Vehicle with ID={vehicle_id} is not found in the database"
         )
-    try:
-        updated_vehicle = crud.vehicle.update(db, db_obj=vehicle, obj_in=vehicle_in, exclude_empty=True)
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="Unable to connect to the database: %s" % str(e)
-        )
-    return schemas.VehicleDatabase(**jsonable_encoder(updated_vehicle))
+    response.headers["X-Changed"] = "true" if changed else "false"
+    return schemas.VehicleDatabase(**updated_vehicle._mapping)
+
+
+@router.post(
+    path="/set_driver/",
+    response_model=schemas.BulkAssigned,
+    summary="Put the drivers in many vehicles",
+    description="Set or remove the drivers from many vehicles in a single transaction")
+async def set_drivers_in_vehicles(
+    assignments: List[schemas.DriverAssignment] = Body(..., title="Pairs of the vehicle ID and the driver ID"),
+    *,
+    db: Session = Depends(deps.get_db)
+) -> Any:
+    """Put or remove the drivers from many vehicles at once.
+    :param assignments: pairs of the vehicle ID and the driver ID,
+    to remove the driver from the vehicle it is necessary to pass the None as the driver ID;
+    the pairs with the vehicle or the driver which do not exist are skipped.
+    :return: IDs of the updated vehicles and the skipped pairs with the reason
+    """
+    assigned, skipped = await run_db(
+        crud.vehicle.set_drivers,
+        db,
+        assignments=[(item.vehicle_id, item.driver_id) for item in assignments],
+        priority=Priority.WRITE
+    )
+    return schemas.BulkAssigned(
+        assigned=assigned,
+        skipped=[
+            schemas.SkippedAssignment(vehicle_id=vehicle_id, driver_id=driver_id, reason=reason)
+            for vehicle_id, driver_id, reason in skipped
+        ]
+    )
 
 
 @router.post(
@@ -137,36 +376,59 @@ async def set_driver_in_vehicle(
     vehicle_id: PositiveInt = Path(..., title="Vehicle ID in the database"),
     data_in: schemas.DriverID = Body(..., title="Driver ID in the database"),
     *,
+    response: Response,
     db: Session = Depends(deps.get_db)
 ) -> Any:
     """Put or remove the driver from the vehicle.
     :param vehicle_id: vehicle ID in the database
     :param data_in: driver ID in the database,
     to remove the driver from the vehicle it is necessary to pass the None or empty body of the request;
-    if the driver with the specified ID does not exist, then the properties of the vehicle remain unchanged.
+    if the driver with the specified ID does not exist, then the properties of the vehicle remain unchanged
+    and the "X-Driver-Not-Found" header is returned; the "X-Changed" header shows if the vehicle is changed.
     """
-    try:
-        vehicle = crud.vehicle.get(db, id=vehicle_id)
-        driver = crud.driver.get(db, id=data_in.driver_id)
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="Unable to connect to the database: %s" % str(e)
-        )
-    if not vehicle:
+    vehicle, result = await run_db(
+        crud.vehicle.set_driver, db, id=vehicle_id, driver_id=data_in.driver_id, priority=Priority.WRITE
+    )
+    if result == SetDriverResult.VEHICLE_NOT_FOUND:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Vehicle with ID={vehicle_id} is not found in the database"
         )
-    if driver is not None or data_in.driver_id is None:
-        try:
-            vehicle = crud.vehicle.update(db, db_obj=vehicle, obj_in={"driver_id": data_in.driver_id})
-        except Exception as e:
-            raise HTTPException(
-                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                detail="Unable to connect to the database: %s" % str(e)
-            )
-    return schemas.VehicleDatabase(**jsonable_encoder(vehicle))
+    if result == SetDriverResult.DRIVER_NOT_FOUND:
+        response.headers["X-Driver-Not-Found"] = str(data_in.driver_id)
+    response.headers["X-Changed"] = "true" if result == SetDriverResult.ASSIGNED else "false"
+    return schemas.VehicleDatabase(**vehicle._mapping)
+
+
+@router.delete(
+    path="/vehicle/bulk/",
+    response_model=schemas.BulkDeleted,
+    summary="Delete many vehicles",
+    description="Remove the vehicles with the specified IDs and/or filtered by the presence of the driver")
+async def delete_vehicles_bulk(
+    ids: Optional[List[PositiveInt]] = Body(default=None, title="Vehicle IDs in the database"),
+    with_drivers: Optional[Literal["yes", "no"]] = Query(None, title="Sign of the presence of the driver"),
+    *,
+    db: Session = Depends(deps.get_db)
+) -> Any:
+    """Delete many vehicles from the database at once.
+    :param ids: vehicle IDs in the database
+    :param with_drivers: a sign of the presence or absence of a driver in the vehicle
+    :return: IDs of the removed vehicles
+    """
+    if ids is None and with_drivers is None:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="The vehicle IDs or the sign of the presence of the driver must be specified"
+        )
+    deleted = await run_db(
+        crud.vehicle.remove_filtered,
+        db,
+        ids=ids,
+        with_driver=True if with_drivers == "yes" else False if with_drivers == "no" else None,
+        priority=Priority.WRITE
+    )
+    return schemas.BulkDeleted(deleted=deleted)
 
 
 @router.delete(
@@ -183,13 +445,7 @@ async def delete_vehicle(
     :param vehicle_id: vehicle ID in the database
     :return: details of the removed vehicle
     """
-    try:
-        vehicle = crud.vehicle.remove(db, id=vehicle_id)
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="Unable to connect to the database: %s" % str(e)
-        )
+    vehicle = await run_db(crud.vehicle.remove, db, id=vehicle_id, priority=Priority.WRITE)
     if not vehicle:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -1,12 +1,196 @@
-from typing import Generator
+from typing import (
+    Any, AsyncIterator, Callable, Generator, Iterator, List, Optional, Sequence, Type, Union
+)
+from fastapi import HTTPException, Query, Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, ValidationError
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
-from app.db.session import SessionLocal
+from app import schemas
+from app.api.routing import is_pinned_to_primary
+from app.core.config import settings
+from app.db.executor import Priority, db_executor
+from app.db.session import ReadSessionLocal, SessionLocal
 
 
-def get_db() -> Generator:
-    """Return a database session and close it when the operation is complete."""
+def get_db(request: Request) -> Generator:
+    """Return a database session of the request (unit of work) and close it when the operation is complete.
+    The changes are committed once by the `UnitOfWorkRoute` before the response is sent,
+    everything that is not committed is rolled back when the session is closed.
+    """
     try:
         db: Session = SessionLocal()
+        request.state.db = db
         yield db
     finally:
         db.close()
+
+
+def get_read_db(request: Request) -> Generator:
+    """Return a database session of the read-only request: the data is read from a replica,
+    or from the primary database if the client has recently changed the data, and close it at the end.
+    """
+    try:
+        db: Session = ReadSessionLocal(use_primary=is_pinned_to_primary(request))
+        request.state.db = db
+        yield db
+    finally:
+        db.close()
+
+
+def get_ids(
+    ids: Optional[str] = Query(
+        default=None, regex="^\d+(,\d+)*$", title="Comma-separated IDs of the requested records"
+    )
+) -> Optional[List[int]]:
+    """Get the IDs of the records requested from the list at once (without repetitions)."""
+    if ids is None:
+        return None
+    unique_ids = list(dict.fromkeys(int(id) for id in ids.split(",")))
+    if len(unique_ids) > settings.MULTI_GET_MAX_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"No more than {settings.MULTI_GET_MAX_IDS} IDs can be requested at once"
+        )
+    return unique_ids
+
+
+def get_fields(schema: Type[BaseModel]) -> Callable[..., Optional[List[str]]]:
+    """Create the dependency getting the sparse fieldset: the names of the fields of the schema
+    which are read from the database and returned (the ID is always included, it is the key of the pagination).
+    :param schema: schema of the full record
+    """
+    def get_schema_fields(
+        fields: Optional[str] = Query(
+            default=None, regex="^\w+(,\w+)*$", title="Comma-separated names of the returned fields"
+        )
+    ) -> Optional[List[str]]:
+        if fields is None:
+            return None
+        names = list(dict.fromkeys(["id", *fields.split(",")]))
+        unknown = [name for name in names if name not in schema.__fields__]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Unknown fields: %s" % ", ".join(unknown)
+            )
+        return names
+
+    return get_schema_fields
+
+
+def get_sort(keys: Sequence[str]) -> Callable[..., List[str]]:
+    """Create the dependency getting the sort keys of the list.
+    :param keys: names of the columns the list can be sorted by (backed by the indexes, see `CRUDBase.sort_keys`)
+    """
+    def get_sort_keys(
+        sort: Optional[str] = Query(
+            default=None, regex="^-?\w+(,-?\w+)*$",
+            title="Comma-separated sort keys: " + ", ".join(keys) + " (with the \"-\" prefix in descending order)"
+        )
+    ) -> List[str]:
+        if sort is None:
+            return []
+        sort_keys = sort.split(",")
+        names = [key.lstrip("-") for key in sort_keys]
+        if any(name not in keys for name in names):
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="The list can be sorted only by %s" % ", ".join(keys)
+            )
+        if len(set(names)) != len(names):
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="The sort keys must not repeat the columns"
+            )
+        return sort_keys
+
+    return get_sort_keys
+
+
+def sparse_response(
+    records: Union[Any, List[Any]],
+    *,
+    fields: List[str],
+    schema: Type[BaseModel],
+    response: Response
+) -> JSONResponse:
+    """Return only the selected fields of the records without building and validating the full schemas.
+    :param records: row or the list of rows with the selected columns
+    :param fields: names of the returned fields
+    :param schema: schema of the full record, its encoders are used for the values of the fields
+    :param response: response of the endpoint with the headers already set (e.g. "Link", "X-Total-Count")
+    """
+    def encode(record: Any) -> Any:
+        return {name: getattr(record, name) for name in fields}
+
+    content = [encode(record) for record in records] if isinstance(records, list) else encode(records)
+    headers = {name: value for name, value in response.headers.items() if name != "content-length"}
+    return JSONResponse(
+        jsonable_encoder(content, custom_encoder=schema.__config__.json_encoders), headers=headers
+    )
+
+
+def get_pagination(
+    limit: Optional[int] = Query(
+        default=None, ge=1, le=settings.PAGE_MAX_LIMIT, title="Maximum number of records on the page"
+    ),
+    after: Optional[str] = Query(default=None, title="Cursor of the last record of the previous page"),
+) -> schemas.Pagination:
+    """Get the parameters of the keyset (cursor) pagination of the list.
+    Without both parameters the list is not paginated;
+    the cursor without the limit returns the page of the default size.
+    """
+    try:
+        pagination = schemas.Pagination(limit=limit, after=after)
+    except ValidationError as ve:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Invalid pagination parameters: %s" % str(ve)
+        )
+    if pagination.after is not None and pagination.limit is None:
+        pagination.limit = settings.PAGE_DEFAULT_LIMIT
+    return pagination
+
+
+def paginate(
+    items: List[Any],
+    *,
+    pagination: schemas.Pagination,
+    request: Request,
+    response: Response,
+    keys: Sequence[str] = ("id",)
+) -> List[Any]:
+    """Cut off the extra record requested to check for the next page
+    and add the link to the next page to the response headers.
+    :param items: records received with the `fetch_limit` of the pagination
+    :param keys: names of the fields of the key of the cursor in the order of the list
+    :return: records of the current page
+    """
+    if pagination.limit is None or len(items) <= pagination.limit:
+        return items
+    items = items[:pagination.limit]
+    cursor = schemas.Pagination.encode_cursor([getattr(items[-1], key) for key in keys])
+    url = request.url.include_query_params(limit=pagination.limit, after=cursor)
+    response.headers["Link"] = f'<{url}>; rel="next"'
+    return items
+
+
+async def ndjson_stream(
+    batches: Iterator[List[Row]],
+    schema: Type[BaseModel]
+) -> AsyncIterator[str]:
+    """Convert the batches of rows to the newline delimited JSON (NDJSON),
+    each batch is read from the database in the DB executor.
+    :param batches: iterator over the batches of rows from the database
+    :param schema: schema used to serialize each row
+    """
+    try:
+        while True:
+            batch = await db_executor.run(next, batches, None, priority=Priority.SCAN)
+            if batch is None:
+                break
+            yield "".join(schema(**row._mapping).json() + "\n" for row in batch)
+    finally:
+        await db_executor.run(batches.close, priority=Priority.SCAN)  # type: ignore
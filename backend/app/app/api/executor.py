@@ -0,0 +1,31 @@
+from typing import Any, Callable, Tuple, Type, TypeVar
+from fastapi import HTTPException, status
+from app.db.executor import ExecutorOverloaded, Priority, db_executor
+
+T = TypeVar("T")
+
+
+async def run_db(
+    func: Callable[..., T],
+    *args: Any,
+    priority: Priority = Priority.SCAN,
+    handled: Tuple[Type[Exception], ...] = (),
+    **kwargs: Any
+) -> T:
+    """Execute the database call of the endpoint in the DB executor.
+    Any error of the call is returned as the 503 response, except the overload of the executor
+    (the 503 response with the "Retry-After" header, see `app.main`) and the exceptions handled by the endpoint.
+    :param func: function that makes calls to the database
+    :param priority: position of the call in the queue of the executor
+    :param handled: exceptions passed to the endpoint, e.g. `IntegrityError`
+    :return: result of the function
+    """
+    try:
+        return await db_executor.run(func, *args, priority=priority, **kwargs)
+    except (ExecutorOverloaded, *handled):
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Unable to connect to the database: %s" % str(e)
+        )
@@ -0,0 +1,57 @@
+from typing import Callable, Coroutine, Optional
+import time
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+from app.api.executor import run_db
+from app.core.config import settings
+from app.db.executor import Priority
+
+# Methods of the requests that do not change the data, so there is nothing to commit
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+# Cookie and header with the time (UNIX timestamp) until which the client reads from the primary database
+PRIMARY_PIN_COOKIE = "primary_until"
+PRIMARY_PIN_HEADER = "X-Primary-Until"
+
+
+def pin_to_primary(response: Response) -> None:
+    """Let the client read from the primary database for a while after its changes,
+    until they are replicated (read-your-writes). The browsers return the cookie,
+    other clients can send the value of the header back in the request header of the same name.
+    """
+    if settings.DB_PRIMARY_PIN_SECONDS <= 0:
+        return
+    until = str(int(time.time()) + settings.DB_PRIMARY_PIN_SECONDS)
+    response.set_cookie(PRIMARY_PIN_COOKIE, until, max_age=settings.DB_PRIMARY_PIN_SECONDS, httponly=True)
+    response.headers[PRIMARY_PIN_HEADER] = until
+
+
+def is_pinned_to_primary(request: Request) -> bool:
+    """The client has recently changed the data and should read from the primary database."""
+    value: Optional[str] = request.headers.get(PRIMARY_PIN_HEADER) or request.cookies.get(PRIMARY_PIN_COOKIE)
+    try:
+        return value is not None and int(value) >= time.time()
+    except ValueError:
+        return False
+
+
+class UnitOfWorkRoute(APIRoute):
+    """Route that commits the request-scoped database session (unit of work) once,
+    after the endpoint has successfully completed and before the response is sent.
+    The CRUD methods only flush the changes; if the endpoint fails or returns an error,
+    nothing is committed and the changes are rolled back when the session is closed by `deps.get_db`.
+    After the commit the client is pinned to the primary database (see `pin_to_primary`).
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[None, None, Response]]:
+        handler = super().get_route_handler()
+
+        async def unit_of_work_handler(request: Request) -> Response:
+            response = await handler(request)
+            db = getattr(request.state, "db", None)
+            if db is None or request.method in SAFE_METHODS or response.status_code >= 400:
+                return response
+            await run_db(db.commit, priority=Priority.WRITE)
+            pin_to_primary(response)
+            return response
+
+        return unit_of_work_handler
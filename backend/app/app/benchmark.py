@@ -0,0 +1,65 @@
+from typing import Any, Callable, List
+import argparse
+import timeit
+from datetime import date, datetime
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+from app import crud, models
+from app.db.base import Base
+
+
+def legacy_get(db: Session, id: int) -> Any:
+    """Query of the driver by ID built from scratch on each call (before the cached statements)."""
+    return db.query(models.Driver).filter(models.Driver.id == id).first()
+
+
+def legacy_get_filtered(db: Session, *, gte: date, limit: int, after: int) -> List[Any]:
+    """Chain of the query of the filtered page built from scratch on each call (before the lambda statements)."""
+    return (
+        db.query(models.Driver)
+        .filter(models.Driver.created_at >= datetime.fromordinal(gte.toordinal()))
+        .order_by(models.Driver.id)
+        .filter(models.Driver.id > after)
+        .limit(limit)
+        .all()
+    )
+
+
+def measure(db: Session, func: Callable[[], Any], number: int) -> float:
+    """Minimum time of a single call in microseconds (the identity map is cleared after each call)."""
+    def call() -> None:
+        func()
+        db.expunge_all()
+    return min(timeit.repeat(call, number=number, repeat=5)) / number * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Per-call overhead of the CRUD read queries")
+    parser.add_argument("--drivers", type=int, default=1000, help="number of drivers in the database")
+    parser.add_argument("--number", type=int, default=2000, help="number of calls in each measurement")
+    args = parser.parse_args()
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = Session(bind=engine)
+    db.add_all(models.Driver(first_name=f"First{i}", last_name=f"Last{i}") for i in range(args.drivers))
+    db.commit()
+    id = args.drivers // 2
+    today = date.today()
+    cases = [
+        ("get", lambda: legacy_get(db, id), lambda: crud.driver.get(db, id=id)),
+        (
+            "get_filtered",
+            lambda: legacy_get_filtered(db, gte=today, limit=20, after=id),
+            lambda: crud.driver.get_filtered(db, gte=today, limit=20, after=[id]),
+        ),
+    ]
+    print(f"{'query':<16}{'before, us':>12}{'after, us':>12}{'speedup':>10}")
+    for name, before, after in cases:
+        before_time, after_time = measure(db, before, args.number), measure(db, after, args.number)
+        print(f"{name:<16}{before_time:>12.1f}{after_time:>12.1f}{before_time / after_time:>9.2f}x")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
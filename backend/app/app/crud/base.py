@@ -1,18 +1,37 @@
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
+from typing import Any, Dict, Generic, Iterator, List, Optional, Sequence, Set, Tuple, Type, TypeVar, Union
+from datetime import datetime
+import json
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
+from sqlalchemy import and_, bindparam, delete, func, insert, inspect, lambda_stmt, or_, select, update
+from sqlalchemy.engine import Row
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
+from sqlalchemy.sql.lambdas import StatementLambdaElement
+from sqlalchemy.orm.util import identity_key
+from sqlalchemy.sql import Select
 from app.db.base_class import Base
+from app.models import Counter
 
 ModelType = TypeVar("ModelType", bound=Base)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
+# Maximum number of rows in one multi-row statement (limited by the number of bound parameters)
+BULK_CHUNK_SIZE = 500
+
+# Query of the objects or of the selected columns (see `CRUDBase._paginate`)
+StatementType = TypeVar("StatementType", Select, StatementLambdaElement)
+
 
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     """Basic operations on models in the database:
     Create, Read, Update, Delete (CRUD)
+    The methods only flush the changes, the transaction is committed by the caller
+    (once per request by the routes of the API, see `app.api.routing.UnitOfWorkRoute`).
     """
+    # Columns the lists can be sorted by, each of them is the leading column of an index of the table
+    sort_keys: Tuple[str, ...] = ("id",)
 
     def __init__(self, model: Type[ModelType]):
         """CRUD object with default methods to Create, Read, Update, Delete (CRUD).
@@ -21,24 +40,68 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         * `schema`: A Pydantic model (schema) class
         """
         self.model = model
+        # The statement of the most frequent query is built once, only the ID is passed on each call
+        self._get_statement = select(model).where(model.id == bindparam("id"))
+        self._get_many_statement = select(model).where(model.id.in_(bindparam("ids", expanding=True)))
 
     def get(
         self,
         db: Session,
-        id: Any
-    ) -> Optional[ModelType]:
-        """Get object from database by its ID."""
-        return db.query(self.model).filter(self.model.id == id).first()
+        id: Any,
+        *,
+        fields: Optional[Sequence[str]] = None
+    ) -> Optional[Union[ModelType, Row]]:
+        """Get object from database by its ID.
+        :param fields: names of the columns to read, the row with only these columns is returned (not the object)
+        """
+        if fields is not None:
+            return db.execute(self._select_fields(fields).where(self.model.id == id)).first()
+        return db.execute(self._get_statement, {"id": id}).scalars().first()
+
+    def get_many(
+        self,
+        db: Session,
+        *,
+        ids: Sequence[int],
+        fields: Optional[Sequence[str]] = None
+    ) -> Tuple[List[Union[ModelType, Row]], List[int]]:
+        """Get the objects by the list of IDs with one query for each chunk of the list.
+        :param ids: IDs of the objects
+        :param fields: names of the columns to read, the rows with only these columns are returned
+        :return: found objects in the order of the IDs and the IDs which are not found
+        """
+        if fields is not None:
+            statement = self._select_fields(fields).where(self.model.id.in_(bindparam("ids", expanding=True)))
+            return self._get_many(db, statement, ids=ids, rows=True)
+        return self._get_many(db, self._get_many_statement, ids=ids)
 
     def get_multi(
         self,
         db: Session,
         *,
         skip: int = 0,
-        limit: int = 100
+        limit: int = 100,
+        after: Optional[Sequence[Any]] = None
     ) -> List[ModelType]:
-        """Get a certain number of objects from the database."""
-        return db.query(self.model).offset(skip).limit(limit).all()
+        """Get a certain number of objects from the database.
+        :param skip: number of the first objects to skip (OFFSET, the cost grows with the value)
+        :param limit: maximum number of objects
+        :param after: key of the last object of the previous page (used instead of `skip`)
+        """
+        model = self.model
+        statement = self._paginate(lambda_stmt(lambda: select(model)), limit=limit, after=after)
+        if after is None:
+            statement += lambda s: s.offset(skip)
+        return db.execute(statement).scalars().all()
+
+    def cursor_keys(
+        self,
+        sort: Sequence[str] = ()
+    ) -> List[str]:
+        """Get the names of the columns of the key of the pagination cursor in the sorted list.
+        :param sort: sort keys, e.g. ["-created_at", "plate_number"]
+        """
+        return [column.key for column, descending in self._order_by(sort)]
 
     def create(
         self,
@@ -50,10 +113,35 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         obj_in_data = jsonable_encoder(obj_in)
         db_obj = self.model(**obj_in_data)  # type: ignore
         db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+        db.flush()
         return db_obj
 
+    def create_multi(
+        self,
+        db: Session,
+        *,
+        objs_in: Sequence[CreateSchemaType]
+    ) -> List[int]:
+        """Add many new objects to the database.
+        Where the database supports RETURNING, the objects are inserted by multi-row INSERT statements,
+        otherwise they are flushed by the session one by one.
+        :param objs_in: objects to be added
+        :return: IDs of the added objects in the same order
+        """
+        rows = [obj_in.dict() for obj_in in objs_in]
+        if self._supports_returning(db):
+            table = self.model.__table__
+            ids: List[int] = []
+            for i in range(0, len(rows), BULK_CHUNK_SIZE):
+                stmt = insert(table).values(rows[i:i + BULK_CHUNK_SIZE]).returning(table.c.id)
+                ids.extend(db.execute(stmt).scalars().all())
+        else:
+            db_objs = [self.model(**row) for row in rows]  # type: ignore
+            db.add_all(db_objs)
+            db.flush()
+            ids = [db_obj.id for db_obj in db_objs]
+        return ids
+
     def update(
         self,
         db: Session,
@@ -68,21 +156,86 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         :param obj_in: data to update
         :param exclude_empty: ignore empty values ​​when updating
         """
-        obj_data = jsonable_encoder(db_obj)
-        if isinstance(obj_in, Dict):
-            update_data: Dict[str, Any] = obj_in
-        else:
-            update_data = obj_in.dict(exclude_unset=True)
-        for field in obj_data:
-            if field in update_data:
-                if exclude_empty and update_data[field] is None:
-                    continue
-                setattr(db_obj, field, update_data[field])
+        if not self._set_attributes(db_obj, obj_in, exclude_empty=exclude_empty):
+            # Nothing is written when the values are not changed
+            return db_obj
+        stale = self._get_stale_relationships(db_obj)
         db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+        db.flush()
+        if stale:
+            db.expire(db_obj, stale)
         return db_obj
 
+    def update_by_id(
+        self,
+        db: Session,
+        *,
+        id: int,
+        obj_in: Union[UpdateSchemaType, Dict[str, Any]],
+        exclude_empty: bool = False
+    ) -> Tuple[Optional[Row], bool]:
+        """Update the object without loading it by a single UPDATE ... WHERE id=:id RETURNING statement
+        (where RETURNING is not supported, the updated row is selected after the update).
+        :param id: ID of the object
+        :param obj_in: data to update (only the fields set in the schema are updated)
+        :param exclude_empty: ignore empty values when updating
+        :return: row of the table (None if the object is not found) and the sign that it has been changed;
+        the row is not written when all values are the same as in the database
+        """
+        table = self.model.__table__
+        values = obj_in if isinstance(obj_in, Dict) else obj_in.dict(exclude_unset=True)
+        values = {
+            field: value for field, value in values.items()
+            if field in table.c and not (exclude_empty and value is None)
+        }
+        query = select(table).where(table.c.id == id)
+        if not values:
+            return db.execute(query).first(), False
+        # The row is written only if any of the values differs from the stored one
+        changed = or_(*[table.c[field].is_distinct_from(value) for field, value in values.items()])
+        stmt = update(table).where(table.c.id == id, changed).values(values)
+        if self._supports_returning(db):
+            row = db.execute(stmt.returning(*table.c)).first()
+        else:
+            row = db.execute(query).first() if db.execute(stmt).rowcount else None
+        if row is None:
+            # The object is not found or its values are not changed
+            return db.execute(query).first(), False
+        self._expire_loaded(db, id=id)
+        return row, True
+
+    def update_multi(
+        self,
+        db: Session,
+        *,
+        updates: Sequence[Tuple[int, Dict[str, Any]]]
+    ) -> Tuple[List[int], List[int]]:
+        """Update many objects without loading them.
+        Objects with the same changes are updated by a single UPDATE ... WHERE id IN (...) statement.
+        :param updates: pairs of the object ID and the new values of its fields
+        (if the ID is repeated, the last values are used)
+        :return: IDs of the updated objects and IDs which are not found in the database
+        """
+        changes: Dict[int, Dict[str, Any]] = dict(updates)
+        existing = self.get_existing_ids(db, ids=list(changes))
+        groups: Dict[Tuple[Tuple[str, Any], ...], List[int]] = {}
+        for id, values in changes.items():
+            if id in existing and values:
+                groups.setdefault(tuple(sorted(values.items())), []).append(id)
+        for values, ids in groups.items():
+            for i in range(0, len(ids), BULK_CHUNK_SIZE):
+                # The objects already loaded in the session are updated as well
+                db.execute(
+                    update(self.model)
+                    .where(self.model.id.in_(ids[i:i + BULK_CHUNK_SIZE]))
+                    .values(dict(values))
+                    .execution_options(synchronize_session="evaluate")
+                )
+        return (
+            [id for id in changes if id in existing],
+            [id for id in changes if id not in existing]
+        )
+
     def remove(
         self,
         db: Session,
@@ -93,12 +246,307 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         obj = db.query(self.model).get(id)
         if obj is not None:
             db.delete(obj)
-            db.commit()
+            db.flush()
         return obj
 
+    def remove_multi(
+        self,
+        db: Session,
+        *,
+        ids: Optional[Sequence[int]] = None,
+        filters: Sequence[Any] = ()
+    ) -> List[int]:
+        """Delete many objects without loading them
+        by a DELETE ... WHERE statement (one per chunk of the IDs).
+        :param ids: IDs of the objects (all objects matching the filters if empty)
+        :param filters: additional filtering conditions of the objects
+        :return: IDs of the deleted objects
+        """
+        if ids is None:
+            conditions = [list(filters)]
+        else:
+            ids = list(dict.fromkeys(ids))
+            conditions = [
+                [self.model.id.in_(ids[i:i + BULK_CHUNK_SIZE]), *filters]
+                for i in range(0, len(ids), BULK_CHUNK_SIZE)
+            ]
+        removed: List[int] = []
+        for where in conditions:
+            removed.extend(self._delete_where(db, where=where))
+        return removed
+
+    def iter_batches(
+        self,
+        db: Session,
+        *,
+        batch_size: int = 1000
+    ) -> Iterator[List[Row]]:
+        """Iterate over all records of the table in batches of rows (not model objects)
+        read by a single query through the server-side cursor, when the database supports it,
+        so the memory usage does not depend on the size of the table.
+        The query is executed on the first iteration.
+        :param batch_size: number of rows in each batch
+        """
+        table = self.model.__table__
+        result = db.execute(
+            select(table).order_by(table.c.id),
+            execution_options={"stream_results": True, "max_row_buffer": batch_size}
+        )
+        try:
+            yield from result.partitions(batch_size)
+        finally:
+            result.close()
+
     def count(
         self,
         db: Session
     ) -> int:
         """Get the total number of records in the table."""
-        return db.query(self.model).count()
+        return self._count(db, counter=self.model.__tablename__)
+
+    def get_existing_ids(
+        self,
+        db: Session,
+        *,
+        ids: Sequence[int]
+    ) -> Set[int]:
+        """Find which of the IDs are present in the table."""
+        existing: Set[int] = set()
+        for i in range(0, len(ids), BULK_CHUNK_SIZE):
+            query = db.query(self.model.id).filter(self.model.id.in_(ids[i:i + BULK_CHUNK_SIZE]))
+            existing.update(id for id, in query)
+        return existing
+
+    def violates_unique(
+        self,
+        error: IntegrityError,
+        index: str
+    ) -> bool:
+        """Check if the error is raised by the duplicate values of the unique index of the table.
+        PostgreSQL reports the name of the index, SQLite reports only the names of its columns.
+        :param error: error of the database
+        :param index: name of the unique index
+        """
+        constraint = getattr(getattr(error.orig, "diag", None), "constraint_name", None)
+        if constraint is not None:
+            return bool(constraint == index)
+        table = self.model.__table__  # type: ignore
+        columns = next((item.columns for item in table.indexes if item.name == index), [])
+        names = ", ".join(f"{table.name}.{column.name}" for column in columns)
+        return bool(names) and str(error.orig) == f"UNIQUE constraint failed: {names}"
+
+    def _get_many(
+        self,
+        db: Session,
+        statement: Select,
+        *,
+        ids: Sequence[int],
+        rows: bool = False
+    ) -> Tuple[List[Any], List[int]]:
+        """Execute the statement of the objects with the expanding "ids" parameter for each chunk of the IDs.
+        :param rows: the statement selects the columns instead of the objects
+        :return: found objects in the order of the IDs and the IDs which are not found
+        """
+        found: Dict[int, Any] = {}
+        for i in range(0, len(ids), BULK_CHUNK_SIZE):
+            result = db.execute(statement, {"ids": list(ids[i:i + BULK_CHUNK_SIZE])})
+            found.update((obj.id, obj) for obj in (result if rows else result.scalars()))
+        return [found[id] for id in ids if id in found], [id for id in ids if id not in found]
+
+    def _delete_where(
+        self,
+        db: Session,
+        *,
+        where: Sequence[Any]
+    ) -> List[int]:
+        """Delete the rows matching the conditions and return their IDs
+        (with RETURNING when the database supports it, otherwise the IDs are selected first)."""
+        table = self.model.__table__
+        if self._supports_returning(db):
+            return list(db.execute(delete(table).where(*where).returning(table.c.id)).scalars())
+        ids = list(db.execute(select(table.c.id).where(*where)).scalars())
+        for i in range(0, len(ids), BULK_CHUNK_SIZE):
+            db.execute(delete(table).where(table.c.id.in_(ids[i:i + BULK_CHUNK_SIZE])))
+        return ids
+
+    @staticmethod
+    def _supports_returning(db: Session) -> bool:
+        """Check if the database dialect supports RETURNING in INSERT, UPDATE and DELETE statements."""
+        dialect = db.get_bind().dialect
+        return bool(getattr(dialect, "insert_returning", getattr(dialect, "full_returning", False)))
+
+    def _paginate(
+        self,
+        statement: StatementType,
+        *,
+        limit: Optional[int] = None,
+        after: Optional[Sequence[Any]] = None,
+        sort: Sequence[str] = ()
+    ) -> StatementType:
+        """Apply the keyset pagination to the query: the objects are ordered by ID (or by the sort keys)
+        and the page starts right after the key of the last object of the previous page,
+        so the cost of the page does not depend on its position in the table.
+        The query of the objects is a lambda statement, so its SQL is built and compiled once for each combination
+        of the parts and only the values of the parameters are taken on each call;
+        the query of the selected columns (see `_select_fields`) and the sorted query are usual statements.
+        :param statement: query with all necessary filters
+        :param limit: maximum number of objects on the page (all objects if empty)
+        :param after: key of the last object of the previous page
+        :param sort: sort keys of the usual statement (see `_order_by`)
+        """
+        model = self.model
+        if isinstance(statement, Select):
+            order = self._order_by(sort)
+            statement = statement.order_by(*(column.desc() if desc else column for column, desc in order))
+            if after is not None:
+                statement = statement.where(*self._keyset(order, self._decode_key(order, after)))
+            return statement.limit(limit) if limit is not None else statement
+        if after is not None and (len(after) != 1 or not isinstance(after[0], int)):
+            raise ValueError("The cursor does not match the order of the list")
+        statement += lambda s: s.order_by(model.id)
+        if after is not None:
+            key = after[0]
+            statement += lambda s: s.where(model.id > key)
+        if limit is not None:
+            statement += lambda s: s.limit(limit)
+        return statement
+
+    def _order_by(
+        self,
+        sort: Sequence[str] = ()
+    ) -> List[Tuple[Any, bool]]:
+        """Get the columns of the order of the list with the signs of the descending order.
+        The ID is added after the sort keys without a unique column, so the order and the cursor are unambiguous;
+        it follows the direction of the last key, so the index of the column (which includes the ID
+        as the row reference) is read in one direction.
+        :param sort: names of the columns from `sort_keys`, with the "-" prefix in descending order
+        """
+        table = self.model.__table__  # type: ignore
+        order = [(getattr(self.model, key.lstrip("-")), key.startswith("-")) for key in sort]
+        if not any(table.c[column.key].primary_key or table.c[column.key].unique for column, desc in order):
+            order.append((self.model.id, order[-1][1] if order else False))
+        return order
+
+    @staticmethod
+    def _decode_key(
+        order: Sequence[Tuple[Any, bool]],
+        after: Sequence[Any]
+    ) -> List[Any]:
+        """Convert the key of the pagination cursor to the values of the columns of the order.
+        :raises ValueError: the cursor does not match the order of the list
+        """
+        if len(after) != len(order):
+            raise ValueError("The cursor does not match the order of the list")
+        key = []
+        for (column, desc), value in zip(order, after):
+            python_type = column.type.python_type
+            if python_type is datetime and isinstance(value, str):
+                value = datetime.fromisoformat(value)
+            if not isinstance(value, python_type) or isinstance(value, bool):
+                raise ValueError("The cursor does not match the order of the list")
+            key.append(value)
+        return key
+
+    @staticmethod
+    def _keyset(
+        order: Sequence[Tuple[Any, bool]],
+        key: Sequence[Any]
+    ) -> List[Any]:
+        """Build the conditions of the records following the key in the order of the list:
+        (a > :a) OR (a = :a AND b > :b) ... for any directions of the columns,
+        with the range of the first column, which is read from its index.
+        """
+        following = []
+        for i, (column, desc) in enumerate(order):
+            equal = [previous == value for (previous, _), value in zip(order[:i], key)]
+            following.append(and_(*equal, column < key[i] if desc else column > key[i]))
+        first, desc = order[0]
+        return [first <= key[0] if desc else first >= key[0], or_(*following)]
+
+    def _select_fields(
+        self,
+        fields: Sequence[str]
+    ) -> Select:
+        """Build the query of only the selected columns of the table (sparse fieldset).
+        The list of the columns changes the SQL, so the query is not a lambda statement
+        (the columns in its closure would not be a part of the cache key).
+        :param fields: names of the columns
+        """
+        columns = self.model.__table__.columns  # type: ignore
+        return select(*(columns[name] for name in fields))
+
+    def _count(
+        self,
+        db: Session,
+        *,
+        counter: Optional[str] = None,
+        filters: Sequence[Any] = (),
+        estimated: bool = False
+    ) -> int:
+        """Get the number of records without scanning the table where it is possible.
+        :param counter: name of the counter maintained by the database triggers (see `app.db.counters`),
+        if there is no such counter, the records are counted by the query
+        :param filters: filtering conditions of the records counted by the query
+        :param estimated: use the estimate of the query planner instead of counting the records
+        (only in PostgreSQL, other databases count the records)
+        """
+        if counter is not None:
+            value = db.execute(select(Counter.value).where(Counter.name == counter)).scalar()
+            if value is not None:
+                return value
+        if estimated and db.get_bind().dialect.name == "postgresql":
+            compiled = select(self.model.id).where(*filters).compile(dialect=db.get_bind().dialect)
+            plan = db.connection().exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params).scalar()
+            plan = json.loads(plan) if isinstance(plan, str) else plan
+            return int(plan[0]["Plan"]["Plan Rows"])
+        return db.execute(select(func.count()).select_from(self.model).where(*filters)).scalar_one()
+
+    def _expire_loaded(
+        self,
+        db: Session,
+        *,
+        id: int
+    ) -> None:
+        """Expire the object updated without the ORM, if it is already loaded in the session,
+        so it is read again on access."""
+        db_obj = db.identity_map.get(identity_key(self.model, id))
+        if db_obj is not None:
+            db.expire(db_obj)
+
+    @staticmethod
+    def _get_stale_relationships(db_obj: ModelType) -> List[str]:
+        """Find the loaded relationships of the object whose foreign keys have been changed,
+        they are expired after the flush and loaded again on access instead of refreshing the whole object."""
+        state = inspect(db_obj)
+        return [
+            relationship.key
+            for relationship in state.mapper.relationships
+            if relationship.key in state.dict and any(
+                state.attrs[state.mapper.get_property_by_column(column).key].history.has_changes()
+                for column in relationship.local_columns
+            )
+        ]
+
+    @staticmethod
+    def _set_attributes(
+        db_obj: ModelType,
+        obj_in: Union[UpdateSchemaType, Dict[str, Any]],
+        exclude_empty: bool = False
+    ) -> List[str]:
+        """Copy the new values to the attributes of the model object,
+        only the values that differ from the loaded state are set.
+        :return: names of the changed attributes
+        """
+        if isinstance(obj_in, Dict):
+            update_data: Dict[str, Any] = obj_in
+        else:
+            update_data = obj_in.dict(exclude_unset=True)
+        changed = []
+        for attr in inspect(db_obj).mapper.column_attrs:
+            field = attr.key
+            if field not in update_data or (exclude_empty and update_data[field] is None):
+                continue
+            if getattr(db_obj, field) != update_data[field]:
+                setattr(db_obj, field, update_data[field])
+                changed.append(field)
+        return changed
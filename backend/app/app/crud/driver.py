@@ -1,32 +1,137 @@
-from typing import List, Optional
+from typing import Any, List, Optional, Sequence, Tuple, Union
 from datetime import date, datetime
-from sqlalchemy.orm import Session
-from app.models import Driver
+from sqlalchemy import and_, lambda_stmt, select, update
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session, selectinload
+from app.models import Driver, Vehicle
 from app.schemas import DriverCreate, DriverUpdate
 from .base import CRUDBase
 
 
 class CRUDDriver(CRUDBase[Driver, DriverCreate, DriverUpdate]):
     """CRUD object with basic methods for manipulation of the drivers records in a database."""
+    sort_keys = ("id", "created_at")
+
+    def get_many(
+        self,
+        db: Session,
+        *,
+        ids: Sequence[int],
+        fields: Optional[Sequence[str]] = None,
+        load_vehicles: bool = False
+    ) -> Tuple[List[Union[Driver, Row]], List[int]]:
+        """Get the drivers by the list of IDs.
+        :param fields: names of the columns to read, the rows with only these columns are returned
+        :param load_vehicles: load the vehicles of the drivers by one more query for each chunk of the IDs
+        :return: found drivers in the order of the IDs and the IDs which are not found
+        """
+        if fields is not None:
+            return super().get_many(db, ids=ids, fields=fields)
+        statement = self._get_many_statement
+        if load_vehicles:
+            # The "vehicle" backref exists only after the mappers are configured, so the option is added here
+            statement = statement.options(selectinload(Driver.vehicle))
+        return self._get_many(db, statement, ids=ids)
 
     def get_filtered(
         self,
         db: Session,
         *,
         gte: Optional[date] = None,
-        lte: Optional[date] = None
-    ) -> List[Driver]:
+        lte: Optional[date] = None,
+        limit: Optional[int] = None,
+        after: Optional[Sequence[Any]] = None,
+        fields: Optional[Sequence[str]] = None,
+        sort: Sequence[str] = (),
+        load_vehicles: bool = False
+    ) -> List[Union[Driver, Row]]:
         """Get a list of drivers filtered by registration date.
         :param gte: start date
         :param lte: end date
         (if any of these values is empty, it is not taken into account)
+        :param limit: maximum number of drivers on the page (all drivers if empty)
+        :param after: key of the last driver of the previous page
+        :param fields: names of the columns to read, the rows with only these columns are returned
+        :param sort: sort keys from `sort_keys` (by ID if empty), e.g. ["-created_at"]
+        :param load_vehicles: load the vehicles of all drivers of the page by one more query
+        """
+        if fields is not None or sort:
+            statement = select(Driver) if fields is None else self._select_fields(fields)
+            statement = statement.where(*self._filters(gte=gte, lte=lte))
+            if load_vehicles:
+                statement = statement.options(selectinload(Driver.vehicle))
+            result = db.execute(self._paginate(statement, limit=limit, after=after, sort=sort))
+            return result.all() if fields is not None else result.scalars().all()
+        # The conditions of `_filters` are a closure variable of the lambda statement:
+        # the statement is still cached by its structure, the values of the conditions are bound on each call
+        filters = self._filters(gte=gte, lte=lte)
+        statement = lambda_stmt(lambda: select(Driver))
+        if filters:
+            condition = and_(*filters)
+            statement += lambda s: s.where(condition)
+        if load_vehicles:
+            # The options are created inside the lambda, the lambda statement does not track them in the closure
+            statement += lambda s: s.options(selectinload(Driver.vehicle))
+        return db.execute(self._paginate(statement, limit=limit, after=after)).scalars().all()
+
+    def count_filtered(
+        self,
+        db: Session,
+        *,
+        gte: Optional[date] = None,
+        lte: Optional[date] = None,
+        estimated: bool = False
+    ) -> int:
+        """Get the number of drivers filtered by registration date,
+        the total number is read from the counter without scanning the table.
+        :param estimated: use the estimate of the query planner for the filtered drivers
         """
-        query = db.query(Driver)
+        filters = self._filters(gte=gte, lte=lte)
+        if not filters:
+            return self.count(db)
+        return self._count(db, filters=filters, estimated=estimated)
+
+    def remove_filtered(
+        self,
+        db: Session,
+        *,
+        ids: Optional[Sequence[int]] = None,
+        gte: Optional[date] = None,
+        lte: Optional[date] = None
+    ) -> List[int]:
+        """Delete the drivers by the list of IDs and/or filtered by registration date.
+        :return: IDs of the deleted drivers
+        """
+        return self.remove_multi(db, ids=ids, filters=self._filters(gte=gte, lte=lte))
+
+    def _delete_where(
+        self,
+        db: Session,
+        *,
+        where: Sequence[Any]
+    ) -> List[int]:
+        """Remove the drivers from their vehicles (as on the deletion of a single driver)
+        and delete the drivers matching the conditions."""
+        db.execute(
+            update(Vehicle.__table__)
+            .where(Vehicle.driver_id.in_(select(Driver.id).where(*where)))
+            .values(driver_id=None)
+        )
+        return super()._delete_where(db, where=where)
+
+    @staticmethod
+    def _filters(
+        *,
+        gte: Optional[date] = None,
+        lte: Optional[date] = None
+    ) -> List[Any]:
+        """Build filtering conditions by the registration date of the driver."""
+        filters = []
         if gte is not None:
-            query = query.filter(Driver.created_at >= datetime.fromordinal(gte.toordinal()))
+            filters.append(Driver.created_at >= datetime.fromordinal(gte.toordinal()))
         if lte is not None:
-            query = query.filter(Driver.created_at < datetime.fromordinal(lte.toordinal()))
-        return query.all()
+            filters.append(Driver.created_at < datetime.fromordinal(lte.toordinal()))
+        return filters
 
 
 driver = CRUDDriver(Driver)
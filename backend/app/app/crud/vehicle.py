@@ -1,13 +1,65 @@
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple, Type, Union
+from enum import Enum
 from fastapi.encoders import jsonable_encoder
-from sqlalchemy.orm import Session
-from app.models import Vehicle
+from sqlalchemy import and_, exists, lambda_stmt, select, update
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session, joinedload
+from app.models import Driver, Vehicle
 from app.schemas import VehicleCreate, VehicleUpdate
-from .base import CRUDBase
+from .base import BULK_CHUNK_SIZE, CRUDBase
+from .driver import driver as crud_driver
+
+
+class SetDriverResult(str, Enum):
+    """Outcome of putting the driver in the vehicle."""
+    ASSIGNED = "assigned"
+    UNCHANGED = "unchanged"
+    VEHICLE_NOT_FOUND = "vehicle_not_found"
+    DRIVER_NOT_FOUND = "driver_not_found"
 
 
 class CRUDVehicle(CRUDBase[Vehicle, VehicleCreate, VehicleUpdate]):
     """CRUD object with basic methods for manipulation of the vehicles records in a database."""
+    sort_keys = ("id", "plate_number", "created_at")
+
+    def __init__(self, model: Type[Vehicle]):
+        super().__init__(model)
+        # The same statements loading the driver of each vehicle by the same query (LEFT OUTER JOIN)
+        self._get_with_driver_statement = self._get_statement.options(joinedload(Vehicle.driver))
+        self._get_many_with_driver_statement = self._get_many_statement.options(joinedload(Vehicle.driver))
+
+    def get(
+        self,
+        db: Session,
+        id: Any,
+        *,
+        fields: Optional[Sequence[str]] = None,
+        load_driver: bool = False
+    ) -> Optional[Union[Vehicle, Row]]:
+        """Get the vehicle from the database by its ID.
+        :param fields: names of the columns to read, the row with only these columns is returned
+        :param load_driver: load the driver of the vehicle by the same query
+        """
+        if not load_driver:
+            return super().get(db, id, fields=fields)
+        return db.execute(self._get_with_driver_statement, {"id": id}).scalars().first()
+
+    def get_many(
+        self,
+        db: Session,
+        *,
+        ids: Sequence[int],
+        fields: Optional[Sequence[str]] = None,
+        load_driver: bool = False
+    ) -> Tuple[List[Union[Vehicle, Row]], List[int]]:
+        """Get the vehicles by the list of IDs.
+        :param fields: names of the columns to read, the rows with only these columns are returned
+        :param load_driver: load the drivers of the vehicles by the same queries
+        :return: found vehicles in the order of the IDs and the IDs which are not found
+        """
+        if not load_driver:
+            return super().get_many(db, ids=ids, fields=fields)
+        return self._get_many(db, self._get_many_with_driver_statement, ids=ids)
 
     def create(
         self,
@@ -20,26 +72,167 @@ class CRUDVehicle(CRUDBase[Vehicle, VehicleCreate, VehicleUpdate]):
         obj_in_data = jsonable_encoder(obj_in)
         db_obj = self.model(**obj_in_data, driver_id=driver_id)
         db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+        db.flush()
         return db_obj
 
     def get_filtered(
         self,
         db: Session,
         *,
-        with_driver: Optional[bool] = None
-    ) -> List[Vehicle]:
+        with_driver: Optional[bool] = None,
+        limit: Optional[int] = None,
+        after: Optional[Sequence[Any]] = None,
+        fields: Optional[Sequence[str]] = None,
+        sort: Sequence[str] = (),
+        load_driver: bool = False
+    ) -> List[Union[Vehicle, Row]]:
         """Get a list of vehicles which can be filtered by the presence of the driver.
         :param with_driver: a sign of the presence or absence of a driver in the vehicle
         (if this value is empty, it is not taken into account)
+        :param limit: maximum number of vehicles on the page (all vehicles if empty)
+        :param after: key of the last vehicle of the previous page
+        :param fields: names of the columns to read, the rows with only these columns are returned
+        :param sort: sort keys from `sort_keys` (by ID if empty), e.g. ["-created_at", "plate_number"]
+        :param load_driver: load the drivers of the vehicles by the same query
+        """
+        if fields is not None or sort:
+            statement = select(Vehicle) if fields is None else self._select_fields(fields)
+            statement = statement.where(*self._filters(with_driver=with_driver))
+            if load_driver:
+                statement = statement.options(joinedload(Vehicle.driver))
+            result = db.execute(self._paginate(statement, limit=limit, after=after, sort=sort))
+            return result.all() if fields is not None else result.scalars().all()
+        # The conditions of `_filters` are a closure variable of the lambda statement:
+        # the statement is still cached by its structure, the values of the conditions are bound on each call
+        filters = self._filters(with_driver=with_driver)
+        statement = lambda_stmt(lambda: select(Vehicle))
+        if filters:
+            condition = and_(*filters)
+            statement += lambda s: s.where(condition)
+        if load_driver:
+            # The options are created inside the lambda, the lambda statement does not track them in the closure
+            statement += lambda s: s.options(joinedload(Vehicle.driver))
+        return db.execute(self._paginate(statement, limit=limit, after=after)).scalars().all()
+
+    def count_filtered(
+        self,
+        db: Session,
+        *,
+        with_driver: Optional[bool] = None
+    ) -> int:
+        """Get the number of vehicles filtered by the presence of the driver
+        from the counters without scanning the table."""
+        if with_driver is None:
+            return self.count(db)
+        counter = "vehicles_with_driver" if with_driver else "vehicles_without_driver"
+        return self._count(db, counter=counter, filters=self._filters(with_driver=with_driver))
+
+    def remove_filtered(
+        self,
+        db: Session,
+        *,
+        ids: Optional[Sequence[int]] = None,
+        with_driver: Optional[bool] = None
+    ) -> List[int]:
+        """Delete the vehicles by the list of IDs and/or filtered by the presence of the driver.
+        :return: IDs of the deleted vehicles
         """
-        query = db.query(Vehicle)
+        return self.remove_multi(db, ids=ids, filters=self._filters(with_driver=with_driver))
+
+    def get_existing_plate_numbers(
+        self,
+        db: Session,
+        *,
+        plate_numbers: Sequence[str]
+    ) -> Set[str]:
+        """Find which of the plate numbers are already registered in the database."""
+        plate_numbers = list(set(plate_numbers))
+        existing: Set[str] = set()
+        for i in range(0, len(plate_numbers), BULK_CHUNK_SIZE):
+            query = db.query(Vehicle.plate_number).filter(
+                Vehicle.plate_number.in_(plate_numbers[i:i + BULK_CHUNK_SIZE])
+            )
+            existing.update(plate_number for plate_number, in query)
+        return existing
+
+    def set_driver(
+        self,
+        db: Session,
+        *,
+        id: int,
+        driver_id: Optional[int]
+    ) -> Tuple[Optional[Row], SetDriverResult]:
+        """Put the driver in the vehicle (or remove it) by a single conditional statement
+        UPDATE ... WHERE id=:id AND EXISTS (SELECT the driver) RETURNING,
+        so the driver can not be deleted between the check and the update.
+        The vehicle is selected separately only if it is not updated
+        or the database does not support RETURNING.
+        :param id: vehicle ID
+        :param driver_id: driver ID (None to remove the driver from the vehicle)
+        :return: row of the vehicle (None if it is not found) and the outcome
+        """
+        table = self.model.__table__
+        conditions = [table.c.id == id, table.c.driver_id.is_distinct_from(driver_id)]
+        if driver_id is not None:
+            conditions.append(exists().where(Driver.id == driver_id))
+        stmt = update(table).where(*conditions).values(driver_id=driver_id)
+        query = select(table).where(table.c.id == id)
+        if self._supports_returning(db):
+            row = db.execute(stmt.returning(*table.c)).first()
+        else:
+            row = db.execute(query).first() if db.execute(stmt).rowcount else None
+        if row is not None:
+            self._expire_loaded(db, id=id)
+            return row, SetDriverResult.ASSIGNED
+        row = db.execute(query).first()
+        if row is None:
+            return None, SetDriverResult.VEHICLE_NOT_FOUND
+        if row.driver_id == driver_id:
+            return row, SetDriverResult.UNCHANGED
+        return row, SetDriverResult.DRIVER_NOT_FOUND
+
+    def set_drivers(
+        self,
+        db: Session,
+        *,
+        assignments: Sequence[Tuple[int, Optional[int]]]
+    ) -> Tuple[List[int], List[Tuple[int, Optional[int], str]]]:
+        """Put the drivers in many vehicles (or remove them).
+        All driver IDs are checked with one query, the vehicles with the same driver
+        are updated by a single statement.
+        :param assignments: pairs of the vehicle ID and the driver ID (None to remove the driver);
+        if the vehicle ID is repeated, the last pair is used
+        :return: IDs of the updated vehicles and the skipped pairs with the reason:
+        "driver_not_found" or "vehicle_not_found"
+        """
+        changes: Dict[int, Optional[int]] = dict(assignments)
+        drivers = crud_driver.get_existing_ids(
+            db, ids=list({driver_id for driver_id in changes.values() if driver_id is not None})
+        )
+        skipped = [
+            (vehicle_id, driver_id, "driver_not_found")
+            for vehicle_id, driver_id in changes.items()
+            if driver_id is not None and driver_id not in drivers
+        ]
+        updated, not_found = self.update_multi(db, updates=[
+            (vehicle_id, {"driver_id": driver_id})
+            for vehicle_id, driver_id in changes.items()
+            if driver_id is None or driver_id in drivers
+        ])
+        skipped.extend((vehicle_id, changes[vehicle_id], "vehicle_not_found") for vehicle_id in not_found)
+        return updated, skipped
+
+    @staticmethod
+    def _filters(
+        *,
+        with_driver: Optional[bool] = None
+    ) -> List[Any]:
+        """Build filtering conditions by the presence of the driver in the vehicle."""
         if with_driver:
-            query = query.filter(Vehicle.driver_id.isnot(None))
+            return [Vehicle.driver_id.isnot(None)]
         elif with_driver is False:
-            query = query.filter(Vehicle.driver_id.is_(None))
-        return query.all()
+            return [Vehicle.driver_id.is_(None)]
+        return []
 
 
 vehicle = CRUDVehicle(Vehicle)
@@ -1,4 +1,6 @@
 # All models used in the database must be presented here
 from app.db.base_class import Base  # noqa F401
+from app.models.counter import Counter  # noqa F401
 from app.models.driver import Driver  # noqa F401
 from app.models.vehicle import Vehicle  # noqa F401
+from app.db import counters  # noqa F401
@@ -6,3 +6,6 @@ from sqlalchemy.ext.declarative import as_declarative
 class Base:
     id: Any
     __name__: str
+    # The values generated by the database on INSERT and UPDATE are fetched in the same statement
+    # with RETURNING where it is supported (otherwise by a SELECT), so the objects are not refreshed
+    __mapper_args__ = {"eager_defaults": True}
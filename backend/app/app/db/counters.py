@@ -0,0 +1,121 @@
+from typing import Any, Dict, List
+from sqlalchemy import event, text
+from sqlalchemy.engine import Connection
+from app.db.base_class import Base
+from app.models import Counter
+
+# Counters and the queries used to set their initial values
+COUNTERS = {
+    "drivers": "SELECT count(*) FROM drivers",
+    "vehicles": "SELECT count(*) FROM vehicles",
+    "vehicles_with_driver": "SELECT count(*) FROM vehicles WHERE driver_id IS NOT NULL",
+    "vehicles_without_driver": "SELECT count(*) FROM vehicles WHERE driver_id IS NULL",
+}
+
+# Name of the counter of the vehicles by the presence of the driver
+VEHICLE_COUNTER = (
+    "CASE WHEN {row}.driver_id IS NULL THEN 'vehicles_without_driver' ELSE 'vehicles_with_driver' END"
+)
+
+# Triggers that keep the counters up to date in each supported database
+TRIGGERS: Dict[str, List[str]] = {
+    "sqlite": [
+        """CREATE TRIGGER drivers_count_insert AFTER INSERT ON drivers BEGIN
+            UPDATE counters SET value = value + 1 WHERE name = 'drivers';
+        END""",
+        """CREATE TRIGGER drivers_count_delete AFTER DELETE ON drivers BEGIN
+            UPDATE counters SET value = value - 1 WHERE name = 'drivers';
+        END""",
+        f"""CREATE TRIGGER vehicles_count_insert AFTER INSERT ON vehicles BEGIN
+            UPDATE counters SET value = value + 1 WHERE name IN ('vehicles', {VEHICLE_COUNTER.format(row="NEW")});
+        END""",
+        f"""CREATE TRIGGER vehicles_count_delete AFTER DELETE ON vehicles BEGIN
+            UPDATE counters SET value = value - 1 WHERE name IN ('vehicles', {VEHICLE_COUNTER.format(row="OLD")});
+        END""",
+        f"""CREATE TRIGGER vehicles_count_update AFTER UPDATE OF driver_id ON vehicles
+        WHEN (OLD.driver_id IS NULL) != (NEW.driver_id IS NULL) BEGIN
+            UPDATE counters SET value = value - 1 WHERE name = {VEHICLE_COUNTER.format(row="OLD")};
+            UPDATE counters SET value = value + 1 WHERE name = {VEHICLE_COUNTER.format(row="NEW")};
+        END""",
+    ],
+    "postgresql": [
+        """CREATE OR REPLACE FUNCTION count_rows() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                UPDATE counters SET value = value + 1 WHERE name = TG_TABLE_NAME;
+            ELSIF TG_OP = 'DELETE' THEN
+                UPDATE counters SET value = value - 1 WHERE name = TG_TABLE_NAME;
+            END IF;
+            RETURN NULL;
+        END $$ LANGUAGE plpgsql""",
+        f"""CREATE OR REPLACE FUNCTION count_vehicles_by_driver() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'UPDATE' AND (OLD.driver_id IS NULL) = (NEW.driver_id IS NULL) THEN
+                RETURN NULL;
+            END IF;
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                UPDATE counters SET value = value - 1 WHERE name = {VEHICLE_COUNTER.format(row="OLD")};
+            END IF;
+            IF TG_OP IN ('UPDATE', 'INSERT') THEN
+                UPDATE counters SET value = value + 1 WHERE name = {VEHICLE_COUNTER.format(row="NEW")};
+            END IF;
+            RETURN NULL;
+        END $$ LANGUAGE plpgsql""",
+        """CREATE TRIGGER drivers_count AFTER INSERT OR DELETE ON drivers
+        FOR EACH ROW EXECUTE FUNCTION count_rows()""",
+        """CREATE TRIGGER vehicles_count AFTER INSERT OR DELETE ON vehicles
+        FOR EACH ROW EXECUTE FUNCTION count_rows()""",
+        """CREATE TRIGGER vehicles_count_by_driver AFTER INSERT OR DELETE OR UPDATE OF driver_id ON vehicles
+        FOR EACH ROW EXECUTE FUNCTION count_vehicles_by_driver()""",
+    ],
+}
+
+# Statements removing the triggers of the counters (in the reverse order of their creation)
+DROP_TRIGGERS: Dict[str, List[str]] = {
+    "sqlite": [
+        "DROP TRIGGER IF EXISTS vehicles_count_update",
+        "DROP TRIGGER IF EXISTS vehicles_count_delete",
+        "DROP TRIGGER IF EXISTS vehicles_count_insert",
+        "DROP TRIGGER IF EXISTS drivers_count_delete",
+        "DROP TRIGGER IF EXISTS drivers_count_insert",
+    ],
+    "postgresql": [
+        "DROP TRIGGER IF EXISTS vehicles_count_by_driver ON vehicles",
+        "DROP TRIGGER IF EXISTS vehicles_count ON vehicles",
+        "DROP TRIGGER IF EXISTS drivers_count ON drivers",
+        "DROP FUNCTION IF EXISTS count_vehicles_by_driver()",
+        "DROP FUNCTION IF EXISTS count_rows()",
+    ],
+}
+
+
+def create_counters(connection: Connection) -> None:
+    """Set the initial values of the counters and create the triggers that maintain them.
+    In the databases without the triggers the counters are not created,
+    and the numbers of the records are counted by the queries.
+    :param connection: connection to the database with all tables already created
+    """
+    triggers = TRIGGERS.get(connection.dialect.name)
+    if triggers is None:
+        return
+    for name, query in COUNTERS.items():
+        connection.execute(
+            text(f"INSERT INTO counters (name, value) SELECT :name, ({query})"), {"name": name}
+        )
+    for trigger in triggers:
+        connection.exec_driver_sql(trigger)
+
+
+def drop_counters(connection: Connection) -> None:
+    """Remove the triggers that maintain the counters (the table of the counters is not removed).
+    :param connection: connection to the database
+    """
+    for statement in DROP_TRIGGERS.get(connection.dialect.name, []):
+        connection.exec_driver_sql(statement)
+
+
+@event.listens_for(Base.metadata, "after_create")
+def create_counters_with_table(target: Any, connection: Connection, **kw: Any) -> None:
+    """Create the counters together with their table."""
+    if Counter.__table__ in kw.get("tables", []):
+        create_counters(connection)
@@ -0,0 +1,162 @@
+import asyncio
+import itertools
+import threading
+import time
+from concurrent.futures import Future
+from enum import IntEnum
+from queue import Empty, Full, PriorityQueue
+from typing import Any, Callable, List, Tuple, TypeVar
+from app.core.config import settings
+from app.schemas import ExecutorStats
+
+T = TypeVar("T")
+
+
+class Priority(IntEnum):
+    """Priority of the database call in the executor queue (the lower value is executed first)."""
+    POINT_READ = 0
+    WRITE = 1
+    SCAN = 2
+
+
+class ExecutorOverloaded(Exception):
+    """The executor queue is full and the database call was rejected."""
+    pass
+
+
+class ExecutorQueue(PriorityQueue):
+    """Priority queue of the executor, bounded for the database calls but not for the stop items."""
+
+    def put_stop(self, item: Tuple[Any, ...]) -> None:
+        """Put the stop item without waiting for a free place, so a full queue does not block the shutdown."""
+        with self.mutex:
+            self._put(item)
+            self.unfinished_tasks += 1
+            self.not_empty.notify()
+
+
+class DBExecutor:
+    """Dedicated pool of threads for the blocking database calls.
+    The number of threads matches the size of the database connection pool,
+    so every running call has a connection and the rest wait in the priority queue
+    instead of blocking the event loop or exhausting the connection pool.
+    """
+
+    def __init__(self, max_workers: int, max_queue_size: int = 0):
+        """Executor of the blocking database calls.
+        :param max_workers: number of the working threads
+        :param max_queue_size: maximum number of the waiting calls (0 - unlimited)
+        """
+        self.max_workers = max_workers
+        self.max_queue_size = max_queue_size
+        self._queue = ExecutorQueue(maxsize=max_queue_size)
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+        self._active = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    async def run(
+        self,
+        func: Callable[..., T],
+        *args: Any,
+        priority: Priority = Priority.SCAN,
+        **kwargs: Any
+    ) -> T:
+        """Execute the function in the executor without blocking the event loop.
+        :param func: function that makes calls to the database
+        :param priority: position of the call in the queue relative to others
+        :return: result of the function
+        """
+        return await asyncio.wrap_future(self.submit(func, *args, priority=priority, **kwargs))
+
+    def submit(
+        self,
+        func: Callable[..., T],
+        *args: Any,
+        priority: Priority = Priority.SCAN,
+        **kwargs: Any
+    ) -> "Future[T]":
+        """Put the function in the queue and return the future with its result.
+        :raises ExecutorOverloaded: the queue is full (checked atomically by the bounded queue)
+        """
+        with self._lock:
+            self._start_workers()
+        future: "Future[T]" = Future()
+        try:
+            self._queue.put_nowait((priority, next(self._counter), time.monotonic(), future, func, args, kwargs))
+        except Full:
+            with self._lock:
+                self._rejected += 1
+            raise ExecutorOverloaded(f"The queue of the database calls is full ({self.max_queue_size})")
+        return future
+
+    def stats(self) -> ExecutorStats:
+        """Current state of the executor queue and the waiting time of the calls."""
+        with self._lock:
+            return ExecutorStats(
+                workers=self.max_workers,
+                active=self._active,
+                queue_depth=self._queue.qsize(),
+                completed=self._completed,
+                rejected=self._rejected,
+                wait_avg_ms=self._wait_total / self._completed * 1000 if self._completed else 0.0,
+                wait_max_ms=self._wait_max * 1000,
+            )
+
+    def shutdown(self) -> None:
+        """Stop all working threads after the queued calls are completed.
+        The stop items go after all calls in the queue, and they are added even to the full queue.
+        The calls left in the queue when the threads are stopped (e.g. a thread has died) are cancelled.
+        """
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            self._queue.put_stop((Priority.SCAN + 1, next(self._counter), time.monotonic(), None, None, (), {}))
+        for thread in threads:
+            thread.join()
+        while True:
+            try:
+                future = self._queue.get_nowait()[3]
+            except Empty:
+                break
+            if future is not None:
+                future.cancel()
+
+    def _start_workers(self) -> None:
+        """Start the working threads on the first call (in the process that will use them)."""
+        while len(self._threads) < self.max_workers:
+            thread = threading.Thread(target=self._work, name=f"db-executor-{len(self._threads)}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _work(self) -> None:
+        """Take the calls from the queue in order of priority and execute them."""
+        while True:
+            item: Tuple[Any, ...] = self._queue.get()
+            priority, _, queued_at, future, func, args, kwargs = item
+            if future is None:
+                break
+            if not future.set_running_or_notify_cancel():
+                continue
+            wait = time.monotonic() - queued_at
+            with self._lock:
+                self._active += 1
+            try:
+                result = func(*args, **kwargs)
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+            finally:
+                with self._lock:
+                    self._active -= 1
+                    self._completed += 1
+                    self._wait_total += wait
+                    self._wait_max = max(self._wait_max, wait)
+
+
+db_executor = DBExecutor(max_workers=settings.DB_POOL_SIZE, max_queue_size=settings.DB_EXECUTOR_QUEUE_SIZE)
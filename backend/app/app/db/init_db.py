@@ -1,6 +1,7 @@
 from sqlalchemy.orm import Session
-from app.db import base
-from app.db.session import engine
+from app.db import base  # noqa F401
+from app.db.migrate import migrate
+from app.db.session import get_engine
 
 # make sure all SQL Alchemy models are imported (app.db.base) before initializing DB
 # otherwise, SQL Alchemy might fail to initialize relationships properly
@@ -8,5 +9,5 @@ from app.db.session import engine
 
 
 def init_db(db: Session) -> None:
-    """Create tables and initialize them if necessary."""
-    base.Base.metadata.create_all(bind=engine)
+    """Create or upgrade the tables (see `app.db.migrate`) and initialize them if necessary."""
+    migrate(get_engine())
@@ -0,0 +1,48 @@
+import logging
+from pathlib import Path
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
+from sqlalchemy.engine import Engine
+from app.db.base import Base
+from app.db.session import get_engine
+
+logger = logging.getLogger(__name__)
+
+# Directory of the versioned migrations of the database schema
+MIGRATIONS_DIR = Path(__file__).resolve().parent.parent / "migrations"
+
+
+def get_alembic_config() -> Config:
+    """Configuration of Alembic independent of the current directory."""
+    config = Config()
+    config.set_main_option("script_location", str(MIGRATIONS_DIR))
+    return config
+
+
+def migrate(engine: Engine) -> None:
+    """Bring the database schema to the latest version.
+    The new database is created from the models and marked with the latest version,
+    the existing one is upgraded by the migrations it has not passed yet
+    (the database created before the migrations starts from the first one).
+    :param engine: engine of the database
+    """
+    config = get_alembic_config()
+    with engine.begin() as connection:
+        config.attributes["connection"] = connection
+        if not inspect(connection).has_table("drivers"):
+            Base.metadata.create_all(bind=connection)
+            command.stamp(config, "head")
+        else:
+            command.upgrade(config, "head")
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    logger.info("Migrating the database schema")
+    migrate(get_engine())
+    logger.info("Database schema is up to date")
+
+
+if __name__ == "__main__":
+    main()
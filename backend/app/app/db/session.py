@@ -1,5 +1,163 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from typing import Any, Dict, Iterator, List, Optional
+from contextlib import contextmanager
+import os
+import random
+import threading
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Connection, Engine, make_url
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool, StaticPool
+from app.core.config import settings
 
-engine = create_engine("sqlite:///database.db", pool_pre_ping=True)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def enable_sqlite_savepoints(engine: Engine) -> None:
+    """Let SQLAlchemy emit BEGIN instead of the SQLite driver, which starts the transactions
+    only before the data changes and breaks the SAVEPOINT used by the nested transactions.
+    :param engine: engine of the SQLite database
+    """
+    @event.listens_for(engine, "connect")
+    def disable_driver_transactions(dbapi_connection: Any, connection_record: Any) -> None:
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def begin_transaction(connection: Connection) -> None:
+        connection.exec_driver_sql("BEGIN")
+
+
+def get_sqlite_pragmas() -> Dict[str, Any]:
+    """Performance profile of the SQLite database from the settings."""
+    return {
+        "journal_mode": settings.SQLITE_JOURNAL_MODE,
+        "synchronous": settings.SQLITE_SYNCHRONOUS,
+        "mmap_size": settings.SQLITE_MMAP_SIZE,
+        "cache_size": settings.SQLITE_CACHE_SIZE,
+        "busy_timeout": settings.SQLITE_BUSY_TIMEOUT,
+        "temp_store": settings.SQLITE_TEMP_STORE,
+    }
+
+
+def enable_sqlite_profile(engine: Engine) -> None:
+    """Apply the performance profile from the settings to each new connection to the SQLite database:
+    the write-ahead log lets the readers work together with the writer and the commits do not wait
+    for the full synchronization of the file, the memory-mapped I/O and the larger cache reduce the reads.
+    :param engine: engine of the SQLite database
+    """
+    pragmas = get_sqlite_pragmas()
+    if engine.url.database in (None, "", ":memory:"):
+        # The in-memory database has no journal file
+        pragmas.pop("journal_mode")
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection: Any, connection_record: Any) -> None:
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+        cursor.close()
+
+
+def get_engine_options(url: str) -> Dict[str, Any]:
+    """Options of the engine and the connection pool for the database from the settings.
+    The connections to the database server are checked before use (pre-ping) and recycled,
+    the local SQLite file does not need it, and the in-memory SQLite database
+    is shared by all sessions through a single connection.
+    :param url: database URL
+    """
+    sa_url = make_url(url)
+    pool: Dict[str, Any] = {
+        "poolclass": QueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+    }
+    if sa_url.get_backend_name() != "sqlite":
+        return {**pool, "pool_pre_ping": True, "pool_recycle": settings.DB_POOL_RECYCLE}
+    # The sessions are used by the threads of the DB executor, so the connection can move between threads
+    options: Dict[str, Any] = {"pool_pre_ping": False, "connect_args": {"check_same_thread": False}}
+    if sa_url.database in (None, "", ":memory:"):
+        options["poolclass"] = StaticPool
+    else:
+        options.update(pool)
+    return options
+
+
+def create_db_engine(url: str) -> Engine:
+    """Create the engine of the database with the options from the settings."""
+    engine = create_engine(url, **get_engine_options(url))
+    if engine.dialect.name == "sqlite":
+        enable_sqlite_savepoints(engine)
+        enable_sqlite_profile(engine)
+    return engine
+
+
+# Engines of each process by its ID; the engines inherited from the parent process are kept,
+# so the child process does not close the connections of the parent when they are garbage collected
+_engines: Dict[int, Engine] = {}
+_replica_engines: Dict[int, List[Engine]] = {}
+_engines_lock = threading.Lock()
+
+
+def get_engine() -> Engine:
+    """Get the engine of the current process, created on the first use.
+    Each process (e.g. a gunicorn worker forked from the master) gets its own pool of connections.
+    """
+    pid = os.getpid()
+    if pid not in _engines:
+        with _engines_lock:
+            if pid not in _engines:
+                _engines[pid] = create_db_engine(settings.DATABASE_URL)
+    return _engines[pid]
+
+
+def get_replica_engines() -> List[Engine]:
+    """Get the engines of the read replicas of the current process, created on the first use."""
+    pid = os.getpid()
+    if pid not in _replica_engines:
+        with _engines_lock:
+            if pid not in _replica_engines:
+                _replica_engines[pid] = [create_db_engine(url) for url in settings.DATABASE_REPLICA_URLS]
+    return _replica_engines[pid]
+
+
+class ProcessSession(Session):
+    """Session bound to the engine of the current process."""
+
+    def get_bind(self, mapper: Any = None, clause: Any = None, **kw: Any) -> Engine:
+        return get_engine()
+
+
+class RoutingSession(Session):
+    """Session that reads from one of the replicas and writes to the primary database.
+    The replica is chosen once per session, so all its reads see the same state;
+    after the first write, and when `use_primary` is set, everything goes to the primary.
+    Without the replicas the session works only with the primary.
+    """
+
+    def __init__(self, *args: Any, use_primary: bool = False, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.use_primary = use_primary
+        self._replica: Optional[Engine] = None
+
+    def get_bind(self, mapper: Any = None, clause: Any = None, **kw: Any) -> Engine:
+        if self._flushing or getattr(clause, "is_dml", False):
+            self.use_primary = True
+        replicas = get_replica_engines()
+        if self.use_primary or not replicas:
+            return get_engine()
+        if self._replica is None:
+            self._replica = random.choice(replicas)
+        return self._replica
+
+
+@contextmanager
+def savepoint(db: Session) -> Iterator[Session]:
+    """Explicitly run a part of the unit of work of the request in the nested transaction (SAVEPOINT):
+    if an exception is raised inside the block, only the changes made in it are rolled back.
+    :param db: database session
+    """
+    with db.begin_nested():
+        yield db
+
+
+# The engines are created on the first use of the sessions in each process
+SessionLocal = sessionmaker(class_=ProcessSession, autocommit=False, autoflush=False)
+ReadSessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False)
@@ -1,7 +1,9 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse
 from starlette.middleware.cors import CORSMiddleware
 from app.api.api_v1.api import api_router
 from app.core.config import settings
+from app.db.executor import ExecutorOverloaded, db_executor
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -25,3 +27,19 @@ if settings.BACKEND_CORS_ORIGINS:
     )
 
 app.include_router(api_router, prefix=settings.API_V1_STR)
+
+
+@app.exception_handler(ExecutorOverloaded)
+async def executor_overloaded_handler(request: Request, exc: ExecutorOverloaded) -> JSONResponse:
+    """Ask the client to retry later when the queue of the database calls is full (backpressure)."""
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "The server is overloaded, retry the request later: %s" % str(exc)},
+        headers={"Retry-After": str(settings.DB_EXECUTOR_RETRY_AFTER)}
+    )
+
+
+@app.on_event("shutdown")
+def shutdown_db_executor() -> None:
+    """Wait for the queued database calls and stop the threads of the executor."""
+    db_executor.shutdown()
@@ -0,0 +1,44 @@
+from logging.config import fileConfig
+from alembic import context
+from app.db.base import Base
+from app.db.session import get_engine
+
+# The connection is passed by `app.db.migrate`, the command line tool connects to the database from the settings
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+target_metadata = Base.metadata
+
+
+def run_migrations_offline() -> None:
+    """Print the SQL of the migrations instead of running them ("alembic upgrade head --sql")."""
+    context.configure(url=str(get_engine().url), target_metadata=target_metadata, literal_binds=True)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    """Run the migrations in the database."""
+    connection = config.attributes.get("connection")
+    if connection is None:
+        with get_engine().connect() as connection:
+            configure_and_run(connection)
+    else:
+        configure_and_run(connection)
+
+
+def configure_and_run(connection: object) -> None:
+    # SQLite can not alter the tables, so they are recreated in the "batch" operations
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        render_as_batch=connection.dialect.name == "sqlite",  # type: ignore
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
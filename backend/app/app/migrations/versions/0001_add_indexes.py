@@ -0,0 +1,37 @@
+"""Add indexes of the filtered lists and the unique plate number
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 12:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Filter of the drivers by the registration date
+    op.create_index("ix_drivers_created_at", "drivers", ["created_at"])
+    # Filter of the vehicles with a driver and the relationship of the driver
+    op.create_index("ix_vehicles_driver_id", "vehicles", ["driver_id"])
+    # Pages of the vehicles without a driver
+    op.create_index(
+        "ix_vehicles_without_driver", "vehicles", ["id"],
+        sqlite_where=sa.text("driver_id IS NULL"), postgresql_where=sa.text("driver_id IS NULL")
+    )
+    # Search by the plate number, which is registered only once
+    op.create_index("ix_vehicles_plate_number", "vehicles", ["plate_number"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_vehicles_plate_number", table_name="vehicles")
+    op.drop_index("ix_vehicles_without_driver", table_name="vehicles")
+    op.drop_index("ix_vehicles_driver_id", table_name="vehicles")
+    op.drop_index("ix_drivers_created_at", table_name="drivers")
@@ -0,0 +1,24 @@
+"""Add the index of the vehicles sorted by the registration date
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 16:00:00
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Pages of the vehicles sorted by the registration date
+    op.create_index("ix_vehicles_created_at", "vehicles", ["created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_vehicles_created_at", table_name="vehicles")
@@ -0,0 +1,36 @@
+"""Add the counters of the records to the database created before them
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 10:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.db.counters import create_counters, drop_counters
+
+
+# revision identifiers, used by Alembic.
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+    # The database created from the models already has the counters (see `app.db.counters`)
+    if sa.inspect(connection).has_table("counters"):
+        return
+    op.create_table(
+        "counters",
+        sa.Column("name", sa.String(50), primary_key=True),
+        sa.Column("value", sa.BigInteger(), nullable=False),
+    )
+    # The initial values are counted from the existing records
+    create_counters(connection)
+
+
+def downgrade() -> None:
+    drop_counters(op.get_bind())
+    op.drop_table("counters")
@@ -1,2 +1,3 @@
+from .counter import Counter
 from .driver import Driver
 from .vehicle import Vehicle
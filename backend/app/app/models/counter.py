@@ -0,0 +1,9 @@
+from sqlalchemy import BigInteger, Column, String
+from app.db.base_class import Base
+
+
+class Counter(Base):
+    """Number of the records maintained by the database triggers (see `app.db.counters`)."""
+    __tablename__ = "counters"
+    name = Column(String(50), primary_key=True)
+    value = Column(BigInteger, nullable=False, default=0)
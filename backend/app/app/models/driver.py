@@ -9,5 +9,5 @@ class Driver(Base):
     id = Column(Integer, primary_key=True, index=True)
     first_name = Column(String(100), nullable=False)
     last_name = Column(String(100), nullable=False)
-    created_at = Column(DateTime(), default=datetime.now)
+    created_at = Column(DateTime(), default=datetime.now, index=True)
     updated_at = Column(DateTime(), default=datetime.now, onupdate=datetime.now)
@@ -1,6 +1,6 @@
 from typing import TYPE_CHECKING
 from datetime import datetime
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, text
 from sqlalchemy.orm import relationship
 from app.db.base_class import Base
 
@@ -14,8 +14,16 @@ class Vehicle(Base):
     id = Column(Integer, primary_key=True, index=True)
     make = Column(String(50), nullable=False)
     model = Column(String(100), nullable=False)
-    plate_number = Column(String(10), nullable=False)  # "AA 1234 OO"
-    created_at = Column(DateTime(), default=datetime.now)
+    plate_number = Column(String(10), nullable=False, unique=True, index=True)  # "AA 1234 OO"
+    created_at = Column(DateTime(), default=datetime.now, index=True)
     updated_at = Column(DateTime(), default=datetime.now, onupdate=datetime.now)
-    driver_id = Column(Integer, ForeignKey("drivers.id"))
+    driver_id = Column(Integer, ForeignKey("drivers.id"), index=True)
     driver = relationship("Driver", backref="vehicle", uselist=False)
+
+    # The pages of the vehicles without a driver are read from the small index of only these vehicles
+    __table_args__ = (
+        Index(
+            "ix_vehicles_without_driver", "id",
+            sqlite_where=text("driver_id IS NULL"), postgresql_where=text("driver_id IS NULL")
+        ),
+    )
@@ -1,2 +1,9 @@
 from .driver import DriverCreate, DriverUpdate, DriverDatabase, CreatedAt, DriverID
-from .vehicle import VehicleCreate, VehicleUpdate, VehicleDatabase
+from .vehicle import (
+    VehicleCreate, VehicleUpdate, VehicleBulkUpdate, VehicleDatabase, VehicleWithDriver, DriverWithVehicles
+)
+from .executor import ExecutorStats
+from .pagination import Pagination
+from .bulk import (
+    BulkItemError, BulkCreated, BulkUpdated, BulkDeleted, ImportSummary, DriverAssignment, SkippedAssignment, BulkAssigned
+)
@@ -0,0 +1,50 @@
+from typing import Any, Dict, List, Literal, Optional
+from pydantic import BaseModel, NonNegativeInt, PositiveInt
+
+
+class BulkItemError(BaseModel):
+    """Validation errors of a single item of the bulk request."""
+    index: NonNegativeInt
+    errors: List[Dict[str, Any]]
+
+
+class BulkCreated(BaseModel):
+    """Result of the bulk creation of the records."""
+    created: List[PositiveInt]
+    errors: List[BulkItemError]
+
+
+class ImportSummary(BaseModel):
+    """Result of the import of the records (only the first errors are reported)."""
+    inserted: NonNegativeInt
+    rejected: NonNegativeInt
+    duplicates: NonNegativeInt
+    errors: List[BulkItemError]
+
+
+class BulkUpdated(BaseModel):
+    """Result of the bulk update of the records."""
+    updated: List[PositiveInt]
+    not_found: List[PositiveInt]
+
+
+class BulkDeleted(BaseModel):
+    """Result of the bulk deletion of the records."""
+    deleted: List[PositiveInt]
+
+
+class DriverAssignment(BaseModel):
+    """Vehicle and the driver to put in it (None to remove the driver)."""
+    vehicle_id: PositiveInt
+    driver_id: Optional[PositiveInt] = None
+
+
+class SkippedAssignment(DriverAssignment):
+    """Assignment of the driver that was not applied and the reason."""
+    reason: Literal["vehicle_not_found", "driver_not_found"]
+
+
+class BulkAssigned(BaseModel):
+    """Result of the batch assignment of the drivers to the vehicles."""
+    assigned: List[PositiveInt]
+    skipped: List[SkippedAssignment]
@@ -0,0 +1,12 @@
+from pydantic import BaseModel, NonNegativeFloat, NonNegativeInt
+
+
+class ExecutorStats(BaseModel):
+    """State of the queue of the database calls."""
+    workers: NonNegativeInt
+    active: NonNegativeInt
+    queue_depth: NonNegativeInt
+    completed: NonNegativeInt
+    rejected: NonNegativeInt
+    wait_avg_ms: NonNegativeFloat
+    wait_max_ms: NonNegativeFloat
@@ -0,0 +1,37 @@
+from typing import Any, List, Optional
+from datetime import datetime
+import base64
+import binascii
+import json
+from pydantic import BaseModel, PositiveInt, validator
+
+
+class Pagination(BaseModel):
+    """Query parameters of the keyset (cursor) pagination."""
+    limit: Optional[PositiveInt] = None
+    after: Optional[List[Any]] = None
+
+    @validator("after", pre=True)
+    def decode_cursor(cls, value: Optional[str]) -> Optional[List[Any]]:
+        """Get the key of the last record of the previous page from the opaque cursor."""
+        if value is None:
+            return value
+        try:
+            key = json.loads(base64.urlsafe_b64decode(value.encode("ascii")))
+        except (UnicodeEncodeError, binascii.Error, ValueError):
+            raise ValueError("Invalid pagination cursor")
+        if not isinstance(key, list) or not key:
+            raise ValueError("Invalid pagination cursor")
+        return key
+
+    @property
+    def fetch_limit(self) -> Optional[int]:
+        """Number of records to request from the database (one extra to check for the next page)."""
+        return self.limit + 1 if self.limit is not None else None
+
+    @staticmethod
+    def encode_cursor(key: List[Any]) -> str:
+        """Create the opaque cursor from the key of the last record of the page
+        (the dates of the sorted lists are written in ISO 8601 format)."""
+        data = json.dumps(key, default=datetime.isoformat)
+        return base64.urlsafe_b64encode(data.encode("ascii")).decode("ascii")
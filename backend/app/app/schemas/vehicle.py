@@ -1,6 +1,7 @@
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 from pydantic import BaseModel, constr, PositiveInt
+from .driver import DriverDatabase
 
 
 class VehicleBase(BaseModel):
@@ -26,6 +27,11 @@ class VehicleUpdate(VehicleBase):
     driver_id: Optional[PositiveInt] = None
 
 
+class VehicleBulkUpdate(VehicleUpdate):
+    """Used when updating many vehicles at once, each item contains the ID of the vehicle."""
+    id: PositiveInt
+
+
 class VehicleDatabase(VehicleBase):
     """Vehicle information obtained from the database."""
     id: PositiveInt
@@ -37,3 +43,13 @@ class VehicleDatabase(VehicleBase):
         json_encoders = {
             datetime: lambda dt: datetime.strftime(dt, "%d/%m/%Y %H:%M:%S")
         }
+
+
+class VehicleWithDriver(VehicleDatabase):
+    """Vehicle information with the details of its driver."""
+    driver: Optional[DriverDatabase]
+
+
+class DriverWithVehicles(DriverDatabase):
+    """Driver information with the list of the vehicles of the driver."""
+    vehicles: List[VehicleDatabase]
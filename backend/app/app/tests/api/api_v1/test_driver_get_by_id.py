@@ -55,3 +55,17 @@ def test_driver_get_correct(
     assert datetime.strptime(driver["created_at"], DATETIME_FORMAT), "Date corresponds to specified format"
     assert driver["updated_at"], "Update date is not empty"
     assert datetime.strptime(driver["updated_at"], DATETIME_FORMAT), "Date corresponds to specified format"
+
+
+def test_driver_get_fields(
+    client: TestClient,
+    db: Session
+) -> None:
+    """Get only the requested fields of the driver."""
+    driver_in = schemas.DriverCreate(first_name=random_lower_string(), last_name=random_lower_string())
+    driver_in_db = crud.driver.create(db, obj_in=driver_in)
+    response = client.get(f"{PATH}/{driver_in_db.id}/", params={"fields": "first_name,first_name"})
+    assert response.status_code == 200, "The driver was successfully obtained"
+    assert response.json() == {"id": driver_in_db.id, "first_name": driver_in.first_name}, "Requested fields"
+    response = client.get(f"{PATH}/{driver_in_db.id}/", params={"fields": "age"})
+    assert response.status_code == 422, "Unknown field"
@@ -100,3 +100,21 @@ def test_driver_update_empty_query(
     assert response.status_code == 422, "Input data validation error"
     assert response.headers["Content-Type"] == "application/json", "Response content type"
     assert "detail" in response.json(), "Detailed description of the response"
+
+
+def test_driver_update_with_same_values(
+    client: TestClient,
+    db: Session
+) -> None:
+    """The driver is not written when the details are the same as in the database."""
+    driver_in = schemas.DriverCreate(first_name=random_lower_string(), last_name=random_lower_string())
+    driver_in_db = crud.driver.create(db, obj_in=driver_in)
+    updated_at = driver_in_db.updated_at.strftime(DATETIME_FORMAT)
+    response = client.patch(f"{PATH}/{driver_in_db.id}/", json=driver_in.dict())
+    assert response.status_code == 200, "The driver is found"
+    assert response.headers["X-Changed"] == "false", "The driver is not changed"
+    assert response.json()["updated_at"] == updated_at, "The update date remains the same"
+    response = client.patch(f"{PATH}/{driver_in_db.id}/", json={**driver_in.dict(), "first_name": "new"})
+    assert response.status_code == 200, "The driver was successfully updated"
+    assert response.headers["X-Changed"] == "true", "The driver is changed"
+    assert response.json()["first_name"] == "new", "The first name of the updated driver"
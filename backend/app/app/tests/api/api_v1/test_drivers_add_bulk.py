@@ -0,0 +1,69 @@
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+from app import crud
+from app.core.config import settings
+from app.tests.utils import random_lower_string
+
+PATH = f"{settings.API_V1_STR}/drivers/driver/bulk/"
+
+
+def test_drivers_add_bulk_correct(
+    client: TestClient,
+    db: Session
+) -> None:
+    """Add many drivers with the correct values at once."""
+    drivers_in = [{"first_name": random_lower_string(), "last_name": random_lower_string()} for _ in range(1200)]
+    response = client.post(PATH, json=drivers_in)
+    assert response.status_code == 200, "The drivers were added successfully"
+    assert response.headers["Content-Type"] == "application/json", "Response content type"
+    result = response.json()
+    assert result["errors"] == [], "There are no invalid items"
+    assert len(result["created"]) == len(drivers_in), "IDs of all added drivers"
+    assert crud.driver.count(db) == len(drivers_in), "All drivers are in the database"
+    for id, driver_in in zip(result["created"], drivers_in):
+        driver = crud.driver.get(db, id=id)
+        assert driver is not None, "The driver is present in the database"
+        assert driver.first_name == driver_in["first_name"], "The first name of the driver"
+        assert driver.last_name == driver_in["last_name"], "The last name of the driver"
+        assert driver.created_at is not None, "Date of the driver registration"
+
+
+def test_drivers_add_bulk_with_invalid_items(
+    client: TestClient,
+    db: Session
+) -> None:
+    """Invalid items are reported and skipped, the rest of the drivers are added."""
+    drivers_in = [
+        {"first_name": random_lower_string(), "last_name": random_lower_string()},
+        {"first_name": random_lower_string()},
+        {"first_name": "A", "last_name": random_lower_string()},
+        "hello",
+        {"first_name": random_lower_string(), "last_name": random_lower_string()},
+    ]
+    response = client.post(PATH, json=drivers_in)
+    assert response.status_code == 200, "The valid drivers were added successfully"
+    result = response.json()
+    assert len(result["created"]) == 2, "Only valid drivers are added"
+    assert [error["index"] for error in result["errors"]] == [1, 2, 3], "Positions of the invalid items"
+    for error in result["errors"]:
+        assert error["errors"], "Detailed description of the validation errors"
+    assert crud.driver.count(db) == 2, "Only valid drivers are in the database"
+
+
+def test_drivers_add_bulk_empty_list(
+    client: TestClient,
+    db: Session
+) -> None:
+    """Send the empty list of drivers."""
+    response = client.post(PATH, json=[])
+    assert response.status_code == 200, "Nothing to add"
+    assert response.json() == {"created": [], "errors": []}, "There are no added drivers and no errors"
+
+
+def test_drivers_add_bulk_not_a_list(
+    client: TestClient
+) -> None:
+    """Try to send a single driver instead of the list."""
+    response = client.post(PATH, json={"first_name": random_lower_string(), "last_name": random_lower_string()})
+    assert response.status_code == 422, "The request body must be a list"
+    assert "detail" in response.json(), "Detailed description of the response"
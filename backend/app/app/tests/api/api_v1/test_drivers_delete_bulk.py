@@ -0,0 +1,65 @@
+from datetime import datetime, timedelta
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+from app import crud, schemas
+from app.core.config import settings
+from app.tests.utils import random_lower_string, random_plate_number, create_drivers
+
+PATH = f"{settings.API_V1_STR}/drivers/driver/bulk/"
+DATE_FORMAT = "%d-%m-%Y"
+
+
+def test_drivers_delete_bulk_by_ids(
+    client: TestClient,
+    db: Session
+) -> None:
+    """Delete the drivers with the specified IDs and remove them from their vehicles."""
+    drivers = [
+        crud.driver.create(db, obj_in=schemas.DriverCreate(
+            first_name=random_lower_string(), last_name=random_lower_string()
+        ))
+        for _ in range(5)
+    ]
+    ids = [driver.id for driver in drivers]
+    vehicle_in = schemas.VehicleCreate(
+        make=random_lower_string(), model=random_lower_string(), plate_number=random_plate_number()
+    )
+    vehicle = crud.vehicle.create(db, obj_in=vehicle_in, driver_id=ids[0])
+    response = client.delete(PATH, json=ids[:3] + [ids[-1] + 100])
+    assert response.status_code == 200, "The drivers were deleted"
+    assert response.headers["Content-Type"] == "application/json", "Response content type"
+    assert sorted(response.json()["deleted"]) == ids[:3], "IDs of the deleted drivers"
+    assert crud.driver.count(db) == 2, "The rest of the drivers remain in the database"
+    db.expire_all()
+    vehicle = crud.vehicle.get(db, id=vehicle.id)
+    assert vehicle.driver_id is None, "The driver is removed from the vehicle"  # type: ignore
+
+
+def test_drivers_delete_bulk_by_registration_date(
+    client: TestClient,
+    db: Session
+) -> None:
+    """Delete the drivers registered in the date range."""
+    count = create_drivers(db)
+    tomorrow = (datetime.now() + timedelta(days=1)).strftime(DATE_FORMAT)
+    response = client.delete(f"{PATH}?created_at__gte={tomorrow}")
+    assert response.status_code == 200, "There are no drivers registered tomorrow"
+    assert response.json() == {"deleted": []}, "Nothing is deleted"
+    assert crud.driver.count(db) == count, "All drivers remain in the database"
+    response = client.delete(f"{PATH}?created_at__lte={tomorrow}")
+    assert response.status_code == 200, "The drivers were deleted"
+    assert len(response.json()["deleted"]) == count, "All drivers are deleted"
+    assert crud.driver.count(db) == 0, "The database is empty"
+
+
+def test_drivers_delete_bulk_without_criteria(
+    client: TestClient,
+    db: Session
+) -> None:
+    """The drivers are not deleted without the IDs or the dates."""
+    count = create_drivers(db)
+    for url, ids in [(PATH, None), (f"{PATH}?created_at__gte=2021-01-01", None), (PATH, [0])]:
+        response = client.delete(url, json=ids)
+        assert response.status_code == 422, "Error validating input data"
+        assert "detail" in response.json(), "Detailed description of the response"
+    assert crud.driver.count(db) == count, "All drivers remain in the database"
@@ -0,0 +1,48 @@
+from datetime import datetime
+import json
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+from app import crud
+from app.core.config import settings
+from app.tests.utils import create_drivers
+
+PATH = f"{settings.API_V1_STR}/drivers/export/"
+DATETIME_FORMAT = "%d/%m/%Y %H:%M:%S"
+
+
+def test_drivers_export_empty_db(
+    client: TestClient,
+    db: Session
+) -> None:
+    """Export drivers from the empty database."""
+    response = client.get(PATH)
+    assert response.status_code == 200, "Successful request"
+    assert response.headers["Content-Type"] == "application/x-ndjson", "Response content type"
+    assert response.text == "", "There are no drivers in the database"
+
+
+def test_drivers_export_all(
+    client: TestClient,
+    db: Session,
+    monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Export all drivers reading them from the database in several batches."""
+    monkeypatch.setattr(settings, "EXPORT_BATCH_SIZE", 7)
+    number = create_drivers(db)
+    response = client.get(PATH)
+    assert response.status_code == 200, "Successful request"
+    assert response.headers["Content-Type"] == "application/x-ndjson", "Response content type"
+    lines = response.text.splitlines()
+    assert len(lines) == number, "One line for each driver"
+    ids = []
+    for line in lines:
+        driver = json.loads(line)
+        driver_db = crud.driver.get(db, id=driver["id"])
+        assert driver_db is not None, "The driver is present in the database"
+        assert driver["first_name"] == driver_db.first_name, "First name of the driver"
+        assert driver["last_name"] == driver_db.last_name, "Last name of the driver"
+        assert datetime.strptime(driver["created_at"], DATETIME_FORMAT), "Date corresponds to the specified format"
+        assert datetime.strptime(driver["updated_at"], DATETIME_FORMAT), "Date corresponds to the specified format"
+        ids.append(driver["id"])
+    assert ids == sorted(set(ids)), "Drivers are ordered by ID without repetitions"
@@ -6,7 +6,7 @@ from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 from app import crud, schemas
 from app.core.config import settings
-from app.tests.utils import random_lower_string, create_drivers
+from app.tests.utils import count_queries, random_lower_string, random_plate_number, create_drivers
 
 PATH = f"{settings.API_V1_STR}/drivers/driver/"
 DATE_FORMAT = "%d-%m-%Y"
@@ -209,3 +209,175 @@ def test_get_drivers_created_at_filter_gte_and_lte(
     assert response.headers["Content-Type"] == "application/json", "Response content type"
     assert isinstance(response.json(), List), "Response data type"
     assert len(response.json()) == number, "All drivers were added within the specified period"
+
+
+def test_get_drivers_paginated(
+    client: TestClient,
+    db: Session
+) -> None:
+    """Get all drivers page by page following the links to the next page."""
+    number = create_drivers(db)
+    limit = randint(3, 19)
+    url = f"{PATH}?limit={limit}"
+    ids: List[int] = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200, "The request was completed successfully"
+        page = response.json()
+        assert 0 < len(page) <= limit, "The number of drivers on the page is limited"
+        ids.extend(driver["id"] for driver in page)
+        url = response.links.get("next", {}).get("url")
+        if url:
+            assert len(page) == limit, "Only the last page can be incomplete"
+    assert len(ids) == number, "All drivers are received"
+    assert ids == sorted(set(ids)), "Drivers are ordered by ID without repetitions"
+
+
+def test_get_drivers_with_invalid_cursor(
+    client: TestClient,
+    db: Session
+) -> None:
+    """Try to get the page of drivers with the invalid cursor or limit."""
+    create_drivers(db)
+    for query in ["after=hello", "after=%5B%5D", "after=WyJoZWxsbyJd", "limit=0", "limit=-5", "limit=100000"]:
+        response = client.get(f"{PATH}?{query}")
+        assert response.status_code == 422, "Incorrect pagination parameters"
+        assert response.headers["Content-Type"] == "application/json", "Response content type"
+        assert "detail" in response.json(), "Detailed description of the response"
+
+
+def test_get_drivers_total_count(
+    client: TestClient,
+    db: Session
+) -> None:
+    """The total number of the filtered drivers is returned in the header."""
+    number = create_drivers(db)
+    response = client.get(PATH, params={"limit": 5})
+    assert response.status_code == 200, "The first page of the drivers"
+    assert response.headers["X-Total-Count"] == str(number), "The number of all drivers"
+    dt_str = datetime.strftime(datetime.now() - timedelta(days=2), DATE_FORMAT)
+    for count in ["exact", "estimated"]:
+        response = client.get(PATH, params={"created_at__gte": dt_str, "count": count, "limit": 5})
+        assert response.status_code == 200, "The first page of the filtered drivers"
+        assert response.headers["X-Total-Count"] == str(number), "The number of the filtered drivers"
+    response = client.get(PATH, params={"count": "approximate"})
+    assert response.status_code == 422, "Unknown mode of counting"
+
+
+def test_drivers_get_by_ids(
+    client: TestClient,
+    db: Session
+) -> None:
+    """Get the drivers by the list of IDs in the order of the request."""
+    number = create_drivers(db)
+    response = client.get(PATH, params={"ids": f"2,{number + 1},{number}"})
+    assert response.status_code == 200, "The drivers are found"
+    assert [driver["id"] for driver in response.json()] == [2, number], "Drivers in the order of the request"
+    assert response.headers["X-Not-Found"] == str(number + 1), "IDs which are not found"
+    response = client.get(PATH, params={"ids": "1", "limit": 10})
+    assert response.status_code == 422, "The IDs can not be combined with the pagination"
+
+
+def test_drivers_get_with_vehicles_expanded(
+    client: TestClient,
+    db: Session
+) -> None:
+    """The vehicles of the drivers of the page are included by a fixed number of queries."""
+    drivers = [
+        crud.driver.create(db, obj_in=schemas.DriverCreate(
+            first_name=random_lower_string(), last_name=random_lower_string()
+        ))
+        for _ in range(30)
+    ]
+    for i, driver in enumerate(drivers):
+        for _ in range(i % 3):
+            vehicle_in = schemas.VehicleCreate(
+                make=random_lower_string(), model=random_lower_string(), plate_number=random_plate_number()
+            )
+            crud.vehicle.create(db, obj_in=vehicle_in, driver_id=driver.id)
+    queries_by_limit = {}
+    for limit in [5, 20]:
+        db.expunge_all()
+        with count_queries(db) as queries:
+            response = client.get(PATH, params={"expand": "vehicles", "limit": limit})
+        assert response.status_code == 200, "The drivers are found"
+        page = response.json()
+        assert len(page) == limit, "Drivers of the page"
+        for i, driver in enumerate(page):
+            assert len(driver["vehicles"]) == i % 3, "All vehicles of the driver"
+            driver_ids = {vehicle["driver_id"] for vehicle in driver["vehicles"]}
+            assert driver_ids <= {driver["id"]}, "Vehicles of the driver"
+        queries_by_limit[limit] = len(queries)
+    assert queries_by_limit[5] == queries_by_limit[20], "The number of queries does not depend on the page size"
+    next_page = client.get(response.links["next"]["url"])
+    assert next_page.json()[0]["id"] == 21, "The next page keeps the expansion"
+    assert "vehicles" in next_page.json()[0], "The vehicles are included in the next page"
+    assert "vehicles" not in client.get(PATH).json()[0], "The vehicles are not included without the expansion"
+
+
+def test_drivers_get_fields(
+    client: TestClient,
+    db: Session
+) -> None:
+    """Only the requested fields of the drivers are read from the database and returned."""
+    for _ in range(10):
+        crud.driver.create(db, obj_in=schemas.DriverCreate(
+            first_name=random_lower_string(), last_name=random_lower_string()
+        ))
+    with count_queries(db) as queries:
+        response = client.get(PATH, params={"fields": "last_name,created_at", "limit": 5})
+    assert response.status_code == 200, "The drivers are found"
+    drivers = response.json()
+    assert len(drivers) == 5, "Drivers of the page"
+    for driver in drivers:
+        assert set(driver) == {"id", "last_name", "created_at"}, "Only the requested fields and the ID"
+        assert datetime.strptime(driver["created_at"], "%d/%m/%Y %H:%M:%S"), "Date format is kept"
+    assert "drivers.first_name" not in queries[0], "The other columns are not selected"
+    next_page = client.get(response.links["next"]["url"])
+    assert [driver["id"] for driver in next_page.json()] == [6, 7, 8, 9, 10], "The next page"
+    response = client.get(PATH, params={"fields": "first_name", "ids": "3,1"})
+    assert response.json() == [
+        {"id": 3, "first_name": crud.driver.get(db, id=3).first_name},
+        {"id": 1, "first_name": crud.driver.get(db, id=1).first_name},
+    ], "Drivers by IDs in the order of the request"
+    response = client.get(PATH, params={"fields": "first_name,vehicles"})
+    assert response.status_code == 422, "Unknown field"
+    response = client.get(PATH, params={"fields": "first_name", "expand": "vehicles"})
+    assert response.status_code == 422, "The fields can not be combined with the expansion"
+
+
+def test_drivers_get_sorted(
+    client: TestClient,
+    db: Session
+) -> None:
+    """Get the pages of the latest registered drivers."""
+    registered = datetime.now() - timedelta(days=5)
+    for i in range(12):
+        crud.driver.update(
+            db,
+            db_obj=crud.driver.create(db, obj_in=schemas.DriverCreate(
+                first_name=random_lower_string(), last_name=random_lower_string()
+            )),
+            obj_in={"created_at": registered + timedelta(days=i % 4)}
+        )
+    drivers: List[dict] = []
+    response = client.get(PATH, params={"sort": "-created_at", "limit": 5, "fields": "last_name"})
+    while True:
+        assert response.status_code == 200, "The drivers are found"
+        drivers.extend(response.json())
+        if "next" not in response.links:
+            break
+        response = client.get(response.links["next"]["url"])
+    assert len(drivers) == 12, "All drivers"
+    assert set(drivers[0]) == {"id", "last_name", "created_at"}, "The key of the cursor is returned"
+    keys = [(datetime.strptime(driver["created_at"], "%d/%m/%Y %H:%M:%S"), driver["id"]) for driver in drivers]
+    assert keys == sorted(keys, reverse=True), "The latest registered drivers first"
+    for sort in ["first_name", "created_at,-created_at", "-", "created_at;id"]:
+        response = client.get(PATH, params={"sort": sort})
+        assert response.status_code == 422, "Incorrect sort keys"
+    response = client.get(PATH, params={"sort": "-created_at", "ids": "1,2"})
+    assert response.status_code == 422, "The IDs can not be combined with the sorting"
+    cursor_by_id = re.search("after=([^&>]+)", client.get(PATH, params={"limit": 5}).links["next"]["url"])
+    assert cursor_by_id is not None, "Cursor of the list ordered by ID"
+    response = client.get(PATH, params={"sort": "-created_at", "after": cursor_by_id.group(1)})
+    assert response.status_code == 422, "The cursor does not match the order of the list"
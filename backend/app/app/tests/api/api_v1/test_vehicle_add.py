@@ -179,3 +179,17 @@ def test_vehicle_add_with_wrong_plate_number_format(
         assert response.status_code == 422, "Incoming data validation error"
         assert response.headers["Content-Type"] == "application/json", "Response content type"
         assert "detail" in response.json(), "Detailed description of the response"
+
+
+def test_vehicle_add_duplicate_plate_number(
+    client: TestClient,
+    db: Session
+) -> None:
+    """Try to add the vehicle with the plate number of another vehicle."""
+    vehicle_in = {
+        "make": random_lower_string(), "model": random_lower_string(), "plate_number": random_plate_number()
+    }
+    assert client.post(PATH, json=vehicle_in).status_code == 200, "The vehicle was added successfully"
+    response = client.post(PATH, json=vehicle_in)
+    assert response.status_code == 409, "The plate number is already registered"
+    assert "detail" in response.json(), "Detailed description of the response"
@@ -4,7 +4,7 @@ import re
 from sqlalchemy.orm import Session
 from app import crud, schemas
 from app.core.config import settings
-from app.tests.utils import random_lower_string, random_plate_number
+from app.tests.utils import count_queries, random_lower_string, random_plate_number
 
 PATH = f"{settings.API_V1_STR}/vehicles/vehicle"
 DATETIME_FORMAT = "%d/%m/%Y %H:%M:%S"
@@ -61,3 +61,47 @@ def test_vehicle_get_correct(
     assert datetime.strptime(vehicle["created_at"], DATETIME_FORMAT), "Date corresponds to the specified format"
     assert vehicle["updated_at"], "Update date is not empty"
     assert datetime.strptime(vehicle["updated_at"], DATETIME_FORMAT), "Date corresponds to the specified format"
+
+
+def test_vehicle_get_by_id_with_driver_expanded(
+    client: TestClient,
+    db: Session
+) -> None:
+    """The details of the driver are included in the vehicle by the same query."""
+    driver_in = schemas.DriverCreate(first_name=random_lower_string(), last_name=random_lower_string())
+    driver = crud.driver.create(db, obj_in=driver_in)
+    vehicle_in = schemas.VehicleCreate(
+        make=random_lower_string(), model=random_lower_string(), plate_number=random_plate_number()
+    )
+    vehicle = crud.vehicle.create(db, obj_in=vehicle_in, driver_id=driver.id)
+    db.expunge_all()
+    with count_queries(db) as queries:
+        response = client.get(f"{PATH}/{vehicle.id}/", params={"expand": "driver"})
+    assert response.status_code == 200, "The vehicle is found"
+    assert response.json()["driver"]["first_name"] == driver_in.first_name, "The details of the driver"
+    assert len(queries) == 1, "The vehicle and the driver are read by one query"
+    response = client.get(f"{PATH}/{vehicle.id}/", params={"expand": "vehicle"})
+    assert response.status_code == 422, "Only the driver can be expanded"
+
+
+def test_vehicle_get_fields(
+    client: TestClient,
+    db: Session
+) -> None:
+    """Get only the requested fields of the vehicle."""
+    vehicle_in = schemas.VehicleCreate(
+        make=random_lower_string(), model=random_lower_string(), plate_number=random_plate_number()
+    )
+    vehicle_in_db = crud.vehicle.create(db, obj_in=vehicle_in)
+    with count_queries(db) as queries:
+        response = client.get(f"{PATH}/{vehicle_in_db.id}/", params={"fields": "model,updated_at"})
+    assert response.status_code == 200, "The vehicle was successfully obtained"
+    vehicle = response.json()
+    assert set(vehicle) == {"id", "model", "updated_at"}, "Only the requested fields and the ID"
+    assert vehicle["model"] == vehicle_in.model, "Model of the vehicle"
+    assert datetime.strptime(vehicle["updated_at"], DATETIME_FORMAT), "Date corresponds to specified format"
+    assert len(queries) == 1 and "vehicles.make" not in queries[0], "Only the requested columns are selected"
+    response = client.get(f"{PATH}/{vehicle_in_db.id}/", params={"fields": "color"})
+    assert response.status_code == 422, "Unknown field"
+    response = client.get(f"{PATH}/{vehicle_in_db.id + 1}/", params={"fields": "model"})
+    assert response.status_code == 404, "There is no vehicle with the specified ID"
@@ -51,6 +51,8 @@ def test_vehicle_set_non_existing_driver(
         assert response.status_code == 200, "The vehicle was successfully updated"
         assert response.headers["Content-Type"] == "application/json", "Response content type"
         assert response.json()["driver_id"] == driver.id, "The same driver is in the vehicle"
+        assert response.headers["X-Driver-Not-Found"] == str(driver_id), "The driver is not found"
+        assert response.headers["X-Changed"] == "false", "The vehicle is not changed"
 
 
 def test_vehicle_unset_driver(
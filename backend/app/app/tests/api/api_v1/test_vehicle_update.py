@@ -271,3 +271,21 @@ def test_vehicle_update_with_more_than_one_symbol_strings(
         vehicle = response.json()
         assert vehicle["make"] == make, "Vehicle manufacturer's name"
         assert vehicle["model"] == model, "Vehicle model name"
+
+
+def test_vehicle_update_duplicate_plate_number(
+    client: TestClient,
+    db: Session
+) -> None:
+    """Try to set the plate number of another vehicle."""
+    vehicles_in_db = [
+        crud.vehicle.create(db, obj_in=schemas.VehicleCreate(
+            make=random_lower_string(), model=random_lower_string(), plate_number=random_plate_number()
+        ))
+        for _ in range(2)
+    ]
+    vehicle_up = schemas.VehicleUpdate(plate_number=vehicles_in_db[0].plate_number)
+    response = client.patch(f"{PATH}/{vehicles_in_db[1].id}/", json=vehicle_up.dict())
+    assert response.status_code == 409, "The plate number is already registered"
+    assert "same plate number" in response.json()["detail"], "The violated constraint is described"
+    assert "detail" in response.json(), "Detailed description of the response"
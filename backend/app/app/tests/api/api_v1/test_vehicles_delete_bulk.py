@@ -0,0 +1,52 @@
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+from app import crud
+from app.core.config import settings
+from app.tests.utils import create_vehicles
+
+PATH = f"{settings.API_V1_STR}/vehicles/vehicle/bulk/"
+
+
+def test_vehicles_delete_bulk_by_ids(
+    client: TestClient,
+    db: Session
+) -> None:
+    """Delete the vehicles with the specified IDs."""
+    count = create_vehicles(db, with_driver=False)
+    ids = [vehicle.id for vehicle in crud.vehicle.get_multi(db, limit=count)]
+    response = client.delete(PATH, json=ids[:10] + [ids[-1] + 100])
+    assert response.status_code == 200, "The vehicles were deleted"
+    assert response.headers["Content-Type"] == "application/json", "Response content type"
+    assert sorted(response.json()["deleted"]) == ids[:10], "IDs of the deleted vehicles"
+    assert crud.vehicle.count(db) == count - 10, "The rest of the vehicles remain in the database"
+
+
+def test_vehicles_delete_bulk_with_drivers(
+    client: TestClient,
+    db: Session
+) -> None:
+    """Delete the vehicles filtered by the presence of the driver."""
+    without_driver = create_vehicles(db, with_driver=False)
+    with_driver = create_vehicles(db, with_driver=True)
+    response = client.delete(f"{PATH}?with_drivers=yes")
+    assert response.status_code == 200, "The vehicles were deleted"
+    assert len(response.json()["deleted"]) == with_driver, "All vehicles with the drivers are deleted"
+    assert crud.vehicle.count(db) == without_driver, "The vehicles without the drivers remain"
+    ids = [vehicle.id for vehicle in crud.vehicle.get_multi(db, limit=without_driver)]
+    response = client.delete(f"{PATH}?with_drivers=no", json=ids[:5])
+    assert response.status_code == 200, "The vehicles were deleted"
+    assert sorted(response.json()["deleted"]) == ids[:5], "Both the IDs and the filter are applied"
+    assert crud.vehicle.count(db) == without_driver - 5, "The rest of the vehicles remain"
+
+
+def test_vehicles_delete_bulk_without_criteria(
+    client: TestClient,
+    db: Session
+) -> None:
+    """The vehicles are not deleted without the IDs or the filter."""
+    count = create_vehicles(db, with_driver=True)
+    for url, ids in [(PATH, None), (f"{PATH}?with_drivers=maybe", None), (PATH, ["hello"])]:
+        response = client.delete(url, json=ids)
+        assert response.status_code == 422, "Error validating input data"
+        assert "detail" in response.json(), "Detailed description of the response"
+    assert crud.vehicle.count(db) == count, "All vehicles remain in the database"
@@ -0,0 +1,30 @@
+import json
+import re
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.tests.utils import create_vehicles
+
+PATH = f"{settings.API_V1_STR}/vehicles/export/"
+PLATE_NUMBER_FORMAT = "^[A-Z]{2}\s[0-9]{4}\s[A-Z]{2}$"
+
+
+def test_vehicles_export_all(
+    client: TestClient,
+    db: Session,
+    monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Export all vehicles reading them from the database in several batches."""
+    monkeypatch.setattr(settings, "EXPORT_BATCH_SIZE", 10)
+    without_driver = create_vehicles(db, with_driver=False)
+    with_driver = create_vehicles(db, with_driver=True)
+    response = client.get(PATH)
+    assert response.status_code == 200, "Successful request"
+    assert response.headers["Content-Type"] == "application/x-ndjson", "Response content type"
+    vehicles = [json.loads(line) for line in response.text.splitlines()]
+    assert len(vehicles) == without_driver + with_driver, "One line for each vehicle"
+    for vehicle in vehicles:
+        assert re.match(PLATE_NUMBER_FORMAT, vehicle["plate_number"]), "Vehicle plate number format"
+        assert len(vehicle) == 7, "The number of properties of each vehicle"
+    assert len([v for v in vehicles if v["driver_id"] is None]) == without_driver, "Vehicles without driver"
@@ -3,7 +3,7 @@ from fastapi.testclient import TestClient
 import re
 from sqlalchemy.orm import Session
 from app.core.config import settings
-from app.tests.utils import create_vehicles
+from app.tests.utils import count_queries, create_vehicles
 
 PATH = f"{settings.API_V1_STR}/vehicles/vehicle/"
 DATETIME_FORMAT = "%d/%m/%Y %H:%M:%S"
@@ -87,3 +87,172 @@ def test_vehicles_get_with_wrong_parameter_value(
         assert response.status_code == 422, "Error validating input parameters"
         assert response.headers["Content-Type"] == "application/json", "Response content type"
         assert "detail" in response.json(), "Detailed description of the response"
+
+
+def test_vehicles_get_paginated_with_filter(
+    client: TestClient,
+    db: Session
+) -> None:
+    """Get vehicles with driver page by page following the links to the next page."""
+    create_vehicles(db, with_driver=False)
+    with_driver = create_vehicles(db, with_driver=True)
+    url = f"{PATH}?with_drivers=yes&limit=7"
+    ids = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200, "Successful request"
+        page = response.json()
+        assert 0 < len(page) <= 7, "The number of vehicles on the page is limited"
+        for vehicle in page:
+            assert vehicle["driver_id"] is not None, "The filter is applied to each page"
+        ids.extend(vehicle["id"] for vehicle in page)
+        url = response.links.get("next", {}).get("url")
+    assert len(ids) == with_driver, "All vehicles with driver are received"
+    assert ids == sorted(set(ids)), "Vehicles are ordered by ID without repetitions"
+
+
+def test_vehicles_get_single_page_has_no_next_link(
+    client: TestClient,
+    db: Session
+) -> None:
+    """There is no link to the next page when all vehicles fit on the page."""
+    number = create_vehicles(db, with_driver=False)
+    response = client.get(f"{PATH}?limit={number}")
+    assert response.status_code == 200, "Successful request"
+    assert len(response.json()) == number, "All vehicles on the single page"
+    assert "next" not in response.links, "There is no next page"
+
+
+def test_vehicles_get_total_count(
+    client: TestClient,
+    db: Session
+) -> None:
+    """The total number of the filtered vehicles is returned in the header."""
+    with_driver = create_vehicles(db, with_driver=True)
+    without_driver = create_vehicles(db, with_driver=False)
+    response = client.get(PATH, params={"limit": 5})
+    assert response.status_code == 200, "The first page of the vehicles"
+    assert len(response.json()) == 5, "The number of the vehicles on the page"
+    assert response.headers["X-Total-Count"] == str(with_driver + without_driver), "The number of all vehicles"
+    response = client.get(PATH, params={"with_drivers": "yes"})
+    assert response.headers["X-Total-Count"] == str(with_driver), "The number of vehicles with the driver"
+    response = client.get(PATH, params={"with_drivers": "no"})
+    assert response.headers["X-Total-Count"] == str(without_driver), "The number of vehicles without the driver"
+
+
+def test_vehicles_get_by_ids(
+    client: TestClient,
+    db: Session
+) -> None:
+    """Get the vehicles by the list of IDs in the order of the request."""
+    number = create_vehicles(db, with_driver=False)
+    response = client.get(PATH, params={"ids": f"{number},1,{number + 5},1"})
+    assert response.status_code == 200, "The vehicles are found"
+    assert [vehicle["id"] for vehicle in response.json()] == [number, 1], "Vehicles in the order of the request"
+    assert response.headers["X-Not-Found"] == str(number + 5), "IDs which are not found"
+    assert response.headers["X-Total-Count"] == "2", "Number of the found vehicles"
+    response = client.get(PATH, params={"ids": f"{number + 5}"})
+    assert response.status_code == 404, "None of the vehicles are found"
+
+
+def test_vehicles_get_by_incorrect_ids(
+    client: TestClient,
+    db: Session
+) -> None:
+    """Try to get the vehicles by the incorrect list of IDs or together with the filter."""
+    for ids in ["", "1,,2", "one", "-1", ",".join(str(id) for id in range(1, settings.MULTI_GET_MAX_IDS + 2))]:
+        response = client.get(PATH, params={"ids": ids})
+        assert response.status_code == 422, "Incorrect list of IDs"
+    response = client.get(PATH, params={"ids": "1", "with_drivers": "yes"})
+    assert response.status_code == 422, "The IDs can not be combined with the filter"
+
+
+def test_vehicles_get_with_drivers_expanded(
+    client: TestClient,
+    db: Session
+) -> None:
+    """The details of the drivers are included in the vehicles by a fixed number of queries."""
+    create_vehicles(db, with_driver=True)
+    create_vehicles(db, with_driver=False)
+    queries_by_limit = {}
+    for limit in [5, 20]:
+        db.expunge_all()
+        with count_queries(db) as queries:
+            response = client.get(PATH, params={"expand": "driver", "limit": limit})
+        assert response.status_code == 200, "The vehicles are found"
+        vehicles = response.json()
+        assert len(vehicles) == limit, "Vehicles of the page"
+        for vehicle in vehicles:
+            assert vehicle["driver"] is not None, "The driver is included in the vehicle"
+            assert vehicle["driver"]["id"] == vehicle["driver_id"], "The driver of the vehicle"
+        queries_by_limit[limit] = len(queries)
+    assert queries_by_limit[5] == queries_by_limit[20], "The number of queries does not depend on the page size"
+    db.expunge_all()
+    with count_queries(db) as queries:
+        response = client.get(PATH, params={"expand": "driver", "with_drivers": "no", "limit": 5})
+    assert all(vehicle["driver"] is None for vehicle in response.json()), "The vehicles without a driver"
+    assert len(queries) == queries_by_limit[5], "The same number of queries"
+    assert "driver" not in client.get(PATH).json()[0], "The driver is not included without the expansion"
+
+
+def test_vehicles_get_fields(
+    client: TestClient,
+    db: Session
+) -> None:
+    """Only the requested fields of the vehicles are read from the database and returned."""
+    create_vehicles(db, with_driver=True)
+    with count_queries(db) as queries:
+        response = client.get(PATH, params={"fields": "plate_number,driver_id", "limit": 5})
+    assert response.status_code == 200, "The vehicles are found"
+    vehicles = response.json()
+    assert len(vehicles) == 5, "Vehicles of the page"
+    for vehicle in vehicles:
+        assert set(vehicle) == {"id", "plate_number", "driver_id"}, "Only the requested fields and the ID"
+        assert re.match(PLATE_NUMBER_FORMAT, vehicle["plate_number"]), "Plate number of the vehicle"
+    assert "vehicles.make" not in queries[0], "The other columns are not selected"
+    assert int(response.headers["X-Total-Count"]) > 5, "Total number of the vehicles"
+    next_page = client.get(response.links["next"]["url"])
+    assert next_page.json()[0]["id"] == vehicles[-1]["id"] + 1, "The next page follows the current one"
+    assert set(next_page.json()[0]) == {"id", "plate_number", "driver_id"}, "The next page keeps the fields"
+    response = client.get(PATH, params={"fields": "created_at", "ids": f"{vehicles[0]['id']},1000000"})
+    assert response.status_code == 200, "The vehicles are found by IDs"
+    assert datetime.strptime(response.json()[0]["created_at"], DATETIME_FORMAT), "Date format is kept"
+    assert response.headers["X-Not-Found"] == "1000000", "IDs which are not found"
+
+
+def test_vehicles_get_incorrect_fields(
+    client: TestClient,
+    db: Session
+) -> None:
+    """Try to request unknown fields or combine the fields with the expansion."""
+    create_vehicles(db, with_driver=True)
+    for fields in ["", "make,", "make,color", "driver", "make;model"]:
+        response = client.get(PATH, params={"fields": fields})
+        assert response.status_code == 422, "Incorrect list of fields"
+    response = client.get(PATH, params={"fields": "make", "expand": "driver"})
+    assert response.status_code == 422, "The fields can not be combined with the expansion"
+
+
+def test_vehicles_get_sorted(
+    client: TestClient,
+    db: Session
+) -> None:
+    """Get the pages of the vehicles sorted by several keys."""
+    create_vehicles(db, with_driver=False)
+    vehicles = []
+    response = client.get(PATH, params={"sort": "-created_at,plate_number", "limit": 3})
+    while True:
+        assert response.status_code == 200, "The vehicles are found"
+        vehicles.extend(response.json())
+        if "next" not in response.links:
+            break
+        response = client.get(response.links["next"]["url"])
+    assert len(vehicles) == int(response.headers["X-Total-Count"]), "All vehicles"
+    created = [datetime.strptime(vehicle["created_at"], DATETIME_FORMAT) for vehicle in vehicles]
+    assert created == sorted(created, reverse=True), "The latest registered vehicles first"
+    response = client.get(PATH, params={"sort": "plate_number", "fields": "make"})
+    plate_numbers = [vehicle["plate_number"] for vehicle in response.json()]
+    assert plate_numbers == sorted(plate_numbers), "Sorted by the plate number, which is returned as the key"
+    for sort in ["make", "driver_id", "plate_number,plate_number"]:
+        response = client.get(PATH, params={"sort": sort})
+        assert response.status_code == 422, "The vehicles can be sorted only by the indexed columns"
@@ -0,0 +1,64 @@
+import gzip
+import json
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+from app import crud
+from app.core.config import settings
+from app.tests.utils import random_lower_string, random_plate_number
+
+PATH = f"{settings.API_V1_STR}/vehicles/import/"
+
+
+def test_vehicles_import_csv(
+    client: TestClient,
+    db: Session
+) -> None:
+    """Import vehicles from CSV recognized by the Content-Type header."""
+    rows = [(random_lower_string(), random_lower_string(), random_plate_number()) for _ in range(40)]
+    data = "make,model,plate_number\n" + "".join(f"{make},{model},{plate}\n" for make, model, plate in rows)
+    response = client.post(PATH, data=data.encode(), headers={"Content-Type": "text/csv"})
+    assert response.status_code == 200, "The vehicles were imported"
+    assert response.headers["Content-Type"] == "application/json", "Response content type"
+    assert response.json() == {"inserted": 40, "rejected": 0, "duplicates": 0, "errors": []}, "Import summary"
+    assert crud.vehicle.count(db) == 40, "All vehicles are in the database"
+
+
+def test_vehicles_import_gzipped_jsonl(
+    client: TestClient,
+    db: Session
+) -> None:
+    """Import gzip-encoded JSON lines with the format specified by the query parameter."""
+    plate = random_plate_number()
+    rows = [
+        {"make": random_lower_string(), "model": random_lower_string(), "plate_number": plate},
+        {"make": random_lower_string(), "model": random_lower_string(), "plate_number": plate},
+        {"make": random_lower_string(), "model": random_lower_string(), "plate_number": "AA-1234-BB"},
+    ]
+    data = gzip.compress("\n".join(json.dumps(row) for row in rows).encode())
+    response = client.post(f"{PATH}?format=jsonl", data=data, headers={"Content-Encoding": "gzip"})
+    assert response.status_code == 200, "The vehicles were imported"
+    summary = response.json()
+    assert summary["inserted"] == 1, "Inserted vehicles"
+    assert summary["duplicates"] == 1, "Duplicates of the plate numbers"
+    assert summary["rejected"] == 1, "Invalid rows"
+    assert summary["errors"][0]["index"] == 2, "Position of the invalid row"
+
+
+def test_vehicles_import_unknown_format(
+    client: TestClient
+) -> None:
+    """Try to import the data without specifying its format."""
+    response = client.post(PATH, data=b"make,model,plate_number\n", headers={"Content-Type": "text/plain"})
+    assert response.status_code == 415, "Unsupported format of the data"
+    assert "detail" in response.json(), "Detailed description of the response"
+    response = client.post(f"{PATH}?format=xml", data=b"<vehicles/>")
+    assert response.status_code == 422, "Incorrect value of the format"
+
+
+def test_vehicles_import_broken_gzip(
+    client: TestClient
+) -> None:
+    """Try to import the data that is not gzip-encoded as declared."""
+    response = client.post(f"{PATH}?format=csv", data=b"make,model\n", headers={"Content-Encoding": "gzip"})
+    assert response.status_code == 400, "The data can not be parsed"
+    assert "detail" in response.json(), "Detailed description of the response"
@@ -0,0 +1,75 @@
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+from app import crud
+from app.core.config import settings
+from app.tests.utils import create_drivers, create_vehicles
+
+PATH = f"{settings.API_V1_STR}/vehicles/set_driver/"
+
+
+def test_vehicles_set_drivers(
+    client: TestClient,
+    db: Session
+) -> None:
+    """Put the drivers in many vehicles and remove them from others at once."""
+    create_drivers(db, count=3)
+    drivers = [driver.id for driver in crud.driver.get_multi(db)]
+    create_vehicles(db, with_driver=False, count=6)
+    create_vehicles(db, with_driver=True, count=1)
+    vehicles = [vehicle.id for vehicle in crud.vehicle.get_multi(db)]
+    assignments = [
+        {"vehicle_id": vehicle_id, "driver_id": drivers[i % len(drivers)]}
+        for i, vehicle_id in enumerate(vehicles[:-1])
+    ] + [{"vehicle_id": vehicles[-1], "driver_id": None}]
+    response = client.post(PATH, json=assignments)
+    assert response.status_code == 200, "The vehicles were updated"
+    assert response.headers["Content-Type"] == "application/json", "Response content type"
+    assert response.json() == {"assigned": vehicles, "skipped": []}, "All vehicles are updated"
+    db.expire_all()
+    for assignment in assignments:
+        vehicle = crud.vehicle.get(db, id=assignment["vehicle_id"])
+        assert vehicle.driver_id == assignment["driver_id"], "The driver in the vehicle"  # type: ignore
+
+
+def test_vehicles_set_drivers_skipped(
+    client: TestClient,
+    db: Session
+) -> None:
+    """Pairs with the vehicles or the drivers which do not exist are skipped."""
+    create_vehicles(db, with_driver=False, count=1)
+    create_vehicles(db, with_driver=True, count=1)
+    vehicle_id, other_id = [vehicle.id for vehicle in crud.vehicle.get_multi(db)]
+    driver_id = crud.vehicle.get(db, id=other_id).driver_id  # type: ignore
+    response = client.post(PATH, json=[
+        {"vehicle_id": vehicle_id, "driver_id": driver_id},
+        {"vehicle_id": other_id, "driver_id": driver_id + 100},
+        {"vehicle_id": other_id + 100, "driver_id": driver_id},
+    ])
+    assert response.status_code == 200, "The existing pair was applied"
+    assert response.json() == {
+        "assigned": [vehicle_id],
+        "skipped": [
+            {"vehicle_id": other_id, "driver_id": driver_id + 100, "reason": "driver_not_found"},
+            {"vehicle_id": other_id + 100, "driver_id": driver_id, "reason": "vehicle_not_found"},
+        ]
+    }, "The skipped pairs and the reason"
+    db.expire_all()
+    assert crud.vehicle.get(db, id=vehicle_id).driver_id == driver_id, "The driver is set"  # type: ignore
+    assert crud.vehicle.get(db, id=other_id).driver_id == driver_id, "The vehicle is not changed"  # type: ignore
+
+
+def test_vehicles_set_drivers_with_wrong_values(
+    client: TestClient,
+    db: Session
+) -> None:
+    """Nothing is updated when any pair is invalid."""
+    create_vehicles(db, with_driver=False, count=1)
+    vehicle_id = crud.vehicle.get_multi(db)[0].id
+    for assignments in [
+        [{"vehicle_id": vehicle_id, "driver_id": 0}],
+        [{"driver_id": 1}],
+        {"vehicle_id": vehicle_id, "driver_id": None},
+    ]:
+        response = client.post(PATH, json=assignments)
+        assert response.status_code == 422, "Error validating input data"
+        assert "detail" in response.json(), "Detailed description of the response"
@@ -0,0 +1,90 @@
+import pytest
+import sqlite3
+from fastapi.testclient import TestClient
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app import crud
+from app.core.config import settings
+from app.tests.utils import create_vehicles, random_lower_string, random_plate_number
+
+PATH = f"{settings.API_V1_STR}/vehicles/vehicle/bulk/"
+
+
+def test_vehicles_update_bulk(
+    client: TestClient,
+    db: Session
+) -> None:
+    """Update many vehicles with the same and different changes at once."""
+    create_vehicles(db, with_driver=False, count=10)
+    ids = [vehicle.id for vehicle in crud.vehicle.get_multi(db)]
+    make = random_lower_string()
+    plates = {id: random_plate_number() for id in ids[5:]}
+    vehicles_in = [{"id": id, "make": make} for id in ids[:5]]
+    vehicles_in += [{"id": id, "plate_number": plate, "model": None} for id, plate in plates.items()]
+    response = client.patch(PATH, json=vehicles_in)
+    assert response.status_code == 200, "The vehicles were updated"
+    assert response.headers["Content-Type"] == "application/json", "Response content type"
+    assert response.json() == {"updated": ids, "not_found": []}, "All vehicles are updated"
+    db.expire_all()
+    for id in ids[:5]:
+        assert crud.vehicle.get(db, id=id).make == make, "The same new manufacturer"  # type: ignore
+    for id, plate in plates.items():
+        vehicle = crud.vehicle.get(db, id=id)
+        assert vehicle.plate_number == plate, "The new plate number of each vehicle"  # type: ignore
+        assert vehicle.model is not None, "Empty values are ignored"  # type: ignore
+
+
+def test_vehicles_update_bulk_not_found(
+    client: TestClient,
+    db: Session
+) -> None:
+    """Vehicles which are not present in the database are reported."""
+    create_vehicles(db, with_driver=False, count=1)
+    id = crud.vehicle.get_multi(db)[0].id
+    model = random_lower_string()
+    response = client.patch(PATH, json=[{"id": id, "model": model}, {"id": id + 100, "model": model}])
+    assert response.status_code == 200, "The existing vehicle was updated"
+    assert response.json() == {"updated": [id], "not_found": [id + 100]}, "Updated and missing vehicles"
+    db.expire_all()
+    assert crud.vehicle.get(db, id=id).model == model, "The new model of the vehicle"  # type: ignore
+
+
+def test_vehicles_update_bulk_with_wrong_values(
+    client: TestClient,
+    db: Session
+) -> None:
+    """Nothing is updated when any item is invalid."""
+    create_vehicles(db, with_driver=False, count=1)
+    id = crud.vehicle.get_multi(db)[0].id
+    for vehicles_in in [
+        [{"id": id, "plate_number": "hello"}],
+        [{"id": id, "make": random_lower_string()}, {"make": random_lower_string()}],
+        [{"id": 0, "make": random_lower_string()}],
+        {"id": id, "make": random_lower_string()},
+    ]:
+        response = client.patch(PATH, json=vehicles_in)
+        assert response.status_code == 422, "Error validating input data"
+        assert "detail" in response.json(), "Detailed description of the response"
+
+
+def test_vehicles_update_bulk_violating_constraints(
+    client: TestClient,
+    db: Session,
+    monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Only the duplicate plate number is reported as the registered one, other violations are generic."""
+    create_vehicles(db, with_driver=False, count=2)
+    vehicles = crud.vehicle.get_multi(db)
+    ids, plate_number = [vehicle.id for vehicle in vehicles], vehicles[0].plate_number
+    response = client.patch(PATH, json=[{"id": ids[1], "plate_number": plate_number}])
+    assert response.status_code == 409, "The plate number is already registered"
+    assert "same plate number" in response.json()["detail"], "The duplicate plate number is described"
+
+    def violate_foreign_key(*args: object, **kwargs: object) -> None:
+        raise IntegrityError("UPDATE vehicles", {}, sqlite3.IntegrityError("FOREIGN KEY constraint failed"))
+
+    monkeypatch.setattr(crud.vehicle, "update_multi", violate_foreign_key)
+    response = client.patch(PATH, json=[{"id": ids[0], "driver_id": 1000000}])
+    assert response.status_code == 409, "The changes violate the constraints"
+    assert "plate number" not in response.json()["detail"], "The unknown driver is not a duplicate plate number"
+    assert "FOREIGN KEY" in response.json()["detail"], "The violated constraint is described"
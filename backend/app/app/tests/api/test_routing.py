@@ -0,0 +1,86 @@
+from typing import Any
+from fastapi import APIRouter, Depends, FastAPI, HTTPException, Request
+from fastapi.testclient import TestClient
+from app.api.routing import PRIMARY_PIN_COOKIE, PRIMARY_PIN_HEADER, UnitOfWorkRoute, is_pinned_to_primary
+
+
+class FakeSession:
+    """Records the commits of the unit of work."""
+
+    def __init__(self, fail: bool = False):
+        self.commits = 0
+        self.fail = fail
+
+    def commit(self) -> None:
+        if self.fail:
+            raise RuntimeError("database is locked")
+        self.commits += 1
+
+
+def create_client(db: FakeSession) -> TestClient:
+    """Application with the routes of the unit of work using the fake session."""
+    router = APIRouter(route_class=UnitOfWorkRoute)
+
+    def get_db(request: Request) -> FakeSession:
+        request.state.db = db
+        return db
+
+    @router.get("/item/")
+    def read(request: Request, db: Any = Depends(get_db)) -> Any:
+        return {"commits": db.commits, "primary": is_pinned_to_primary(request)}
+
+    @router.post("/item/")
+    def write(db: Any = Depends(get_db)) -> Any:
+        return {"commits": db.commits}
+
+    @router.delete("/item/")
+    def fail(db: Any = Depends(get_db)) -> Any:
+        raise HTTPException(status_code=404, detail="Not found")
+
+    app = FastAPI()
+    app.include_router(router)
+    return TestClient(app)
+
+
+def test_unit_of_work_commits_once_before_response() -> None:
+    """The changes are committed once after the endpoint is completed."""
+    db = FakeSession()
+    client = create_client(db)
+    response = client.post("/item/")
+    assert response.status_code == 200, "The request is successful"
+    assert response.json() == {"commits": 0}, "The endpoint does not commit"
+    assert db.commits == 1, "The unit of work is committed once"
+
+
+def test_unit_of_work_is_not_committed_without_changes_or_on_error() -> None:
+    """Read requests and failed requests are not committed."""
+    db = FakeSession()
+    client = create_client(db)
+    response = client.get("/item/")
+    assert response.status_code == 200, "The read request is successful"
+    assert PRIMARY_PIN_HEADER not in response.headers, "The client is not pinned to the primary database"
+    assert client.delete("/item/").status_code == 404, "The endpoint returns an error"
+    assert db.commits == 0, "Nothing is committed"
+
+
+def test_unit_of_work_commit_failure() -> None:
+    """The client receives an error when the changes can not be committed."""
+    client = create_client(FakeSession(fail=True))
+    response = client.post("/item/")
+    assert response.status_code == 503, "The changes are not saved"
+    assert "database is locked" in response.json()["detail"], "Detailed description of the response"
+
+
+def test_client_is_pinned_to_primary_after_changes() -> None:
+    """After the changes the client reads from the primary database with the cookie or the header."""
+    client = create_client(FakeSession())
+    assert client.get("/item/").json()["primary"] is False, "The client reads from the replica"
+    response = client.post("/item/")
+    assert PRIMARY_PIN_HEADER in response.headers, "The time of the pinning is returned in the header"
+    assert PRIMARY_PIN_COOKIE in response.cookies, "The time of the pinning is returned in the cookie"
+    assert client.get("/item/").json()["primary"] is True, "The client with the cookie reads from the primary"
+    other_client = create_client(FakeSession())
+    headers = {PRIMARY_PIN_HEADER: response.headers[PRIMARY_PIN_HEADER]}
+    assert other_client.get("/item/", headers=headers).json()["primary"] is True, "The header pins the client"
+    headers = {PRIMARY_PIN_HEADER: "1"}
+    assert other_client.get("/item/", headers=headers).json()["primary"] is False, "The pinning has expired"
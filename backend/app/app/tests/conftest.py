@@ -1,11 +1,13 @@
 from typing import Generator
 import pytest
+from fastapi import Request
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.engine import Engine
 from sqlalchemy.orm import Session
 from app.api import deps
 from app.db.base import Base
+from app.db.session import enable_sqlite_savepoints
 from app.main import app
 
 
@@ -13,6 +15,7 @@ from app.main import app
 def engine() -> Generator:
     """Create the SQLite test database with all nesesery tables in memory."""
     engine = create_engine(url="sqlite://", connect_args={"check_same_thread": False})
+    enable_sqlite_savepoints(engine)
     Base.metadata.create_all(bind=engine)
     yield engine
 
@@ -33,6 +36,12 @@ def db(engine: Engine) -> Generator:
 @pytest.fixture(scope="function")
 def client(db: Session) -> Generator:
     """Test client for make requests."""
-    app.dependency_overrides[deps.get_db] = lambda: db
+    def get_test_db(request: Request) -> Session:
+        """The session of the test is the unit of work of each request."""
+        request.state.db = db
+        return db
+
+    app.dependency_overrides[deps.get_db] = get_test_db
+    app.dependency_overrides[deps.get_read_db] = get_test_db
     with TestClient(app) as cl:
         yield cl
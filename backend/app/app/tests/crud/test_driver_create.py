@@ -32,3 +32,21 @@ def test_driver_create_with_wrong_values(
         schemas.DriverCreate(first_name=random_lower_string()[0], last_name=random_lower_string())
         schemas.DriverCreate(first_name=random_lower_string(), last_name=random_lower_string()[0])
         schemas.DriverCreate(first_name=random_lower_string()[0], last_name=random_lower_string()[0])
+
+
+def test_driver_create_multi(
+    db: Session
+) -> None:
+    """Create many drivers in a single transaction."""
+    drivers_in = [
+        schemas.DriverCreate(first_name=random_lower_string(), last_name=random_lower_string()) for _ in range(50)
+    ]
+    ids = crud.driver.create_multi(db, objs_in=drivers_in)
+    assert len(ids) == len(drivers_in), "ID of each created driver"
+    assert len(set(ids)) == len(ids), "All IDs are unique"
+    for id, driver_in in zip(ids, drivers_in):
+        driver = crud.driver.get(db, id=id)
+        assert isinstance(driver, models.Driver), "The created object corresponds to the declared model"
+        assert driver.first_name == driver_in.first_name, "The first name of the driver"
+        assert isinstance(driver.created_at, datetime), "Date of the driver registration"
+    assert crud.driver.create_multi(db, objs_in=[]) == [], "Nothing to create"
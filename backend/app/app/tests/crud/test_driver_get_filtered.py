@@ -1,7 +1,8 @@
 from datetime import datetime, timedelta
+import pytest
 from sqlalchemy.orm import Session
 from app import crud, models
-from app.tests.utils import create_drivers
+from app.tests.utils import count_queries, create_drivers, create_vehicles
 
 
 def test_drivers_get_filtered_from_empty_db(
@@ -104,3 +105,78 @@ def test_drivers_get_filtered_gte_and_lte(
     for driver in drivers:
         assert driver.created_at >= gte, "Registration date today"
         assert driver.created_at < lte, "Registration date before tomorrow"
+
+
+def test_drivers_get_filtered_with_vehicles(
+    db: Session
+) -> None:
+    """The vehicles of all drivers of the page are loaded by one more query."""
+    number = create_vehicles(db, with_driver=True)
+    db.expunge_all()
+    with count_queries(db) as queries:
+        drivers = crud.driver.get_filtered(db, limit=number, load_vehicles=True)
+        assert all(len(driver.vehicle) == 1 for driver in drivers), "Each driver has one vehicle"
+    assert len(drivers) == number, "All drivers"
+    assert len(queries) == 2, "The drivers and their vehicles are read by two queries"
+
+
+def test_drivers_get_filtered_sorted(
+    db: Session
+) -> None:
+    """Get the pages of the latest registered drivers (registered at the same time are ordered by ID)."""
+    registered = datetime(2021, 12, 1, 10, 30, 15, 123456)
+    for i in range(10):
+        created_at = registered + timedelta(days=i // 3)
+        db.add(models.Driver(first_name=f"First{i}", last_name=f"Last{i}", created_at=created_at))
+    db.flush()
+    drivers = crud.driver.get_filtered(db)
+    expected = sorted(drivers, key=lambda driver: (driver.created_at, driver.id), reverse=True)
+    assert crud.driver.cursor_keys(["-created_at"]) == ["created_at", "id"], "The ID is a part of the cursor"
+    pages, after = [], None
+    while True:
+        page = crud.driver.get_filtered(db, sort=["-created_at"], limit=4, after=after)
+        pages.append(page)
+        if len(page) < 4:
+            break
+        after = [page[-1].created_at.isoformat(), page[-1].id]
+    assert [driver.id for page in pages for driver in page] == [driver.id for driver in expected], "Sorted pages"
+    rows = crud.driver.get_filtered(db, sort=["created_at"], fields=["id", "created_at"], limit=2)
+    assert [row.id for row in rows] == [driver.id for driver in expected[::-1][:2]], "Sorted rows of the columns"
+
+
+def test_drivers_get_filtered_cached_statement_dates(
+    db: Session
+) -> None:
+    """The cached statement takes the new dates on each call and finds the same drivers as the sorted query."""
+    registered = datetime(2021, 12, 1, 10, 30)
+    for i in range(10):
+        created_at = registered + timedelta(days=i)
+        db.add(models.Driver(first_name=f"First{i}", last_name=f"Last{i}", created_at=created_at))
+    db.flush()
+    numbers = []
+    for gte, lte in [(None, None), (registered, None), (None, registered + timedelta(days=5)),
+                     (registered + timedelta(days=2), registered + timedelta(days=7))]:
+        drivers = crud.driver.get_filtered(db, gte=gte, lte=lte)
+        sorted_drivers = crud.driver.get_filtered(db, gte=gte, lte=lte, sort=["id"])
+        assert [d.id for d in drivers] == [d.id for d in sorted_drivers], f"The same drivers for {gte} - {lte}"
+        numbers.append(len(drivers))
+        assert len(drivers) == crud.driver.count_filtered(db, gte=gte, lte=lte), "The same drivers are counted"
+    assert numbers == [10, 10, 5, 5], "The drivers are filtered by the new dates"
+
+
+def test_drivers_get_filtered_sorted_incorrect_cursor(
+    db: Session
+) -> None:
+    """The cursor of the sorted list must contain the values of all columns of the order."""
+    for after in [[1], ["2021-12-01", "1"], [None, 1], ["yesterday", 1], [True, 1]]:
+        with pytest.raises(ValueError):
+            crud.driver.get_filtered(db, sort=["-created_at"], after=after)
+
+
+def test_sort_keys_backed_by_indexes() -> None:
+    """Each sort key of the lists is the leading column of an index of the table."""
+    for crud_object in [crud.driver, crud.vehicle]:
+        table = crud_object.model.__table__
+        leading = {list(index.columns)[0].name for index in table.indexes}
+        for key in crud_object.sort_keys:
+            assert table.c[key].primary_key or key in leading, f"Index of the {table.name}.{key} column"
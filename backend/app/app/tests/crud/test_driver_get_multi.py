@@ -74,3 +74,18 @@ def test_drivers_get_multi_skip_and_limit(
     for driver in drivers:
         assert driver.id >= skip, "Missing all IDs of the skipped drivers"
         assert driver.id <= limit + skip, "There are no identifiers outside the specified value"
+
+
+def test_drivers_get_multi_after_key(
+    db: Session
+) -> None:
+    """Get the page of drivers that follows the key of the last driver of the previous page."""
+    number = create_drivers(db)
+    limit = randint(3, 19)
+    first_page = crud.driver.get_multi(db, limit=limit)
+    second_page = crud.driver.get_multi(db, limit=limit, after=[first_page[-1].id])
+    assert len(second_page) == min(limit, number - limit), "The number of drivers on the page"
+    assert second_page[0].id > first_page[-1].id, "The page starts after the key of the previous page"
+    assert [driver.id for driver in first_page + second_page] == sorted(
+        driver.id for driver in first_page + second_page
+    ), "Drivers are ordered by ID"
@@ -2,7 +2,7 @@ import pytest
 from pydantic import ValidationError
 from sqlalchemy.orm import Session
 from app import crud, schemas, models
-from app.tests.utils import random_lower_string
+from app.tests.utils import count_queries, random_lower_string
 
 
 def test_driver_update_using_schema(
@@ -71,3 +71,17 @@ def test_driver_update_using_dict_with_last_name_only(
     assert driver_up.last_name == new_last_name, "The new last name of the driver"
     assert driver_up.created_at == driver.created_at, "Date of the driver registration"
     assert driver_up.updated_at <= driver.updated_at, "Driver information update date"
+
+
+def test_driver_update_single_statement(
+    db: Session
+) -> None:
+    """The driver is updated by a single statement without reading it back."""
+    driver_in = schemas.DriverCreate(first_name=random_lower_string(), last_name=random_lower_string())
+    driver = crud.driver.create(db, obj_in=driver_in)
+    updated_at = driver.updated_at
+    with count_queries(db) as statements:
+        driver = crud.driver.update(db, db_obj=driver, obj_in={"first_name": random_lower_string()})
+        assert driver.updated_at >= updated_at, "Date the driver information was updated"
+    assert len(statements) == 1, "Only the UPDATE statement is executed"
+    assert statements[0].startswith("UPDATE"), "The driver is updated"
@@ -1,7 +1,7 @@
 from sqlalchemy.orm import Session
 from random import randint
 from app import crud, schemas
-from app.tests.utils import random_lower_string, random_plate_number
+from app.tests.utils import count_queries, create_vehicles, random_lower_string, random_plate_number
 
 
 def test_vehicles_count_empty(
@@ -25,3 +25,22 @@ def test_vehicles_count(
         crud.vehicle.create(db, obj_in=vehicle_in)
     count = crud.vehicle.count(db)
     assert count == number, "The number of the vehicles is correct"
+
+
+def test_vehicles_count_filtered(
+    db: Session
+) -> None:
+    """Count the vehicles by the presence of the driver without scanning the table."""
+    with_driver = create_vehicles(db, with_driver=True)
+    without_driver = create_vehicles(db, with_driver=False)
+    with count_queries(db) as statements:
+        assert crud.vehicle.count_filtered(db) == with_driver + without_driver, "All vehicles"
+        assert crud.vehicle.count_filtered(db, with_driver=True) == with_driver, "Vehicles with the driver"
+        assert crud.vehicle.count_filtered(db, with_driver=False) == without_driver, "Vehicles without the driver"
+    assert all("counters" in statement for statement in statements), "The numbers are read from the counters"
+    vehicles = crud.vehicle.get_filtered(db, with_driver=True)
+    crud.vehicle.set_driver(db, id=vehicles[0].id, driver_id=None)
+    crud.vehicle.remove(db, id=vehicles[1].id)
+    assert crud.vehicle.count_filtered(db, with_driver=True) == with_driver - 2, "The counter is decreased"
+    assert crud.vehicle.count_filtered(db, with_driver=False) == without_driver + 1, "The counter is increased"
+    assert crud.vehicle.count(db) == with_driver + without_driver - 1, "The removed vehicle is not counted"
@@ -1,9 +1,11 @@
 import pytest
 from datetime import datetime
+from types import SimpleNamespace
 from pydantic import ValidationError
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from app import crud, schemas, models
-from app.tests.utils import random_lower_string, random_plate_number
+from app.tests.utils import count_queries, random_lower_string, random_plate_number
 
 
 def test_vehicle_create_correct(
@@ -45,3 +47,38 @@ def test_vehicle_create_with_wrong_values(
             schemas.VehicleCreate(
                 make=random_lower_string(), model=random_lower_string(), plate_number=plate_number
             )
+
+
+def test_vehicle_create_single_statement(
+    db: Session
+) -> None:
+    """The vehicle is added by a single statement without reading it back."""
+    vehicle_in = schemas.VehicleCreate(
+        make=random_lower_string(), model=random_lower_string(), plate_number=random_plate_number()
+    )
+    with count_queries(db) as statements:
+        vehicle = crud.vehicle.create(db, obj_in=vehicle_in)
+        assert vehicle.id > 0, "ID of the vehicle"
+        assert isinstance(vehicle.created_at, datetime), "Date the vehicle was added to the database"
+        assert isinstance(vehicle.updated_at, datetime), "Date the vehicle information was updated"
+    assert len(statements) == 1, "Only the INSERT statement is executed"
+    assert statements[0].startswith("INSERT"), "The vehicle is inserted"
+
+
+def test_vehicle_create_duplicate_plate_number(
+    db: Session
+) -> None:
+    """The duplicate plate number is recognized as the violation of its unique index."""
+    vehicle_in = schemas.VehicleCreate(
+        make=random_lower_string(), model=random_lower_string(), plate_number=random_plate_number()
+    )
+    crud.vehicle.create(db, obj_in=vehicle_in)
+    with pytest.raises(IntegrityError) as error:
+        with db.begin_nested():
+            crud.vehicle.create(db, obj_in=vehicle_in)
+    assert crud.vehicle.violates_unique(error.value, "ix_vehicles_plate_number"), "Duplicate plate number"
+    assert not crud.vehicle.violates_unique(error.value, "ix_vehicles_driver_id"), "Another index"
+    for constraint, expected in [("ix_vehicles_plate_number", True), ("vehicles_driver_id_fkey", False)]:
+        orig = SimpleNamespace(diag=SimpleNamespace(constraint_name=constraint))
+        error_with_name = IntegrityError("INSERT INTO vehicles", {}, orig)  # type: ignore
+        assert crud.vehicle.violates_unique(error_with_name, "ix_vehicles_plate_number") == expected, constraint
@@ -1,6 +1,7 @@
 from random import randint
 from sqlalchemy.orm import Session
 from app import crud, schemas, models
+from app.crud.base import BULK_CHUNK_SIZE
 from app.tests.utils import random_lower_string, random_plate_number
 
 
@@ -41,3 +42,19 @@ def test_vehicle_delete_correct(
     assert vehicle.created_at == created_vehicle.created_at, "Date of the vehicle registration"
     assert vehicle.updated_at == created_vehicle.updated_at, "Vehicle information update date"
     assert crud.vehicle.count(db) == 0, "The database is empty"
+
+
+def test_vehicle_remove_multi(
+    db: Session
+) -> None:
+    """Delete many vehicles by a single statement."""
+    ids = [
+        crud.vehicle.create(db, obj_in=schemas.VehicleCreate(
+            make=random_lower_string(), model=random_lower_string(), plate_number=random_plate_number()
+        )).id
+        for _ in range(BULK_CHUNK_SIZE + 10)
+    ]
+    deleted = crud.vehicle.remove_multi(db, ids=ids[:-5] + ids[:5])
+    assert sorted(deleted) == ids[:-5], "IDs of the deleted vehicles in all chunks"
+    assert crud.vehicle.count(db) == 5, "The rest of the vehicles remain in the database"
+    assert crud.vehicle.remove_multi(db, ids=[]) == [], "Nothing is deleted without IDs"
@@ -40,3 +40,18 @@ def test_vehicle_get_correct(
     assert vehicle.plate_number == created_vehicle.plate_number, "The plate number of the vehicle"
     assert vehicle.created_at == created_vehicle.created_at, "Date of the vehicle registration"
     assert vehicle.updated_at == created_vehicle.updated_at, "Vehicle information update date"
+
+
+def test_vehicle_get_fields(
+    db: Session
+) -> None:
+    """Get only the selected columns of the vehicle."""
+    vehicle_in = schemas.VehicleCreate(
+        make=random_lower_string(), model=random_lower_string(), plate_number=random_plate_number()
+    )
+    vehicle_in_db = crud.vehicle.create(db, obj_in=vehicle_in)
+    row = crud.vehicle.get(db, id=vehicle_in_db.id, fields=["id", "plate_number"])
+    assert row is not None, "The vehicle is found"
+    assert row._fields == ("id", "plate_number"), "Only the selected columns"
+    assert row.plate_number == vehicle_in.plate_number, "Plate number of the vehicle"
+    assert crud.vehicle.get(db, id=vehicle_in_db.id + 1, fields=["id"]) is None, "There is no such vehicle"
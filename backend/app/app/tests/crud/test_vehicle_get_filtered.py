@@ -50,3 +50,28 @@ def test_vehicles_get_filtered_with_drivers_only(
         assert isinstance(vehicle.driver, models.Driver), "Model with driver details"
         assert len(vehicle.driver.first_name) > 2, "The first name of the driver"
         assert len(vehicle.driver.last_name) > 2, "The last name of the driver"
+
+
+def test_vehicles_get_filtered_pages_of_cached_statement(
+    db: Session
+) -> None:
+    """The cached statement of the page takes the new values of the limit and the cursor on each call."""
+    create_vehicles(db, with_driver=False)
+    vehicles = crud.vehicle.get_filtered(db, with_driver=False)
+    first_page = crud.vehicle.get_filtered(db, with_driver=False, limit=2)
+    second_page = crud.vehicle.get_filtered(db, with_driver=False, limit=3, after=[first_page[-1].id])
+    assert [v.id for v in first_page] == [v.id for v in vehicles[:2]], "The first page"
+    assert [v.id for v in second_page] == [v.id for v in vehicles[2:5]], "The next page of the other size"
+
+
+def test_vehicles_get_filtered_cached_statement_drivers(
+    db: Session
+) -> None:
+    """The cached statement finds the same vehicles as the sorted query for each filter by the driver."""
+    without_driver = create_vehicles(db, with_driver=False)
+    with_driver = create_vehicles(db, with_driver=True)
+    for value, number in [(None, without_driver + with_driver), (True, with_driver), (False, without_driver)]:
+        vehicles = crud.vehicle.get_filtered(db, with_driver=value)
+        sorted_vehicles = crud.vehicle.get_filtered(db, with_driver=value, sort=["id"])
+        assert len(vehicles) == number, f"The vehicles filtered by the driver ({value})"
+        assert [v.id for v in vehicles] == [v.id for v in sorted_vehicles], f"The same vehicles ({value})"
@@ -0,0 +1,40 @@
+import pytest
+from sqlalchemy.orm import Session
+from app import crud
+from app.crud import base
+from app.tests.utils import count_queries, create_vehicles
+
+
+def test_vehicles_get_many_in_request_order(
+    db: Session
+) -> None:
+    """Get the vehicles by IDs in the order of the request with the IDs which are not found."""
+    number = create_vehicles(db, with_driver=False)
+    ids = [number, 1, number + 10, 2]
+    vehicles, not_found = crud.vehicle.get_many(db, ids=ids)
+    assert [vehicle.id for vehicle in vehicles] == [number, 1, 2], "Found vehicles in the order of the request"
+    assert not_found == [number + 10], "IDs which are not found"
+
+
+def test_vehicles_get_many_in_chunks(
+    db: Session,
+    monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """The long list of IDs is requested by chunks."""
+    number = create_vehicles(db, with_driver=False)
+    monkeypatch.setattr(base, "BULK_CHUNK_SIZE", 10)
+    ids = list(range(number, 0, -1))
+    with count_queries(db) as queries:
+        vehicles, not_found = crud.vehicle.get_many(db, ids=ids)
+    assert [vehicle.id for vehicle in vehicles] == ids, "All vehicles in the order of the request"
+    assert not_found == [], "All vehicles are found"
+    assert len(queries) == (number + 9) // 10, "One query for each chunk"
+
+
+def test_vehicles_get_many_empty_list(
+    db: Session
+) -> None:
+    """Nothing is requested from the database for the empty list."""
+    with count_queries(db) as queries:
+        assert crud.vehicle.get_many(db, ids=[]) == ([], []), "Nothing is found"
+    assert len(queries) == 0, "No queries"
@@ -0,0 +1,31 @@
+from sqlalchemy.orm import Session
+from app import crud, schemas
+from app.crud.vehicle import SetDriverResult
+from app.tests.utils import random_lower_string, random_plate_number
+
+
+def test_vehicle_set_driver_outcomes(
+    db: Session
+) -> None:
+    """Put the driver in the vehicle with the distinct outcomes of the missing vehicle and driver."""
+    driver_in = schemas.DriverCreate(first_name=random_lower_string(), last_name=random_lower_string())
+    driver = crud.driver.create(db, obj_in=driver_in)
+    vehicle_in = schemas.VehicleCreate(
+        make=random_lower_string(), model=random_lower_string(), plate_number=random_plate_number()
+    )
+    vehicle = crud.vehicle.create(db, obj_in=vehicle_in)
+    row, result = crud.vehicle.set_driver(db, id=vehicle.id, driver_id=driver.id)
+    assert result == SetDriverResult.ASSIGNED, "The driver is put in the vehicle"
+    assert row.driver_id == driver.id, "Driver ID in the vehicle"  # type: ignore
+    assert vehicle.driver is driver, "The vehicle loaded in the session is read again"
+    row, result = crud.vehicle.set_driver(db, id=vehicle.id, driver_id=driver.id)
+    assert result == SetDriverResult.UNCHANGED, "The same driver is already in the vehicle"
+    row, result = crud.vehicle.set_driver(db, id=vehicle.id, driver_id=driver.id + 1)
+    assert result == SetDriverResult.DRIVER_NOT_FOUND, "There is no such driver in the database"
+    assert row.driver_id == driver.id, "The vehicle is not changed"  # type: ignore
+    row, result = crud.vehicle.set_driver(db, id=vehicle.id + 1, driver_id=driver.id)
+    assert result == SetDriverResult.VEHICLE_NOT_FOUND, "There is no such vehicle in the database"
+    assert row is None, "There is no vehicle"
+    row, result = crud.vehicle.set_driver(db, id=vehicle.id, driver_id=None)
+    assert result == SetDriverResult.ASSIGNED, "The driver is removed from the vehicle"
+    assert row.driver_id is None, "There is no driver in the vehicle"  # type: ignore
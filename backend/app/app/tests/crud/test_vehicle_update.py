@@ -2,7 +2,7 @@ import pytest
 from pydantic import ValidationError
 from sqlalchemy.orm import Session
 from app import crud, schemas, models
-from app.tests.utils import random_lower_string, random_plate_number
+from app.tests.utils import count_queries, random_lower_string, random_plate_number
 
 
 def test_vehicle_update_using_schema(
@@ -214,3 +214,82 @@ def test_vehicle_update_driver_id(
     assert isinstance(vehicle_up.driver, models.Driver), "The driver in the vehicle"
     assert vehicle_up.driver.first_name == first_name, "The first name of the driver"
     assert vehicle_up.driver.last_name == last_name, "The last name of the driver"
+
+
+def test_vehicle_update_multi(
+    db: Session
+) -> None:
+    """Update many vehicles grouping the same changes."""
+    vehicles = [
+        crud.vehicle.create(db, obj_in=schemas.VehicleCreate(
+            make=random_lower_string(), model=random_lower_string(), plate_number=random_plate_number()
+        ))
+        for _ in range(6)
+    ]
+    ids = [vehicle.id for vehicle in vehicles]
+    make = random_lower_string()
+    updates = [(id, {"make": make}) for id in ids[:3]]
+    updates += [(ids[3], {"model": "first"}), (ids[3], {"model": "last"})]
+    updated, not_found = crud.vehicle.update_multi(db, updates=updates + [(ids[-1] + 1, {"make": make})])
+    assert updated == ids[:4], "IDs of the updated vehicles"
+    assert not_found == [ids[-1] + 1], "IDs which are not found"
+    for vehicle in vehicles[:3]:
+        assert vehicle.make == make, "The new manufacturer name"
+    assert vehicles[3].model == "last", "The last change of the repeated ID is applied"
+    assert vehicles[4].make != make, "Other vehicles are not changed"
+
+
+def test_vehicle_update_by_id(
+    db: Session
+) -> None:
+    """Update the vehicle without loading it."""
+    vehicle_in = schemas.VehicleCreate(
+        make=random_lower_string(), model=random_lower_string(), plate_number=random_plate_number()
+    )
+    vehicle = crud.vehicle.create(db, obj_in=vehicle_in)
+    make = random_lower_string()
+    row, changed = crud.vehicle.update_by_id(
+        db, id=vehicle.id, obj_in=schemas.VehicleUpdate(make=make, model=None), exclude_empty=True
+    )
+    assert row is not None, "The vehicle is found"
+    assert changed, "The vehicle is changed"
+    assert row.id == vehicle.id, "The vehicle ID in the database"
+    assert row.make == make, "Manufacturer name of the vehicle"
+    assert row.model == vehicle_in.model, "Empty values are ignored"
+    assert row.updated_at >= row.created_at, "Vehicle information update date"
+    assert vehicle.make == make, "The vehicle loaded in the session is read again"
+    row, changed = crud.vehicle.update_by_id(db, id=vehicle.id, obj_in=schemas.VehicleUpdate())
+    assert row is not None and row.make == make, "The vehicle without changes"
+    assert not changed, "Nothing to change"
+    row, changed = crud.vehicle.update_by_id(db, id=vehicle.id + 1, obj_in={"make": make})
+    assert row is None, "There is no such record in the database"
+    assert not changed, "Nothing is changed"
+
+
+def test_vehicle_update_by_id_with_same_values(
+    db: Session
+) -> None:
+    """The vehicle is not written when the values are the same as in the database."""
+    vehicle_in = schemas.VehicleCreate(
+        make=random_lower_string(), model=random_lower_string(), plate_number=random_plate_number()
+    )
+    vehicle = crud.vehicle.create(db, obj_in=vehicle_in)
+    row, changed = crud.vehicle.update_by_id(db, id=vehicle.id, obj_in=vehicle_in)
+    assert row is not None, "The vehicle is found"
+    assert not changed, "The vehicle is not changed"
+    assert row.updated_at == vehicle.updated_at, "The update date remains the same"
+
+
+def test_vehicle_update_with_same_values(
+    db: Session
+) -> None:
+    """Nothing is written when the values of the loaded vehicle are not changed."""
+    vehicle_in = schemas.VehicleCreate(
+        make=random_lower_string(), model=random_lower_string(), plate_number=random_plate_number()
+    )
+    vehicle = crud.vehicle.create(db, obj_in=vehicle_in)
+    updated_at = vehicle.updated_at
+    with count_queries(db) as statements:
+        vehicle = crud.vehicle.update(db, db_obj=vehicle, obj_in=vehicle_in.dict())
+    assert statements == [], "No statements are executed"
+    assert vehicle.updated_at == updated_at, "The update date remains the same"
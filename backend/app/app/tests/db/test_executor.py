@@ -0,0 +1,171 @@
+import asyncio
+import threading
+import time
+from typing import Any
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from app.api.executor import run_db
+from app.core.config import settings
+from app.db.executor import DBExecutor, ExecutorOverloaded, Priority, db_executor
+
+
+def test_executor_runs_calls_in_order_of_priority() -> None:
+    """Queued calls are executed by priority, and in order of arrival within the same priority."""
+    executor = DBExecutor(max_workers=1)
+    started = threading.Event()
+    release = threading.Event()
+    order = []
+    blocker = executor.submit(lambda: started.set() or release.wait(), priority=Priority.WRITE)
+    assert started.wait(timeout=5), "The only worker is busy"
+    futures = [
+        executor.submit(order.append, "scan-1", priority=Priority.SCAN),
+        executor.submit(order.append, "write", priority=Priority.WRITE),
+        executor.submit(order.append, "scan-2", priority=Priority.SCAN),
+        executor.submit(order.append, "point-read", priority=Priority.POINT_READ),
+    ]
+    assert executor.stats().queue_depth == 4, "All calls are waiting in the queue"
+    release.set()
+    for future in [blocker] + futures:
+        future.result(timeout=5)
+    assert order == ["point-read", "write", "scan-1", "scan-2"], "Order of execution"
+    stats = executor.stats()
+    assert stats.completed == 5, "All calls are completed"
+    assert stats.queue_depth == 0, "The queue is empty"
+    assert stats.wait_max_ms >= stats.wait_avg_ms > 0, "Waiting time of the calls"
+    executor.shutdown()
+
+
+def test_executor_rejects_calls_when_queue_is_full() -> None:
+    """The call is rejected when the queue is full."""
+    executor = DBExecutor(max_workers=1, max_queue_size=1)
+    started = threading.Event()
+    release = threading.Event()
+    executor.submit(lambda: started.set() or release.wait())
+    assert started.wait(timeout=5), "The only worker is busy"
+    executor.submit(lambda: None)
+    with pytest.raises(ExecutorOverloaded):
+        executor.submit(lambda: None)
+    assert executor.stats().rejected == 1, "The number of the rejected calls"
+    release.set()
+    executor.shutdown()
+
+
+def test_executor_limits_queue_of_concurrent_submitters() -> None:
+    """Concurrent submitters do not exceed the size of the queue."""
+    executor = DBExecutor(max_workers=1, max_queue_size=5)
+    started = threading.Event()
+    release = threading.Event()
+    executor.submit(lambda: started.set() or release.wait())
+    assert started.wait(timeout=5), "The only worker is busy"
+    barrier = threading.Barrier(20)
+
+    def submit() -> None:
+        barrier.wait()
+        try:
+            executor.submit(lambda: None)
+        except ExecutorOverloaded:
+            pass
+
+    threads = [threading.Thread(target=submit) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+    stats = executor.stats()
+    assert stats.queue_depth == 5, "The queue is filled up to its size"
+    assert stats.rejected == 15, "The other calls are rejected"
+    release.set()
+    executor.shutdown()
+
+
+def test_executor_shutdown_with_full_queue() -> None:
+    """The shutdown does not wait for a free place in the full queue, the queued calls are completed."""
+    executor = DBExecutor(max_workers=1, max_queue_size=2)
+    started = threading.Event()
+    release = threading.Event()
+    blocker = executor.submit(lambda: started.set() or release.wait())
+    assert started.wait(timeout=5), "The only worker is busy"
+    futures = [executor.submit(lambda i=i: i) for i in range(2)]
+    shutdown = threading.Thread(target=executor.shutdown)
+    shutdown.start()
+    for _ in range(100):
+        if executor.stats().queue_depth == 3:
+            break
+        time.sleep(0.01)
+    assert executor.stats().queue_depth == 3, "The stop item is added to the full queue"
+    release.set()
+    shutdown.join(timeout=5)
+    assert not shutdown.is_alive(), "The executor is stopped"
+    assert [future.result(timeout=0) for future in futures] == [0, 1], "The queued calls are completed"
+    assert blocker.result(timeout=0), "The running call is completed"
+
+
+def test_executor_shutdown_without_workers() -> None:
+    """The calls that can not be executed by the stopped threads are cancelled on shutdown."""
+    executor = DBExecutor(max_workers=1, max_queue_size=1)
+    executor._work = lambda: None  # type: ignore
+    future = executor.submit(lambda: None)
+    shutdown = threading.Thread(target=executor.shutdown)
+    shutdown.start()
+    shutdown.join(timeout=5)
+    assert not shutdown.is_alive(), "The executor is stopped"
+    assert future.cancelled(), "The queued call is cancelled"
+
+
+def test_executor_propagates_exceptions() -> None:
+    """The exception raised by the call is passed to the caller."""
+    executor = DBExecutor(max_workers=2)
+    with pytest.raises(ZeroDivisionError):
+        executor.submit(lambda: 1 / 0).result(timeout=5)
+    executor.shutdown()
+
+
+def test_executor_stats_endpoint(
+    client: TestClient
+) -> None:
+    """Get the executor statistics from the API."""
+    response = client.get(f"{settings.API_V1_STR}/stats/db_executor/")
+    assert response.status_code == 200, "Successful request"
+    assert response.headers["Content-Type"] == "application/json", "Response content type"
+    stats = response.json()
+    assert stats["workers"] == settings.DB_POOL_SIZE, "Executor is sized to the connection pool"
+    for key in ["active", "queue_depth", "completed", "rejected", "wait_avg_ms", "wait_max_ms"]:
+        assert key in stats, "Statistics of the executor"
+
+
+def test_executor_overloaded_response(
+    client: TestClient,
+    monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """The API asks to retry the request later when the queue is full."""
+    def submit(*args: Any, **kwargs: Any) -> None:
+        raise ExecutorOverloaded("The queue of the database calls is full (1)")
+
+    monkeypatch.setattr(db_executor, "submit", submit)
+    response = client.get(f"{settings.API_V1_STR}/drivers/driver/1/")
+    assert response.status_code == 503, "Service is unavailable"
+    assert response.headers["Retry-After"] == str(settings.DB_EXECUTOR_RETRY_AFTER), "Retry later"
+    assert "overloaded" in response.json()["detail"], "The server is overloaded"
+
+
+def test_run_db_errors(
+    monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """The errors of the database are the 503 responses, the overload and the handled exceptions are passed."""
+    def fail() -> None:
+        raise RuntimeError("database is locked")
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(run_db(fail))
+    assert error.value.status_code == 503, "Service is unavailable"
+    assert "database is locked" in error.value.detail, "Detailed description of the error"
+    with pytest.raises(RuntimeError):
+        asyncio.run(run_db(fail, handled=(RuntimeError,)))
+
+    def submit(*args: Any, **kwargs: Any) -> None:
+        raise ExecutorOverloaded("The queue of the database calls is full (1)")
+
+    monkeypatch.setattr(db_executor, "submit", submit)
+    with pytest.raises(ExecutorOverloaded):
+        asyncio.run(run_db(lambda: None))
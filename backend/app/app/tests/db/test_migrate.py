@@ -0,0 +1,84 @@
+from pathlib import Path
+from alembic import command
+from alembic.runtime.migration import MigrationContext
+from sqlalchemy import create_engine, inspect, insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from app import crud, models
+from app.db.base import Base
+from app.db.migrate import get_alembic_config, migrate
+
+# Indexes added by the migrations
+INDEXES = {
+    "drivers": {"ix_drivers_created_at"},
+    "vehicles": {
+        "ix_vehicles_driver_id", "ix_vehicles_without_driver", "ix_vehicles_plate_number", "ix_vehicles_created_at"
+    },
+}
+LATEST_VERSION = "0003"
+
+
+def get_indexes(engine: Engine, table: str) -> set:
+    """Names of the indexes of the table."""
+    return {index["name"] for index in inspect(engine).get_indexes(table)}
+
+
+def get_version(engine: Engine) -> str:
+    """Version of the database schema."""
+    with engine.connect() as connection:
+        return MigrationContext.configure(connection).get_current_revision()
+
+
+def test_migrate_new_database(
+    tmp_path: Path
+) -> None:
+    """The new database is created from the models with the latest version of the schema."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'database.db'}")
+    migrate(engine)
+    for table, indexes in INDEXES.items():
+        assert indexes <= get_indexes(engine, table), f"Indexes of the {table} table"
+    assert get_version(engine) == LATEST_VERSION, "The database has the latest version"
+    migrate(engine)
+    assert get_version(engine) == LATEST_VERSION, "The repeated migration changes nothing"
+    engine.dispose()
+
+
+def test_migrate_database_created_before_migrations(
+    tmp_path: Path
+) -> None:
+    """The database created without the migrations is upgraded from the first one."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'database.db'}")
+    migrate(engine)
+    config = get_alembic_config()
+    with engine.begin() as connection:
+        config.attributes["connection"] = connection
+        command.downgrade(config, "base")
+    assert not INDEXES["vehicles"] & get_indexes(engine, "vehicles"), "Indexes are removed by the downgrade"
+    migrate(engine)
+    for table, indexes in INDEXES.items():
+        assert indexes <= get_indexes(engine, table), f"Indexes of the {table} table"
+    assert set(Base.metadata.tables) <= set(inspect(engine).get_table_names()), "All tables remain"
+    engine.dispose()
+
+
+def test_migrate_database_without_counters(
+    tmp_path: Path
+) -> None:
+    """The counters of the database created before them are counted from the existing records."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'database.db'}")
+    migrate(engine)
+    config = get_alembic_config()
+    with engine.begin() as connection:
+        config.attributes["connection"] = connection
+        command.downgrade(config, "base")
+        connection.execute(insert(models.Driver.__table__), [{"first_name": "First", "last_name": "Last"}] * 3)
+    assert "counters" not in inspect(engine).get_table_names(), "The counters are removed by the downgrade"
+    migrate(engine)
+    assert get_version(engine) == LATEST_VERSION, "The database has the latest version"
+    with Session(bind=engine) as db:
+        assert crud.driver.count(db) == 3, "The existing drivers are counted"
+        assert crud.vehicle.count(db) == 0, "There are no vehicles"
+        crud.driver.remove(db, id=1)
+        db.commit()
+        assert crud.driver.count(db) == 2, "The counter is maintained by the triggers"
+    engine.dispose()
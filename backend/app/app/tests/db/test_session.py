@@ -0,0 +1,111 @@
+from pathlib import Path
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import QueuePool, StaticPool
+from app import crud, models, schemas
+from app.core.config import settings
+from app.db import session
+from app.db.session import enable_sqlite_profile, get_engine_options, savepoint
+from app.tests.utils import random_lower_string
+
+
+def test_savepoint_rolls_back_only_nested_changes(
+    db: Session
+) -> None:
+    """Only the changes made in the failed nested transaction are rolled back."""
+    driver_in = schemas.DriverCreate(first_name=random_lower_string(), last_name=random_lower_string())
+    crud.driver.create(db, obj_in=driver_in)
+    with pytest.raises(RuntimeError):
+        with savepoint(db):
+            crud.driver.create(db, obj_in=driver_in)
+            assert crud.driver.count(db) == 2, "The nested changes are visible inside the block"
+            raise RuntimeError("Failed step")
+    assert crud.driver.count(db) == 1, "The changes made before the savepoint remain"
+    with savepoint(db):
+        crud.driver.create(db, obj_in=driver_in)
+    assert crud.driver.count(db) == 2, "The changes of the successful block remain"
+
+
+def test_sqlite_profile(
+    tmp_path: Path
+) -> None:
+    """The performance profile from the settings is applied to the connections to the SQLite file."""
+    url = f"sqlite:///{tmp_path / 'database.db'}"
+    options = get_engine_options(url)
+    assert options["poolclass"] is QueuePool, "The pool of the connections to the file"
+    assert options["pool_pre_ping"] is False, "The connections to the local file are not checked"
+    engine = create_engine(url, **options)
+    enable_sqlite_profile(engine)
+    with engine.connect() as connection:
+        pragma = lambda name: connection.exec_driver_sql(f"PRAGMA {name}").scalar()  # noqa E731
+        assert pragma("journal_mode").upper() == settings.SQLITE_JOURNAL_MODE, "Journal mode"
+        assert pragma("synchronous") == 1, "Synchronization of the commits (NORMAL)"
+        assert pragma("cache_size") == settings.SQLITE_CACHE_SIZE, "Size of the page cache"
+        assert pragma("busy_timeout") == settings.SQLITE_BUSY_TIMEOUT, "Time to wait for the lock"
+        assert pragma("temp_store") == 2, "Temporary tables in memory"
+    engine.dispose()
+
+
+def test_sqlite_in_memory_options() -> None:
+    """The in-memory database is shared through a single connection."""
+    options = get_engine_options("sqlite://")
+    assert options["poolclass"] is StaticPool, "Single connection"
+    assert get_engine_options("postgresql://localhost/cars")["pool_pre_ping"], "Remote connections are checked"
+
+
+def test_pool_options() -> None:
+    """The pool of the connections to the database server is configured by the settings."""
+    options = get_engine_options("postgresql://localhost/cars")
+    assert options["pool_size"] == settings.DB_POOL_SIZE, "Size of the pool"
+    assert options["max_overflow"] == settings.DB_MAX_OVERFLOW, "Connections above the pool size"
+    assert options["pool_timeout"] == settings.DB_POOL_TIMEOUT, "Time to wait for the connection"
+    assert options["pool_recycle"] == settings.DB_POOL_RECYCLE, "Lifetime of the connection"
+
+
+def test_engine_of_each_process(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """The engine is created on the first use and each (forked) process gets its own engine."""
+    monkeypatch.setattr(settings, "DATABASE_URL", f"sqlite:///{tmp_path / 'database.db'}")
+    monkeypatch.setattr(session, "_engines", {})
+    monkeypatch.setattr(session.os, "getpid", lambda: 1)
+    engine = session.get_engine()
+    assert session.get_engine() is engine, "The engine is created once in the process"
+    monkeypatch.setattr(session.os, "getpid", lambda: 2)
+    child_engine = session.get_engine()
+    assert child_engine is not engine, "The child process has its own engine"
+    assert child_engine.pool is not engine.pool, "The child process has its own pool of connections"
+    db = session.SessionLocal()
+    assert db.get_bind() is child_engine, "The session uses the engine of the current process"
+    db.close()
+    engine.dispose()
+    child_engine.dispose()
+
+
+def test_routing_session(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """The reads go to a replica until the first write or when the primary is requested."""
+    primary = create_engine(f"sqlite:///{tmp_path / 'primary.db'}")
+    replica = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    monkeypatch.setattr(session.os, "getpid", lambda: 1)
+    monkeypatch.setattr(session, "_engines", {1: primary})
+    monkeypatch.setattr(session, "_replica_engines", {1: [replica]})
+    query = select(models.Driver)
+    db = session.ReadSessionLocal()
+    assert db.get_bind(clause=query) is replica, "The reads go to the replica"
+    assert db.get_bind(clause=models.Driver.__table__.delete()) is primary, "The writes go to the primary"
+    assert db.get_bind(clause=query) is primary, "The reads after the write go to the primary"
+    db.close()
+    db = session.ReadSessionLocal(use_primary=True)
+    assert db.get_bind(clause=query) is primary, "The client is pinned to the primary"
+    db.close()
+    monkeypatch.setattr(session, "_replica_engines", {1: []})
+    db = session.ReadSessionLocal()
+    assert db.get_bind(clause=query) is primary, "Without the replicas the reads go to the primary"
+    db.close()
+    primary.dispose()
+    replica.dispose()
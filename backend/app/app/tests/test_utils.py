@@ -1,6 +1,12 @@
+from pathlib import Path
 import pytest
 import re
+import sqlite3
+from app.core.config import settings
+from app.db import session
+from app.db.base import Base
 from app.tests.utils import random_lower_string, random_email, random_plate_number
+from app.utils import fill
 
 
 @pytest.mark.parametrize("execution_number", range(100))
@@ -30,3 +36,20 @@ def test_random_plate_number(execution_number: int) -> None:
     assert isinstance(string, str), "Instance of the string type"
     assert re.match(r"^[A-Z]{2}\s[0-9]{4}\s[A-Z]{2}$", string), "Corresponds to the regular expression"
     assert len(string) == 10, "Fixed length string"
+
+
+def test_fill(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """The random data is committed to the database."""
+    path = tmp_path / "database.db"
+    monkeypatch.setattr(settings, "DATABASE_URL", f"sqlite:///{path}")
+    monkeypatch.setattr(session, "_engines", {})
+    Base.metadata.create_all(bind=session.get_engine())
+    fill(5)
+    session.get_engine().dispose()
+    connection = sqlite3.connect(path)
+    assert connection.execute("SELECT COUNT(*) FROM drivers").fetchone()[0] == 5, "All drivers are saved"
+    assert connection.execute("SELECT COUNT(*) FROM vehicles").fetchone()[0] == 5, "All vehicles are saved"
+    connection.close()
@@ -0,0 +1,85 @@
+import gzip
+import json
+import pytest
+from sqlalchemy.orm import Session
+from app import crud, schemas
+from app.tests.utils import random_lower_string, random_plate_number
+from app.vehicle_import import ImportFormatError, VehicleImporter
+
+
+def feed_by_pieces(importer: VehicleImporter, data: bytes, size: int = 7) -> schemas.ImportSummary:
+    """Pass the data to the importer in small pieces and finish the import."""
+    for i in range(0, len(data), size):
+        importer.feed(data[i:i + size])
+    return importer.close()
+
+
+def test_import_csv_in_batches(
+    db: Session
+) -> None:
+    """Import the vehicles from CSV split into small pieces with several transactions."""
+    rows = [(random_lower_string(), random_lower_string(), random_plate_number()) for _ in range(25)]
+    data = "make,model,plate_number\r\n" + "".join(f'{make},"{model}",{plate}\r\n' for make, model, plate in rows)
+    importer = VehicleImporter(db, format="csv", batch_size=10)
+    summary = feed_by_pieces(importer, data.encode())
+    assert summary.inserted == len(rows), "All vehicles are inserted"
+    assert summary.rejected == summary.duplicates == 0, "There are no invalid rows and duplicates"
+    assert crud.vehicle.count(db) == len(rows), "All vehicles are in the database"
+    assert crud.vehicle.get_existing_plate_numbers(db, plate_numbers=[row[2] for row in rows]) == {
+        row[2] for row in rows
+    }, "Plate numbers of the imported vehicles"
+
+
+def test_import_csv_with_invalid_rows_and_duplicates(
+    db: Session
+) -> None:
+    """Invalid rows and duplicates of the plate numbers are counted and skipped."""
+    existing = random_plate_number()
+    vehicle_in = schemas.VehicleCreate(
+        make=random_lower_string(), model=random_lower_string(), plate_number=existing
+    )
+    crud.vehicle.create(db, obj_in=vehicle_in)
+    plate = random_plate_number()
+    data = (
+        "make,model,plate_number\n"
+        f"Audi,\"A6\nAvant\",{plate}\n"   # quoted value with the line break
+        f"BMW,X5,{plate}\n"               # duplicate in the file
+        f"Opel,Astra,{existing}\n"        # duplicate in the database
+        "Ford,Focus,wrong\n"              # invalid plate number
+        "Tesla,Model 3\n"                 # wrong number of values
+        "\n"
+        f"Honda,Civic,{random_plate_number()}"
+    )
+    summary = feed_by_pieces(VehicleImporter(db, format="csv"), data.encode())
+    assert summary.inserted == 2, "Only valid and unique rows are inserted"
+    assert summary.duplicates == 2, "Duplicates of the plate numbers"
+    assert summary.rejected == 2, "Invalid rows"
+    assert [error.index for error in summary.errors] == [3, 4], "Positions of the invalid rows"
+    assert crud.vehicle.count(db) == 3, "Vehicles in the database"
+
+
+def test_import_gzipped_jsonl(
+    db: Session
+) -> None:
+    """Import the vehicles from gzip-encoded JSON lines."""
+    rows = [
+        {"make": random_lower_string(), "model": random_lower_string(), "plate_number": random_plate_number()}
+        for _ in range(30)
+    ]
+    data = "\n".join(json.dumps(row) for row in rows) + "\n{not a json}\n[1, 2]\n"
+    summary = feed_by_pieces(VehicleImporter(db, format="jsonl", gzipped=True), gzip.compress(data.encode()))
+    assert summary.inserted == len(rows), "All valid vehicles are inserted"
+    assert summary.rejected == 2, "Invalid lines are rejected"
+    assert [error.index for error in summary.errors] == [30, 31], "Positions of the invalid lines"
+
+
+def test_import_broken_data(
+    db: Session
+) -> None:
+    """The data that can not be parsed at all raises the error."""
+    with pytest.raises(ImportFormatError):
+        feed_by_pieces(VehicleImporter(db, format="csv"), b'make,model,plate_number\nAudi,"A6,AA 1234 BB\n')
+    with pytest.raises(ImportFormatError):
+        feed_by_pieces(VehicleImporter(db, format="jsonl", gzipped=True), b"definitely not gzip")
+    with pytest.raises(ImportFormatError):
+        feed_by_pieces(VehicleImporter(db, format="jsonl"), b'{"make": "\xff\xfe"}\n')
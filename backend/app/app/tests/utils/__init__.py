@@ -1,2 +1,3 @@
 from .fill import create_drivers, create_vehicles
+from .queries import count_queries
 from .rand import random_lower_string, random_email, random_plate_number
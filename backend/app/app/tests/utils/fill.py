@@ -1,15 +1,17 @@
+from typing import Optional
 from random import randint
 from sqlalchemy.orm import Session
 from app import crud, schemas
 from .rand import random_lower_string, random_plate_number
 
 
-def create_drivers(db: Session) -> int:
+def create_drivers(db: Session, count: Optional[int] = None) -> int:
     """Create a random set of drivers in the database.
     :param db: database connection session
+    :param count: number of the drivers (random if empty)
     :return: the number of created drivers
     """
-    count = randint(20, 100)
+    count = randint(20, 100) if count is None else count
     for i in range(count):
         first_name = random_lower_string()
         last_name = random_lower_string()
@@ -18,14 +20,15 @@ def create_drivers(db: Session) -> int:
     return count
 
 
-def create_vehicles(db: Session, with_driver: bool) -> int:
+def create_vehicles(db: Session, with_driver: bool, count: Optional[int] = None) -> int:
     """Create a random set of vehicles in the database
     if necessary, also create drivers and add them to vehicles.
     :param db: database connection session
     :param with_driver: sign of the presence of the driver in the car
+    :param count: number of the vehicles (random if empty)
     :return: the number of created vehicles
     """
-    count = randint(20, 100)
+    count = randint(20, 100) if count is None else count
     for i in range(count):
         driver_id = None
         if with_driver:
@@ -0,0 +1,23 @@
+from typing import Any, Iterator, List
+from contextlib import contextmanager
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+
+@contextmanager
+def count_queries(db: Session) -> Iterator[List[str]]:
+    """Collect the SQL statements executed by the session inside the block.
+    :param db: database connection session
+    :return: list of the executed statements, filled in when the block is running
+    """
+    statements: List[str] = []
+    connection = db.connection()
+
+    def before_cursor_execute(conn: Any, cursor: Any, statement: str, *args: Any) -> None:
+        statements.append(statement)
+
+    event.listen(connection, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(connection, "before_cursor_execute", before_cursor_execute)
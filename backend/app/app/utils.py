@@ -32,4 +32,7 @@ def fill(count: int = 100) -> None:
             obj_in=schemas.VehicleCreate(make=make, model=model, plate_number=plate_number),
             driver_id=choice((driver.id, None))
         )
+    # The CRUD methods only flush the changes, the script is the unit of work
+    db.commit()
+    db.close()
     print("Done")
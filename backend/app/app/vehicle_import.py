@@ -0,0 +1,192 @@
+from typing import Any, Dict, List, Literal, Optional
+import argparse
+import codecs
+import csv
+import json
+import logging
+import zlib
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+from app import crud, schemas
+from app.db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+ImportFormat = Literal["csv", "jsonl"]
+
+# Limits that keep the memory usage independent of the size of the imported file
+MAX_RECORD_LENGTH = 64 * 1024
+MAX_REPORTED_ERRORS = 100
+
+
+class ImportFormatError(ValueError):
+    """The imported data can not be parsed."""
+    pass
+
+
+class VehicleImporter:
+    """Streaming import of the vehicles from CSV (with the header row) or JSON lines.
+    The data is passed in arbitrary pieces with `feed()`, only the incomplete last line is kept,
+    the parsed rows are validated against the `VehicleCreate` schema
+    and inserted in batches, each batch in its own transaction.
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        *,
+        format: ImportFormat,
+        gzipped: bool = False,
+        batch_size: int = 1000
+    ):
+        """Importer of the vehicles.
+        :param db: database session
+        :param format: format of the data: "csv" or "jsonl"
+        :param gzipped: the data is compressed with gzip
+        :param batch_size: number of rows inserted in a single transaction
+        """
+        self.db = db
+        self.format = format
+        self.batch_size = batch_size
+        self._decompressor = zlib.decompressobj(wbits=zlib.MAX_WBITS | 16) if gzipped else None
+        self._decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        self._tail = ""
+        self._record: List[str] = []
+        self._header: Optional[List[str]] = None
+        self._index = 0
+        self._batch: List[schemas.VehicleCreate] = []
+        self.summary = schemas.ImportSummary(inserted=0, rejected=0, duplicates=0, errors=[])
+
+    def feed(self, data: bytes) -> None:
+        """Process the next piece of the data."""
+        if self._decompressor is not None:
+            try:
+                data = self._decompressor.decompress(data)
+            except zlib.error as e:
+                raise ImportFormatError("Invalid gzip data: %s" % str(e))
+        try:
+            text = self._decoder.decode(data)
+        except UnicodeDecodeError as e:
+            raise ImportFormatError("The data is not encoded in UTF-8: %s" % str(e))
+        self._feed_text(text)
+
+    def close(self) -> schemas.ImportSummary:
+        """Process the rest of the data and return the summary of the import."""
+        if self._decompressor is not None:
+            if not self._decompressor.eof:
+                raise ImportFormatError("The gzip data is incomplete")
+        try:
+            self._feed_text(self._decoder.decode(b"", final=True))
+        except UnicodeDecodeError as e:
+            raise ImportFormatError("The data is not encoded in UTF-8: %s" % str(e))
+        if self._tail:
+            self._add_line(self._tail)
+            self._tail = ""
+        if self._record:
+            raise ImportFormatError("Unterminated quoted value at the end of the data")
+        self._flush()
+        return self.summary
+
+    def _feed_text(self, text: str) -> None:
+        """Split the text into lines and keep the incomplete last line for the next piece."""
+        lines = (self._tail + text).split("\n")
+        self._tail = lines.pop()
+        if len(self._tail) > MAX_RECORD_LENGTH:
+            raise ImportFormatError(f"The line is longer than {MAX_RECORD_LENGTH} characters")
+        for line in lines:
+            self._add_line(line)
+
+    def _add_line(self, line: str) -> None:
+        """Collect the lines of a single record (a quoted CSV value can contain line breaks)."""
+        if self.format == "csv":
+            self._record.append(line)
+            # The record is complete when the quotes are balanced (escaped quotes are doubled)
+            if sum(part.count('"') for part in self._record) % 2:
+                if sum(len(part) for part in self._record) > MAX_RECORD_LENGTH:
+                    raise ImportFormatError(f"The record is longer than {MAX_RECORD_LENGTH} characters")
+                return
+            line, self._record = "\n".join(self._record), []
+        line = line.rstrip("\r")
+        if line.strip():
+            self._add_record(line)
+
+    def _add_record(self, record: str) -> None:
+        """Parse and validate the record, and add it to the batch."""
+        if self.format == "csv":
+            values = next(csv.reader([record]))
+            if self._header is None:
+                self._header = [name.strip() for name in values]
+                return
+            index = self._index
+            self._index += 1
+            if len(values) != len(self._header):
+                self._reject(
+                    index, [{"loc": ["__root__"], "msg": "Wrong number of values", "type": "value_error"}]
+                )
+                return
+            item: Any = dict(zip(self._header, values))
+        else:
+            index = self._index
+            self._index += 1
+            try:
+                item = json.loads(record)
+            except ValueError as e:
+                self._reject(index, [{"loc": ["__root__"], "msg": str(e), "type": "value_error.json"}])
+                return
+        try:
+            self._batch.append(schemas.VehicleCreate.parse_obj(item))
+        except ValidationError as ve:
+            self._reject(index, ve.errors())
+            return
+        if len(self._batch) >= self.batch_size:
+            self._flush()
+
+    def _reject(self, index: int, errors: List[Dict[str, Any]]) -> None:
+        """Count the invalid row and keep the description of the first errors."""
+        self.summary.rejected += 1
+        if len(self.summary.errors) < MAX_REPORTED_ERRORS:
+            self.summary.errors.append(schemas.BulkItemError(index=index, errors=errors))
+
+    def _flush(self) -> None:
+        """Insert the batch of the valid rows skipping the duplicates of the plate numbers."""
+        if not self._batch:
+            return
+        existing = crud.vehicle.get_existing_plate_numbers(
+            self.db, plate_numbers=[vehicle_in.plate_number for vehicle_in in self._batch]
+        )
+        vehicles_in = []
+        for vehicle_in in self._batch:
+            if vehicle_in.plate_number in existing:
+                self.summary.duplicates += 1
+                continue
+            existing.add(vehicle_in.plate_number)
+            vehicles_in.append(vehicle_in)
+        self._batch = []
+        self.summary.inserted += len(crud.vehicle.create_multi(self.db, objs_in=vehicles_in))
+        self.db.commit()
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Import vehicles from CSV or JSON lines file")
+    parser.add_argument("path", help="path to the file (*.csv, *.jsonl, *.ndjson, optionally *.gz)")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="format of the file (by default by its name)")
+    parser.add_argument("--batch-size", type=int, default=1000, help="number of rows in a single transaction")
+    args = parser.parse_args()
+    name = args.path.lower()
+    gzipped = name.endswith(".gz")
+    name = name[:-3] if gzipped else name
+    format = args.format or ("csv" if name.endswith(".csv") else "jsonl")
+    logger.info(f"Importing vehicles from {args.path}")
+    db = SessionLocal()
+    importer = VehicleImporter(db, format=format, gzipped=gzipped, batch_size=args.batch_size)
+    with open(args.path, "rb") as f:
+        for data in iter(lambda: f.read(64 * 1024), b""):
+            importer.feed(data)
+    summary = importer.close()
+    db.close()
+    print(summary.json(indent=2))
+
+
+if __name__ == "__main__":
+    main()
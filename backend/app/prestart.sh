@@ -3,5 +3,8 @@
 # Let the DB start
 python /app/app/backend_pre_start.py
 
+# Create the database schema or upgrade it by the migrations
+python /app/app/db/migrate.py
+
 # Create initial data in DB
 python /app/app/initial_data.py